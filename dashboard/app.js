@@ -14,6 +14,11 @@ const state = {
     selectedYears: [],
     selectedLeagues: [],
   },
+  live: {
+    source: null,
+    gameId: null,
+    series: null,
+  },
 };
 
 const palette = [
@@ -1127,19 +1132,47 @@ async function loadEsportsMeta() {
   await loadEsportsChampions();
 }
 
+const pipelineStatus = {};
+
+function describeTask(name) {
+  const entry = pipelineStatus[name] || {};
+  const status = entry.status || "idle";
+  const progress = entry.progress;
+  if (status !== "running" || !progress || !progress.stage) return status;
+  const count = progress.total != null ? `${progress.done}/${progress.total}` : `${progress.done}`;
+  return `${status} (${progress.stage} ${count}, ${progress.requests} req, ${formatInteger(progress.bytes / 1024)} KB)`;
+}
+
+function renderPipelineStatus() {
+  $("#update-ddragon-status").textContent = `Status: ${describeTask("ddragon")}`;
+  $("#update-esports-status").textContent =
+    `Esports: ${describeTask("esports")} | Oracle: ${describeTask("oracle")} | LoLAPI: ${describeTask("lolapi")}`;
+}
+
 async function refreshPipelineStatus() {
-  const data = await fetchJson("/api/pipeline/status");
-  const ddragon = data.ddragon?.status || "idle";
-  const esports = data.esports?.status || "idle";
-  const oracle = data.oracle?.status || "idle";
-  const lolapi = data.lolapi?.status || "idle";
-  $("#update-ddragon-status").textContent = `Status: ${ddragon}`;
-  $("#update-esports-status").textContent = `Esports: ${esports} | Oracle: ${oracle} | LoLAPI: ${lolapi}`;
+  Object.assign(pipelineStatus, await fetchJson("/api/pipeline/status"));
+  renderPipelineStatus();
+}
+
+function watchPipelineStatus() {
+  // The server pushes status changes and progress; no polling needed.
+  const source = new EventSource("/api/pipeline/events");
+  source.addEventListener("status", (event) => {
+    Object.assign(pipelineStatus, JSON.parse(event.data));
+    renderPipelineStatus();
+  });
+  source.addEventListener("progress", (event) => {
+    const progress = JSON.parse(event.data);
+    const entry = pipelineStatus[progress.task];
+    if (entry && entry.status === "running") {
+      entry.progress = progress;
+      renderPipelineStatus();
+    }
+  });
 }
 
 async function runPipeline(task, riotId) {
   await postJson("/api/pipeline/run", { task, riot_id: riotId });
-  await refreshPipelineStatus();
 }
 
 function renderChips(container, items, selected, onChange) {
@@ -1440,6 +1473,84 @@ async function loadChampionTrend() {
   });
 }
 
+function emptyLiveSeries() {
+  return { t: [], goldDiff: [], killDiff: [] };
+}
+
+function appendLiveFrames(series, data) {
+  const blue = data.blueTeam || {};
+  const red = data.redTeam || {};
+  (data.timestamps || []).forEach((stamp, idx) => {
+    // Frames already on the chart (e.g. sent again after a reconnect) are skipped.
+    if (series.t.length && stamp <= series.t[series.t.length - 1]) return;
+    const diff = (field) => {
+      const b = (blue[field] || [])[idx];
+      const r = (red[field] || [])[idx];
+      return b == null || r == null ? null : b - r;
+    };
+    series.t.push(stamp);
+    series.goldDiff.push(diff("totalGold"));
+    series.killDiff.push(diff("totalKills"));
+  });
+}
+
+function renderLive() {
+  const series = state.live.series || emptyLiveSeries();
+  const start = series.t.length ? series.t[0] : 0;
+  const points = (values) =>
+    series.t
+      .map((stamp, idx) => ({ x: Number(((stamp - start) / 60000).toFixed(2)), y: values[idx] }))
+      .filter((p) => p.y != null);
+  renderLine($("#live-gold-line"), points(series.goldDiff), { xLabel: "Minute", yLabel: "Gold", color: palette[2] });
+  renderLine($("#live-kills-line"), points(series.killDiff), { xLabel: "Minute", yLabel: "Kills", color: palette[0] });
+}
+
+function connectLive(gameId) {
+  if (state.live.source) {
+    state.live.source.close();
+    state.live.source = null;
+  }
+  state.live.gameId = gameId;
+  state.live.series = emptyLiveSeries();
+  renderLive();
+  if (!gameId) return;
+  const source = new EventSource(`/api/live/${encodeURIComponent(gameId)}/events`);
+  source.addEventListener("snapshot", (event) => {
+    state.live.series = emptyLiveSeries();
+    appendLiveFrames(state.live.series, JSON.parse(event.data));
+    renderLive();
+  });
+  source.addEventListener("frames", (event) => {
+    appendLiveFrames(state.live.series, JSON.parse(event.data));
+    renderLive();
+  });
+  source.addEventListener("end", () => {
+    source.close();
+    $("#live-status").textContent = `Game ${gameId} finished.`;
+  });
+  state.live.source = source;
+}
+
+async function loadLiveGames() {
+  const data = await fetchJson("/api/live/games");
+  const items = data.items || [];
+  const select = $("#live-game-select");
+  clear(select);
+  items.forEach((game) => {
+    const option = document.createElement("option");
+    option.value = game.gameId;
+    option.textContent = `${game.gameId}${game.finished ? " (finished)" : ""}`;
+    select.appendChild(option);
+  });
+  $("#live-status").textContent = items.length ? `${items.length} games tracked.` : "No live games.";
+  const keep = items.some((game) => game.gameId === state.live.gameId);
+  if (keep) {
+    select.value = state.live.gameId;
+  } else {
+    connectLive(items.length ? items[0].gameId : null);
+  }
+}
+
 function bindEvents() {
   setupTabs("[data-tabs='main']", ".module");
   setupTabs("[data-tabs='game']", ".sub-panel");
@@ -1475,6 +1586,8 @@ function bindEvents() {
     await loadEsportsChampions();
   });
   $("#champion-trend-btn").addEventListener("click", loadChampionTrend);
+  $("#live-game-select").addEventListener("change", (event) => connectLive(event.target.value));
+  $("#live-refresh").addEventListener("click", loadLiveGames);
 }
 
 async function init() {
@@ -1485,8 +1598,9 @@ async function init() {
   await loadPlayers();
   setStatus("Loading esports data...");
   await loadEsportsMeta();
+  await loadLiveGames();
   await refreshPipelineStatus();
-  setInterval(refreshPipelineStatus, 5000);
+  watchPipelineStatus();
   setStatus("Ready");
 }
 
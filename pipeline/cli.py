@@ -1,46 +1,136 @@
 import argparse
 import os
+import time
+from typing import Dict, List
 
 from .config import load_config
 from .ddragon import update_ddragon
 from .esports import update_esports
+from .jobs import run_job
+from .livestats import update_livestats
 from .lolapi import update_lolapi
+from .lolapi_index import rebuild_lolapi_index
+from .match_store import migrate_legacy_matches
 from .match_v5 import update_match_v5
 from .oracle_elixir import update_oracle_elixir
+from .oracle_ingest import ingest_oracle_elixir
+from .packstore import compact_packs
+from .runner import Step, format_summary, run_steps
+from .storage import configure_storage, recompress_tree
+
+
+def _with_section(config: Dict, section: str, **values) -> Dict:
+    return {**config, section: {**config.get(section, {}), **values}}
+
+
+def _all_steps(config: Dict, data_dir: str, meta_dir: str, force: bool) -> List[Step]:
+    # Sources hit different hosts and write disjoint directories, so they only
+    # wait on their own inputs, each paced by its own limiter (ratelimit.py).
+    # There is no lolapi-index step: lolapi indexes each match as it lands, and
+    # `python -m pipeline lolapi-index` remains for a full rebuild. Oracle's
+    # gameid index and rollups are rebuilt by the oracle-ingest step.
+    pipeline_cfg = config.get("pipeline", {})
+    enabled = pipeline_cfg.get("steps") or ["ddragon", "esports", "livestats", "lolapi", "oracle", "oracle-ingest"]
+    if int(pipeline_cfg.get("workers") or 4) > 1:
+        # Carriage-return progress lines from concurrent steps would overwrite
+        # each other; the runner prints when each step starts and ends.
+        config = _with_section(config, "esports", progress=False)
+        config = _with_section(config, "livestats", progress=False)
+    if not config.get("oracle_elixir", {}).get("ingest", True):
+        enabled = [name for name in enabled if name != "oracle-ingest"]
+    oracle_config = config
+    if "oracle-ingest" in enabled:
+        # Ingest runs as its own step so it shows up separately in the summary.
+        oracle_config = _with_section(config, "oracle_elixir", ingest=False)
+    steps = [
+        Step("ddragon", lambda: update_ddragon(config, data_dir, meta_dir)),
+        Step("esports", lambda: update_esports(config, data_dir, meta_dir)),
+        Step("livestats", lambda: update_livestats([], config, data_dir, meta_dir), after=["esports"]),
+        Step("lolapi", lambda: update_lolapi(config, data_dir, meta_dir)),
+        Step("oracle", lambda: update_oracle_elixir(oracle_config, data_dir, meta_dir)),
+        Step("oracle-ingest", lambda: ingest_oracle_elixir(config, data_dir, meta_dir, force=force), after=["oracle"]),
+    ]
+    return [step for step in steps if step.name in enabled]
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="LoL data update pipeline")
-    parser.add_argument("task", choices=["ddragon", "match", "lolapi", "esports", "oracle", "all"])
+    parser.add_argument("task", choices=["ddragon", "match", "lolapi", "esports", "livestats", "oracle", "oracle-ingest", "lolapi-index", "compress", "compact", "job", "all"])
     parser.add_argument("--config", default="config.json")
     parser.add_argument("--data-dir", default="data")
     parser.add_argument("--meta-dir", default="data/meta")
+    parser.add_argument("--force", action="store_true", help="rebuild derived files even if they look fresh")
+    parser.add_argument("--backfill", action="store_true", help="livestats (and all): walk every game frame by frame")
+    parser.add_argument("--job-id", type=int, help="job: id of the queued job in meta/jobs.sqlite to run")
     args = parser.parse_args()
 
     config = load_config(args.config)
+    configure_storage(config)
     os.makedirs(args.data_dir, exist_ok=True)
     os.makedirs(args.meta_dir, exist_ok=True)
 
-    if args.task in ("ddragon", "all"):
+    if args.task == "job":
+        if args.job_id is None:
+            parser.error("job requires --job-id")
+        run_job(args.job_id, config, args.data_dir, args.meta_dir)
+        return
+
+    if args.backfill:
+        config["livestats"] = {**config.get("livestats", {}), "backfill": True}
+
+    if args.task == "all":
+        started = time.monotonic()
+        workers = int(config.get("pipeline", {}).get("workers") or 4)
+        results = run_steps(_all_steps(config, args.data_dir, args.meta_dir, args.force), workers=workers)
+        print(format_summary(results, time.monotonic() - started))
+        if any(result["status"] != "success" for result in results):
+            raise SystemExit(1)
+        return
+
+    if args.task == "ddragon":
         update_ddragon(config, args.data_dir, args.meta_dir)
 
     if args.task == "lolapi":
         update_lolapi(config, args.data_dir, args.meta_dir)
 
+    if args.task == "lolapi-index":
+        count = rebuild_lolapi_index(args.data_dir, args.meta_dir)
+        print(f"Indexed {count} matches")
+
+    if args.task == "compress":
+        storage_cfg = config.get("storage", {})
+        stats = recompress_tree(
+            os.path.join(args.data_dir, "raw"),
+            storage_cfg.get("compression") or "none",
+            storage_cfg.get("level"),
+        )
+        print(
+            f"Rewrote {stats['rewritten']} of {stats['files']} JSON files: "
+            f"{stats['bytes_before']} -> {stats['bytes_after']} bytes"
+        )
+
+    if args.task == "compact":
+        migrated = migrate_legacy_matches(args.data_dir)
+        if migrated:
+            print(f"Moved {migrated} matches and timelines into the shared match store")
+        counts = compact_packs(args.data_dir)
+        for namespace, moved in counts.items():
+            print(f"Packed {moved} files into {namespace}")
+
     if args.task == "match":
         update_match_v5(config, args.data_dir, args.meta_dir)
 
-    if args.task in ("esports", "all"):
+    if args.task == "esports":
         update_esports(config, args.data_dir, args.meta_dir)
 
-    if args.task == "all":
-        update_lolapi(config, args.data_dir, args.meta_dir)
+    if args.task == "livestats":
+        update_livestats([], config, args.data_dir, args.meta_dir)
 
     if args.task == "oracle":
         update_oracle_elixir(config, args.data_dir, args.meta_dir)
 
-    if args.task == "all":
-        update_oracle_elixir(config, args.data_dir, args.meta_dir)
+    if args.task == "oracle-ingest":
+        ingest_oracle_elixir(config, args.data_dir, args.meta_dir, force=args.force)
 
 
 if __name__ == "__main__":
@@ -7,6 +7,10 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "region": "na",
         "locale": "en_US",
         "runes_path": "runesReforged.json",
+        "workers": 4,
+        "champion_full": False,
+        "history_versions": 0,
+        "rate_limits": "50:1",
     },
     "riot": {
         "platform": "na1",
@@ -18,7 +22,9 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "seed_puuids": [],
         "seed_leagues": ["challenger", "grandmaster", "master"],
         "matches_per_seed": 10,
-        "request_sleep_s": 0.2,
+        "rate_limits": "20:1,100:120",
+        "rate_limit_margin": 0,
+        "workers": 1,
         "fetch_timeline": False,
         "account_regions": ["americas", "europe", "asia"],
     },
@@ -30,10 +36,50 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "recent_days": 90,
         "state_flush_every": 50,
         "timeout_s": 40,
+        "workers": 4,
+        "rate_limits": "20:1",
+    },
+    "livestats": {
+        "league_slugs": None,
+        "progress": True,
+        "skip_empty": True,
+        "backfill": False,
+        "workers": 8,
+        "step_s": 10,
+        "max_pages": 1080,
+        "rate_limits": "20:1",
+    },
+    "live": {
+        "enabled": False,
+        "league_slugs": None,
+        "min_interval_s": 5,
+        "max_interval_s": 60,
+        "backoff": 1.5,
+        "refresh_s": 60,
+        "lag_s": 60,
+        "max_frames": 20000,
     },
     "oracle_elixir": {
         "keep_tmp": False,
         "out_dir": None,
+        "ingest": True,
+    },
+    "pipeline": {
+        "workers": 4,
+        "steps": ["ddragon", "esports", "livestats", "lolapi", "oracle", "oracle-ingest"],
+    },
+    "storage": {
+        "compression": "none",
+        "level": None,
+        "packs": False,
+        "segment_mb": 256,
+    },
+    "server": {
+        "response_cache_mb": 64,
+        "oracle_workers": None,
+        "warmup": True,
+        "warmup_years": 1,
+        "job_poll_s": 1,
     },
 }
 
@@ -1,48 +1,105 @@
 import time
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
-from .http import http_get_json
-from .storage import write_json, update_state
+from .http import http_get_json, http_get_json_if_changed
+from .progress import current_progress
+from .ratelimit import configure_source_limiter, source_limiter
+from .storage import json_exists, read_json, update_state, write_raw_json
+
+# versions.json and realms change in place and are fetched conditionally with
+# the ETag / Last-Modified kept in ddragon_state.json. Files under
+# /cdn/{version}/ never change once published, so any file already on disk is
+# skipped without a request.
 
 
 def _ddragon_base() -> str:
     return "https://ddragon.leagueoflegends.com"
 
 
+def _versions_url() -> str:
+    return f"{_ddragon_base()}/api/versions.json"
+
+
+def _realms_url(region: str) -> str:
+    return f"{_ddragon_base()}/realms/{region}.json"
+
+
 def fetch_versions() -> List[str]:
-    url = f"{_ddragon_base()}/api/versions.json"
-    return http_get_json(url)
+    return http_get_json(_versions_url(), limiter=source_limiter("ddragon"))
 
 
 def fetch_realms(region: str) -> Dict:
-    url = f"{_ddragon_base()}/realms/{region}.json"
-    return http_get_json(url)
+    return http_get_json(_realms_url(region), limiter=source_limiter("ddragon"))
 
 
 def fetch_raw(version: str, locale: str, path: str) -> Dict:
     url = f"{_ddragon_base()}/cdn/{version}/data/{locale}/{path}"
-    return http_get_json(url)
+    return http_get_json(url, limiter=source_limiter("ddragon"))
 
 
-def update_ddragon(config: Dict, data_dir: str, meta_dir: str) -> None:
-    versions = fetch_versions()
-    latest_version = versions[0] if versions else None
-    if not latest_version:
-        raise RuntimeError("No versions returned from Data Dragon")
+def _fetch_if_changed(url: str, validators: Dict[str, Dict[str, str]]) -> Optional[Any]:
+    # None when the server copy matches the one recorded in validators.
+    data, fresh = http_get_json_if_changed(url, validators.get(url), limiter=source_limiter("ddragon"))
+    if data is not None:
+        validators[url] = fresh
+    return data
+
+
+def _version_dir(data_dir: str, version: str, locale: str) -> str:
+    return f"{data_dir}/raw/ddragon/{version}/{locale}"
+
+
+def _sync_file(data_dir: str, version: str, locale: str, name: str) -> None:
+    out_path = f"{_version_dir(data_dir, version, locale)}/{name}"
+    if not json_exists(out_path):
+        write_raw_json(out_path, fetch_raw(version, locale, name))
+    current_progress().advance()
+
+
+def _sync_version(
+    executor: ThreadPoolExecutor,
+    data_dir: str,
+    version: str,
+    locale: str,
+    files: List[str],
+    champion_full: bool,
+) -> None:
+    for _ in executor.map(lambda name: _sync_file(data_dir, version, locale, name), files):
+        pass
+    if not champion_full:
+        return
+    champions = read_json(f"{_version_dir(data_dir, version, locale)}/champion.json", {})
+    names = [f"champion/{champ_id}.json" for champ_id in sorted(champions.get("data", {}))]
+    for _ in executor.map(lambda name: _sync_file(data_dir, version, locale, name), names):
+        pass
+
 
+def update_ddragon(config: Dict, data_dir: str, meta_dir: str) -> None:
+    configure_source_limiter("ddragon", config)
     region = config["ddragon"].get("region", "na")
     locale = config["ddragon"].get("locale", "en_US")
     runes_path = config["ddragon"].get("runes_path", "runesReforged.json")
+    workers = max(1, int(config["ddragon"].get("workers") or 4))
+    champion_full = bool(config["ddragon"].get("champion_full", False))
+    history_versions = max(0, int(config["ddragon"].get("history_versions") or 0))
 
+    progress = current_progress()
+    progress.stage("versions")
     state_path = f"{meta_dir}/ddragon_state.json"
-    state = update_state(state_path, {"last_checked_time": int(time.time())})
-    if state.get("last_version_downloaded") == latest_version:
-        return
-
-    try:
-        realms = fetch_realms(region)
-    except Exception:
-        realms = {}
+    state = read_json(state_path, {})
+    validators: Dict[str, Dict[str, str]] = dict(state.get("validators", {}))
+
+    versions = _fetch_if_changed(_versions_url(), validators)
+    if versions is None:
+        versions = state.get("versions") or []
+    if not versions:
+        # No cached list to fall back on; fetch it unconditionally.
+        validators.pop(_versions_url(), None)
+        versions = _fetch_if_changed(_versions_url(), validators) or []
+    latest_version = versions[0] if versions else None
+    if not latest_version:
+        raise RuntimeError("No versions returned from Data Dragon")
 
     files = [
         "champion.json",
@@ -50,15 +107,44 @@ def update_ddragon(config: Dict, data_dir: str, meta_dir: str) -> None:
         "summoner.json",
         runes_path,
     ]
+    wanted = versions[: history_versions + 1]
+    sync_key = {"locale": locale, "files": files, "champion_full": champion_full}
+    if (
+        state.get("last_version_downloaded") == latest_version
+        and state.get("synced_versions") == wanted
+        and state.get("sync_key") == sync_key
+        and json_exists(f"{_version_dir(data_dir, latest_version, locale)}/realms_{region}.json")
+    ):
+        try:
+            realms = _fetch_if_changed(_realms_url(region), validators)
+        except Exception:
+            realms = None
+        if realms is not None:
+            write_raw_json(f"{_version_dir(data_dir, latest_version, locale)}/realms_{region}.json", realms)
+        update_state(state_path, {"validators": validators, "last_checked_time": int(time.time())})
+        return
+
+    # A new version directory needs its own realms copy, so skip the validators.
+    validators.pop(_realms_url(region), None)
+    try:
+        realms = _fetch_if_changed(_realms_url(region), validators) or {}
+    except Exception:
+        realms = {}
 
-    for name in files:
-        raw = fetch_raw(latest_version, locale, name)
-        out_path = f"{data_dir}/raw/ddragon/{latest_version}/{locale}/{name}"
-        write_json(out_path, raw)
+    progress.stage("files")
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ddragon", initializer=progress.bind)
+    try:
+        for version in wanted:
+            _sync_version(executor, data_dir, version, locale, files, champion_full)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
-    write_json(f"{data_dir}/raw/ddragon/{latest_version}/{locale}/realms_{region}.json", realms)
+    write_raw_json(f"{_version_dir(data_dir, latest_version, locale)}/realms_{region}.json", realms)
     update_state(state_path, {
         "last_version_downloaded": latest_version,
         "last_checked_time": int(time.time()),
+        "versions": versions,
+        "synced_versions": wanted,
+        "sync_key": sync_key,
+        "validators": validators,
     })
-
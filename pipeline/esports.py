@@ -1,11 +1,15 @@
-import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Tuple
 
 from .config import env_or_default
 from .http import http_get_json
-from .storage import ensure_dir, read_json, update_state, write_json
+from .packstore import object_exists, save_object
+from .progress import current_progress
+from .ratelimit import configure_source_limiter, source_limiter
+from .state_store import open_state_store
+from .storage import ensure_dir, write_json, write_raw_json
 
 
 def _esports_headers() -> Dict[str, str]:
@@ -21,17 +25,31 @@ def _gw_url(path: str) -> str:
 
 def fetch_leagues(hl: str, timeout: int = 40) -> Dict:
     url = _gw_url("getLeagues")
-    return http_get_json(url, headers=_esports_headers(), params={"hl": hl}, timeout=timeout)
+    return http_get_json(
+        url, headers=_esports_headers(), params={"hl": hl}, timeout=timeout, limiter=source_limiter("esports")
+    )
 
 
 def fetch_schedule(hl: str, league_id: str, timeout: int = 40) -> Dict:
     url = _gw_url("getSchedule")
-    return http_get_json(url, headers=_esports_headers(), params={"hl": hl, "leagueId": league_id}, timeout=timeout)
+    return http_get_json(
+        url,
+        headers=_esports_headers(),
+        params={"hl": hl, "leagueId": league_id},
+        timeout=timeout,
+        limiter=source_limiter("esports"),
+    )
 
 
 def fetch_event_details(hl: str, event_id: str, timeout: int = 40) -> Dict:
     url = _gw_url("getEventDetails")
-    return http_get_json(url, headers=_esports_headers(), params={"hl": hl, "id": event_id}, timeout=timeout)
+    return http_get_json(
+        url,
+        headers=_esports_headers(),
+        params={"hl": hl, "id": event_id},
+        timeout=timeout,
+        limiter=source_limiter("esports"),
+    )
 
 
 def _resolve_league_ids(leagues_data: Dict, league_ids: List[str], league_slugs: List[str]) -> List[str]:
@@ -56,13 +74,15 @@ def _parse_start_time(value: Optional[str]) -> Optional[datetime]:
 
 
 def update_esports(config: Dict, data_dir: str, meta_dir: str) -> List[str]:
+    configure_source_limiter("esports", config)
     hl = config["esports"].get("hl", "en-US")
     league_ids = config["esports"].get("leagues", [])
     league_slugs = config["esports"].get("league_slugs", [])
-    progress = bool(config["esports"].get("progress", True))
+    show_progress = bool(config["esports"].get("progress", True))
     recent_days = config["esports"].get("recent_days")
     flush_every = int(config["esports"].get("state_flush_every", 50))
     timeout_s = int(config["esports"].get("timeout_s", 40))
+    workers = max(1, int(config["esports"].get("workers") or 4))
     log_path = f"{data_dir}/logs/esports.log"
     ensure_dir(f"{data_dir}/logs")
 
@@ -71,26 +91,32 @@ def update_esports(config: Dict, data_dir: str, meta_dir: str) -> List[str]:
         with open(log_path, "a", encoding="utf-8") as f:
             f.write(f"[{timestamp}] {message}\n")
 
-    state_path = f"{meta_dir}/esports_state.json"
-    state = read_json(state_path, {})
-    seen_event_ids: Set[str] = set(state.get("seen_event_ids", []))
-    seen_game_ids: Set[str] = set(state.get("seen_game_ids", []))
+    store = open_state_store(meta_dir)
+    store.import_json_state(
+        "esports",
+        f"{meta_dir}/esports_state.json",
+        {"seen_event_ids": "esports.event", "seen_game_ids": "esports.game"},
+    )
 
+    progress = current_progress()
+    progress.stage("leagues")
     leagues = fetch_leagues(hl, timeout=timeout_s)
-    write_json(f"{data_dir}/raw/esports_gw/leagues/leagues.json", leagues)
+    write_raw_json(f"{data_dir}/raw/esports_gw/leagues/leagues.json", leagues)
     league_ids = _resolve_league_ids(leagues, league_ids, league_slugs)
 
     event_ids: List[str] = []
     cutoff = None
     if isinstance(recent_days, (int, float)) and recent_days > 0:
         cutoff = datetime.now(tz=timezone.utc).timestamp() - (float(recent_days) * 86400.0)
+    progress.stage("schedules", total=len(league_ids))
     for league_id in league_ids:
+        progress.advance()
         try:
             schedule = fetch_schedule(hl, league_id, timeout=timeout_s)
         except Exception as exc:
             log(f"schedule failed league_id={league_id} err={type(exc).__name__}")
             continue
-        write_json(f"{data_dir}/raw/esports_gw/schedules/{league_id}.json", schedule)
+        write_raw_json(f"{data_dir}/raw/esports_gw/schedules/{league_id}.json", schedule)
         events = schedule.get("data", {}).get("schedule", {}).get("events", [])
         for event in events:
             start_time = _parse_start_time(event.get("startTime"))
@@ -105,53 +131,67 @@ def update_esports(config: Dict, data_dir: str, meta_dir: str) -> List[str]:
     unique_event_ids = []
     for eid in dict.fromkeys(event_ids):
         event_path = f"{data_dir}/raw/esports_gw/events/{eid}.json"
-        if eid in seen_event_ids and os.path.exists(event_path):
+        if store.has("esports.event", eid) and object_exists(data_dir, "esports_gw/events", eid, event_path):
             continue
         unique_event_ids.append(eid)
     total = len(unique_event_ids)
-    for idx, event_id in enumerate(unique_event_ids, start=1):
-        if progress:
-            print(f"\rFetching events {idx}/{total}", end="" if idx < total else "\n")
+
+    def fetch_event(event_id: str) -> Tuple[Optional[Dict], Optional[Exception]]:
         try:
             details = fetch_event_details(hl, event_id, timeout=timeout_s)
         except Exception as exc:
-            log(f"event failed event_id={event_id} err={type(exc).__name__}")
-            continue
-        write_json(f"{data_dir}/raw/esports_gw/events/{event_id}.json", details)
-        seen_event_ids.add(event_id)
-
-        event = details.get("data", {}).get("event", {})
-        league_slug = event.get("league", {}).get("slug", "unknown")
-        games = event.get("match", {}).get("games", [])
-        for game in games:
-            game_id = game.get("id") or game.get("gameId")
-            state = game.get("state")
-            if state not in ("completed", "inProgress"):
+            return None, exc
+        save_object(
+            data_dir,
+            "esports_gw/events",
+            event_id,
+            f"{data_dir}/raw/esports_gw/events/{event_id}.json",
+            details,
+        )
+        return details, None
+
+    # Workers fetch and write the event files; results are merged here in
+    # event order, so progress, state and esports_games.json match a serial run.
+    progress.stage("events", total=total)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="esports", initializer=progress.bind)
+    try:
+        results = executor.map(fetch_event, unique_event_ids)
+        for idx, (event_id, (details, error)) in enumerate(zip(unique_event_ids, results), start=1):
+            progress.advance()
+            if show_progress:
+                print(f"\rFetching events {idx}/{total}", end="" if idx < total else "\n")
+            if error is not None:
+                log(f"event failed event_id={event_id} err={type(error).__name__}")
                 continue
-            if game_id and str(game_id) not in seen_game_ids:
-                new_game_ids.append(str(game_id))
-                seen_game_ids.add(str(game_id))
-            if game_id:
-                games_meta[str(game_id)] = {
-                    "gameId": str(game_id),
-                    "eventId": str(event_id),
-                    "leagueSlug": league_slug,
-                    "state": state or "",
-                }
-        if flush_every > 0 and idx % flush_every == 0:
-            update_state(state_path, {
-                "seen_event_ids": sorted(seen_event_ids),
-                "seen_game_ids": sorted(seen_game_ids),
-                "last_schedule_time": int(time.time()),
-            })
+            store.add("esports.event", [event_id])
+
+            event = details.get("data", {}).get("event", {})
+            league_slug = event.get("league", {}).get("slug", "unknown")
+            games = event.get("match", {}).get("games", [])
+            for game in games:
+                game_id = game.get("id") or game.get("gameId")
+                state = game.get("state")
+                if state not in ("completed", "inProgress"):
+                    continue
+                if game_id and not store.has("esports.game", str(game_id)):
+                    new_game_ids.append(str(game_id))
+                    store.add("esports.game", [str(game_id)])
+                if game_id:
+                    games_meta[str(game_id)] = {
+                        "gameId": str(game_id),
+                        "eventId": str(event_id),
+                        "leagueSlug": league_slug,
+                        "state": state or "",
+                    }
+            if flush_every > 0 and idx % flush_every == 0:
+                store.update_meta("esports", {"last_schedule_time": int(time.time())})
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
     if games_meta:
         write_json(f"{meta_dir}/esports_games.json", list(games_meta.values()))
 
-    update_state(state_path, {
-        "seen_event_ids": sorted(seen_event_ids),
-        "seen_game_ids": sorted(seen_game_ids),
-        "last_schedule_time": int(time.time()),
-    })
+    store.update_meta("esports", {"last_schedule_time": int(time.time())})
+    store.close()
 
     return new_game_ids
@@ -1,10 +1,15 @@
+import http.client
 import json
-import socket
+import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
-from typing import Any, Dict, Optional
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from .progress import record_request
+from .ratelimit import RateLimiter
 
 
 class HttpError(Exception):
@@ -14,6 +19,19 @@ class HttpError(Exception):
         self.body = body
 
 
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip",
+    "Connection": "keep-alive",
+    "User-Agent": "VisLOL-pipeline",
+}
+MAX_REDIRECTS = 5
+_READ_CHUNK = 64 * 1024
+
+# One keep-alive connection per (scheme, host) and thread; http.client
+# connections are not safe to share between threads.
+_local = threading.local()
+
+
 def _build_url(url: str, params: Optional[Dict[str, Any]]) -> str:
     if not params:
         return url
@@ -22,6 +40,161 @@ def _build_url(url: str, params: Optional[Dict[str, Any]]) -> str:
     return f"{url}{joiner}{query}"
 
 
+def _connections() -> Dict[Tuple[str, str], http.client.HTTPConnection]:
+    pool = getattr(_local, "connections", None)
+    if pool is None:
+        pool = {}
+        _local.connections = pool
+    return pool
+
+
+def _connection(scheme: str, netloc: str, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+    pool = _connections()
+    conn = pool.get((scheme, netloc))
+    if conn is not None:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, conn.sock is not None
+    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    conn = cls(netloc, timeout=timeout)
+    pool[(scheme, netloc)] = conn
+    return conn, False
+
+
+def _drop_connection(scheme: str, netloc: str) -> None:
+    conn = _connections().pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def close_connections() -> None:
+    for key in list(_connections()):
+        _drop_connection(*key)
+
+
+def _read_body(resp: http.client.HTTPResponse) -> bytes:
+    encoding = (resp.headers.get("Content-Encoding") or "").lower()
+    if encoding not in ("gzip", "deflate"):
+        return resp.read()
+    # Decompress while reading instead of holding the compressed copy too.
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS)
+    parts = []
+    while True:
+        chunk = resp.read(_READ_CHUNK)
+        if not chunk:
+            break
+        parts.append(decoder.decompress(chunk))
+    parts.append(decoder.flush())
+    return b"".join(parts)
+
+
+def _uses_proxy(scheme: str, host: str) -> bool:
+    proxies = urllib.request.getproxies()
+    return scheme in proxies and not urllib.request.proxy_bypass(host)
+
+
+def _urllib_request(url: str, headers: Dict[str, str], timeout: float) -> Tuple[int, Dict[str, str], bytes]:
+    # Proxied requests keep going through urllib, which knows the proxy settings.
+    req = urllib.request.Request(url, headers={k: v for k, v in headers.items() if k != "Connection"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status, {k.lower(): v for k, v in resp.headers.items()}, _read_body(resp)
+    except urllib.error.HTTPError as e:
+        body = _read_body(e) if e.fp else b""
+        return e.code, {k.lower(): v for k, v in e.headers.items()}, body
+
+
+def http_request(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 20,
+) -> Tuple[int, Dict[str, str], bytes]:
+    # Single GET without retries: (status, lower-cased headers, decoded body).
+    send_headers = dict(DEFAULT_HEADERS)
+    send_headers.update(headers or {})
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        if _uses_proxy(parts.scheme, parts.hostname or ""):
+            status, resp_headers, body = _urllib_request(url, send_headers, timeout)
+        else:
+            status, resp_headers, body = _pooled_request(parts, send_headers, timeout)
+        location = resp_headers.get("location")
+        record_request(len(body))
+        if status in (301, 302, 303, 307, 308) and location:
+            url = urllib.parse.urljoin(url, location)
+            continue
+        return status, resp_headers, body
+    raise HttpError(status, f"too many redirects for {url}")
+
+
+def _pooled_request(
+    parts: urllib.parse.SplitResult,
+    headers: Dict[str, str],
+    timeout: float,
+) -> Tuple[int, Dict[str, str], bytes]:
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    while True:
+        conn, reused = _connection(parts.scheme, parts.netloc, timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = _read_body(resp)
+        except (http.client.HTTPException, OSError):
+            _drop_connection(parts.scheme, parts.netloc)
+            # The server may have closed an idle keep-alive socket; retry once on a fresh one.
+            if reused:
+                continue
+            raise
+        if resp.will_close:
+            _drop_connection(parts.scheme, parts.netloc)
+        return resp.status, {k.lower(): v for k, v in resp.getheaders()}, body
+
+
+def _get_with_retries(
+    full_url: str,
+    headers: Optional[Dict[str, str]],
+    timeout: float,
+    max_retries: int,
+    retry_backoff: float,
+    limiter: Optional[RateLimiter],
+    limit_key: Optional[str],
+) -> Tuple[int, Dict[str, str], bytes]:
+    host = urllib.parse.urlsplit(full_url).netloc
+
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire(host, limit_key)
+        try:
+            status, resp_headers, raw = http_request(full_url, headers=headers, timeout=timeout)
+        except (OSError, http.client.HTTPException):
+            # Timeouts, refused or reset connections and malformed responses.
+            if attempt < max_retries:
+                time.sleep(retry_backoff ** attempt)
+                continue
+            raise
+        if limiter is not None:
+            limiter.update(host, limit_key, resp_headers)
+        body = raw.decode("utf-8", errors="replace") if status >= 400 else ""
+        if status == 429 and attempt < max_retries:
+            retry_after = resp_headers.get("retry-after")
+            sleep_s = int(retry_after) if retry_after and retry_after.isdigit() else 1
+            if limiter is not None:
+                # The limiter holds back every caller of the exhausted scope.
+                limiter.penalize(host, limit_key, sleep_s, resp_headers.get("x-rate-limit-type"))
+            else:
+                time.sleep(sleep_s)
+            continue
+        if 500 <= status < 600 and attempt < max_retries:
+            time.sleep(retry_backoff ** attempt)
+            continue
+        if status >= 400:
+            raise HttpError(status, body)
+        return status, resp_headers, raw
+
+
 def http_get_json(
     url: str,
     headers: Optional[Dict[str, str]] = None,
@@ -29,31 +202,39 @@ def http_get_json(
     timeout: int = 20,
     max_retries: int = 3,
     retry_backoff: float = 2.0,
+    limiter: Optional[RateLimiter] = None,
+    limit_key: Optional[str] = None,
 ) -> Any:
     full_url = _build_url(url, params)
-    req = urllib.request.Request(full_url, headers=headers or {})
+    _, _, raw = _get_with_retries(full_url, headers, timeout, max_retries, retry_backoff, limiter, limit_key)
+    return json.loads(raw)
 
-    for attempt in range(max_retries + 1):
-        try:
-            with urllib.request.urlopen(req, timeout=timeout) as resp:
-                body = resp.read().decode("utf-8")
-                if resp.status >= 400:
-                    raise HttpError(resp.status, body)
-                return json.loads(body)
-        except urllib.error.HTTPError as e:
-            status = getattr(e, "code", 0)
-            body = e.read().decode("utf-8") if e.fp else ""
-            if status == 429:
-                retry_after = e.headers.get("Retry-After")
-                sleep_s = int(retry_after) if retry_after and retry_after.isdigit() else 1
-                time.sleep(sleep_s)
-                continue
-            if 500 <= status < 600 and attempt < max_retries:
-                time.sleep(retry_backoff ** attempt)
-                continue
-            raise HttpError(status, body) from e
-        except (TimeoutError, socket.timeout, urllib.error.URLError):
-            if attempt < max_retries:
-                time.sleep(retry_backoff ** attempt)
-                continue
-            raise
+
+def http_get_json_if_changed(
+    url: str,
+    validators: Optional[Dict[str, str]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: int = 20,
+    max_retries: int = 3,
+    retry_backoff: float = 2.0,
+    limiter: Optional[RateLimiter] = None,
+) -> Tuple[Optional[Any], Dict[str, str]]:
+    # Conditional GET: (None, validators) on 304, else (data, new validators).
+    # validators holds the "etag" / "last_modified" of the copy the caller has.
+    send_headers = dict(headers or {})
+    validators = validators or {}
+    if validators.get("etag"):
+        send_headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        send_headers["If-Modified-Since"] = validators["last_modified"]
+    status, resp_headers, raw = _get_with_retries(
+        url, send_headers, timeout, max_retries, retry_backoff, limiter, None
+    )
+    if status == 304:
+        return None, validators
+    fresh = {}
+    if resp_headers.get("etag"):
+        fresh["etag"] = resp_headers["etag"]
+    if resp_headers.get("last-modified"):
+        fresh["last_modified"] = resp_headers["last-modified"]
+    return json.loads(raw), fresh
@@ -0,0 +1,296 @@
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ddragon import update_ddragon
+from .esports import update_esports
+from .lolapi import update_lolapi
+from .oracle_elixir import update_oracle_elixir
+from .progress import add_progress_listener, remove_progress_listener, track
+
+# Pipeline runs started from the API. Each job runs in its own process
+# (`python -m pipeline job --job-id N`) and records its status, timings and
+# latest progress snapshot in meta/jobs.sqlite, which every API worker reads.
+# A partial unique index allows one active job per task across all workers.
+# Statuses: queued -> running -> success | error, or -> cancelling -> cancelled.
+# A cancelled job stays "cancelling", and so keeps its task busy, until its
+# process has actually exited.
+
+JOB_TASKS = ("ddragon", "esports", "oracle", "lolapi")
+ACTIVE_STATUSES = ("queued", "running", "cancelling")
+_ACTIVE_SQL = "('queued', 'running', 'cancelling')"
+# A queued job whose process never reported in is given up after this long.
+START_TIMEOUT_S = 120
+
+
+class JobCancelled(BaseException):
+    # Raised from the SIGTERM handler in whatever the job's main thread is
+    # running. Like KeyboardInterrupt it is not an Exception, so the pipeline's
+    # `except Exception` fallbacks (a failed schedule, a missing realm) cannot
+    # swallow it and keep the job going.
+    pass
+
+
+def jobs_db_path(meta_dir: str) -> Path:
+    return Path(meta_dir) / "jobs.sqlite"
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, task TEXT NOT NULL, params TEXT NOT NULL, "
+            "status TEXT NOT NULL, message TEXT, pid INTEGER, progress TEXT, "
+            "cancel_requested INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, "
+            "started_at REAL, finished_at REAL)"
+        )
+        index_sql = self._conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'jobs_one_active'"
+        ).fetchone()
+        if index_sql is not None and "cancelling" not in index_sql[0]:
+            # Tables created before "cancelling" existed.
+            self._conn.execute("DROP INDEX jobs_one_active")
+        self._conn.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS jobs_one_active ON jobs (task) WHERE status IN {_ACTIVE_SQL}"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_task ON jobs (task, id)")
+        self._conn.commit()
+
+    def _row(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"] or "{}")
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def create(self, task: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        # (job, created): the task's active job wins.
+        self.reap_lost()
+        with self._lock:
+            try:
+                with self._conn:
+                    cursor = self._conn.execute(
+                        "INSERT INTO jobs (task, params, status, created_at) VALUES (?, ?, 'queued', ?)",
+                        (task, json.dumps(params, ensure_ascii=False), time.time()),
+                    )
+                job_id, created = cursor.lastrowid, True
+            except sqlite3.IntegrityError:
+                job_id = self._conn.execute(
+                    f"SELECT id FROM jobs WHERE task = ? AND status IN {_ACTIVE_SQL}",
+                    (task,),
+                ).fetchone()[0]
+                created = False
+        return self.get(job_id), created
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def list(self, task: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            if task:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs WHERE task = ? ORDER BY id DESC LIMIT ?", (task, limit)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row(row) for row in rows]
+
+    def latest_by_task(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE id IN (SELECT MAX(id) FROM jobs GROUP BY task)"
+            ).fetchall()
+        return {row["task"]: self._row(row) for row in rows}
+
+    def set_pid(self, job_id: int, pid: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET pid = ? WHERE id = ?", (pid, job_id))
+
+    def mark_running(self, job_id: int, pid: int) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'running', pid = ?, started_at = ? WHERE id = ? AND status = 'queued'",
+                (pid, time.time(), job_id),
+            )
+        return cursor.rowcount == 1
+
+    def set_progress(self, job_id: int, snapshot: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET progress = ? WHERE id = ?",
+                (json.dumps(snapshot, ensure_ascii=False), job_id),
+            )
+
+    def finish(self, job_id: int, status: str, message: Optional[str] = None,
+               snapshot: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, message = ?, finished_at = ?, "
+                f"progress = COALESCE(?, progress) WHERE id = ? AND status IN {_ACTIVE_SQL}",
+                (
+                    status,
+                    message,
+                    time.time(),
+                    json.dumps(snapshot, ensure_ascii=False) if snapshot is not None else None,
+                    job_id,
+                ),
+            )
+
+    def mark_cancelling(self, job_id: int, snapshot: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'cancelling', cancel_requested = 1, progress = COALESCE(?, progress) "
+                f"WHERE id = ? AND status IN {_ACTIVE_SQL}",
+                (json.dumps(snapshot, ensure_ascii=False) if snapshot is not None else None, job_id),
+            )
+
+    def request_cancel(self, job_id: int) -> Optional[Dict[str, Any]]:
+        # A job with a live process becomes "cancelling" and is sent SIGTERM;
+        # reap_lost() records "cancelled" once the process is gone.
+        job = self.get(job_id)
+        if job is None or job["status"] not in ACTIVE_STATUSES:
+            return job
+        if _pid_alive(job["pid"]):
+            self.mark_cancelling(job_id)
+            os.kill(job["pid"], signal.SIGTERM)
+        elif job["status"] == "queued":
+            self.finish(job_id, "cancelled", "cancelled before start")
+        return self.get(job_id)
+
+    def reap_lost(self) -> None:
+        # Active jobs whose process is gone: cancelled ones are done, the rest
+        # died without recording an outcome (killed, or the host restarted)
+        # and would otherwise block their task forever.
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, status, pid, created_at, cancel_requested FROM jobs WHERE status IN {_ACTIVE_SQL}"
+            ).fetchall()
+        for row in rows:
+            if _pid_alive(row["pid"]):
+                continue
+            if row["status"] == "queued" and not row["pid"] and now - row["created_at"] < START_TIMEOUT_S:
+                continue
+            if row["status"] == "cancelling" or row["cancel_requested"]:
+                self.finish(row["id"], "cancelled", "cancelled")
+            else:
+                self.finish(row["id"], "error", "job process exited without reporting a result")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def run_task(task: str, params: Dict[str, Any], config: Dict, data_dir: str, meta_dir: str) -> None:
+    if task == "ddragon":
+        update_ddragon(config, data_dir, meta_dir)
+    elif task == "esports":
+        update_esports(config, data_dir, meta_dir)
+    elif task == "oracle":
+        update_oracle_elixir(config, data_dir, meta_dir)
+    elif task == "lolapi":
+        local_config = {**config}
+        riot_cfg = dict(local_config.get("riot", {}))
+        if params.get("riot_id"):
+            riot_cfg["seed_riot_ids"] = [params["riot_id"]]
+            riot_cfg["seed_puuids"] = []
+            riot_cfg["seed_summoner_ids"] = []
+        local_config["riot"] = riot_cfg
+        update_lolapi(local_config, data_dir, meta_dir)
+    else:
+        raise ValueError(f"unknown task: {task}")
+
+
+def _raise_cancelled(signum: int, frame: Any) -> None:
+    raise JobCancelled()
+
+
+def run_job(job_id: int, config: Dict, data_dir: str, meta_dir: str) -> None:
+    # Entry point of the job process. A cancelled job is left "cancelling";
+    # the server marks it cancelled once this process has exited.
+    store = JobStore(jobs_db_path(meta_dir))
+    job = store.get(job_id)
+    if job is None or not store.mark_running(job_id, os.getpid()):
+        store.close()
+        return
+    signal.signal(signal.SIGTERM, _raise_cancelled)
+
+    def on_progress(snapshot: Dict[str, Any]) -> None:
+        store.set_progress(job_id, snapshot)
+
+    add_progress_listener(on_progress)
+    status, message = "success", None
+    with track(job["task"]) as progress:
+        try:
+            if job["cancel_requested"]:
+                raise JobCancelled()
+            run_task(job["task"], job["params"], config, data_dir, meta_dir)
+        except JobCancelled:
+            status, message = "cancelled", "cancelled"
+        except Exception as exc:
+            status, message = "error", str(exc)
+        finally:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            remove_progress_listener(on_progress)
+            if status == "cancelled":
+                store.mark_cancelling(job_id, progress.snapshot())
+            else:
+                store.finish(job_id, status, message, progress.snapshot())
+            store.close()
+
+
+def launch_job(job_id: int, config_path: str, data_dir: str, meta_dir: str) -> subprocess.Popen:
+    # Start the job process detached from the caller's session, so it outlives
+    # an API worker restart; a thread reaps it when it exits. Output goes to
+    # logs/job-{id}.log under the data directory.
+    root = str(Path(__file__).resolve().parent.parent)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    log_dir = Path(data_dir) / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    with open(log_dir / f"job-{job_id}.log", "ab") as log_file:
+        proc = subprocess.Popen(
+            [
+                sys.executable, "-m", "pipeline", "job",
+                "--job-id", str(job_id),
+                "--config", config_path,
+                "--data-dir", data_dir,
+                "--meta-dir", meta_dir,
+            ],
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    threading.Thread(target=proc.wait, name=f"job-{job_id}-reaper", daemon=True).start()
+    return proc
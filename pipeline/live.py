@@ -0,0 +1,104 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Set
+
+from .livestats import fetch_window, load_games_meta, merge_frames, window_columns
+from .ratelimit import configure_source_limiter
+
+# Follows in-progress esports games on the livestats window feed. Each game is
+# polled on its own adaptive interval: back to min_interval_s whenever new
+# frames arrive, stretched by backoff up to max_interval_s while nothing
+# changes. Only frames newer than the last one seen are published, as a
+# columnar delta (see livestats.window_columns) plus "gameId" and "finished".
+# Without startingTime the window feed answers with the game's first frames,
+# so every poll asks for the window at the last frame seen, or at lag_s behind
+# the wall clock once caught up, rounded down to the feed's 10 s steps.
+
+Publish = Callable[[str, Dict[str, Any]], None]
+STEP_MS = 10000
+
+
+def starting_time(last_ms: int, now_ms: int, lag_ms: int) -> datetime:
+    # Window start for the next poll: on from the last frame seen, never later
+    # than the newest window the feed can serve.
+    target = now_ms - lag_ms if last_ms < 0 else min(last_ms, now_ms - lag_ms)
+    target -= target % STEP_MS
+    return datetime.fromtimestamp(target / 1000, tz=timezone.utc)
+
+
+class LivePoller:
+    def __init__(self, config: Dict, meta_dir: str, publish: Publish):
+        live_cfg = config.get("live", {})
+        # Window polls share the livestats feed limiter (livestats.rate_limits).
+        configure_source_limiter("livestats", config)
+        self.meta_dir = meta_dir
+        self.publish = publish
+        self.min_interval_s = float(live_cfg.get("min_interval_s") or 5)
+        self.max_interval_s = max(self.min_interval_s, float(live_cfg.get("max_interval_s") or 60))
+        self.backoff = max(1.0, float(live_cfg.get("backoff") or 1.5))
+        self.refresh_s = float(live_cfg.get("refresh_s") or 60)
+        self.lag_ms = int(float(live_cfg.get("lag_s") or 60) * 1000)
+        self.league_slugs = live_cfg.get("league_slugs")
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # esports_games.json keeps saying inProgress until esports runs again.
+        self._finished: Set[str] = set()
+        self.intervals: Dict[str, float] = {}
+
+    def in_progress_games(self) -> Dict[str, str]:
+        # gameId -> league slug for games esports last saw in progress.
+        games = {}
+        for game in load_games_meta(self.meta_dir):
+            if game.get("state") != "inProgress" or not game.get("gameId"):
+                continue
+            if self.league_slugs and game.get("leagueSlug") not in self.league_slugs:
+                continue
+            games[game["gameId"]] = game.get("leagueSlug") or "unknown"
+        return games
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        stop = stop or asyncio.Event()
+        try:
+            while not stop.is_set():
+                for game_id in self.in_progress_games():
+                    if game_id in self._finished:
+                        continue
+                    task = self._tasks.get(game_id)
+                    if task is None or task.done():
+                        self._tasks[game_id] = asyncio.create_task(self.follow(game_id, stop))
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.refresh_s)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in self._tasks.values():
+                task.cancel()
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def follow(self, game_id: str, stop: asyncio.Event) -> None:
+        last_ms = -1
+        interval = self.min_interval_s
+        while not stop.is_set():
+            self.intervals[game_id] = interval
+            start = starting_time(last_ms, int(time.time() * 1000), self.lag_ms)
+            try:
+                window = await asyncio.to_thread(fetch_window, game_id, start)
+            except Exception:
+                window = None
+            frames = [(stamp, frame) for stamp, frame in merge_frames([window or {}]) if stamp > last_ms]
+            if frames:
+                last_ms = frames[-1][0]
+                finished = any(frame.get("gameState") == "finished" for _, frame in frames)
+                self.publish(game_id, {"gameId": game_id, "finished": finished, **window_columns(frames)})
+                if finished:
+                    self._finished.add(game_id)
+                    break
+                interval = self.min_interval_s
+            else:
+                interval = min(interval * self.backoff, self.max_interval_s)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+        self.intervals.pop(game_id, None)
+
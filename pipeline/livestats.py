@@ -1,20 +1,50 @@
 import time
-from typing import Dict, List, Set
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
 from .http import http_get_json
-from .storage import ensure_dir, read_json, update_state, write_json
+from .progress import current_progress
+from .ratelimit import configure_source_limiter, source_limiter
+from .state_store import open_state_store
+from .storage import ensure_dir, read_json, write_raw_json
+
+# Backfill walks a game through window/ and details/ with startingTime in
+# step_s increments, a batch of pages at a time, until the feed reports the
+# game finished or runs out of frames. Overlapping pages are merged by frame
+# timestamp and stored as one frames.json per game:
+#   {"gameId", "metadata",
+#    "window": {"timestamps": [ms], "gameState": [...],
+#               "blueTeam": {field: [...]}, "redTeam": {field: [...]},
+#               "participants": {participantId: {field: [...]}}},
+#    "details": {"timestamps": [ms], "participants": {participantId: {field: [...]}}}}
+# Every column is aligned with its timestamps; a value missing from a frame is null.
 
 
 def _livestats_url(path: str) -> str:
     return f"https://feed.lolesports.com/livestats/v1/{path}"
 
 
-def fetch_window(game_id: str) -> Dict:
-    return http_get_json(_livestats_url(f"window/{game_id}"))
+def _starting_time_params(starting_time: Optional[datetime]) -> Optional[Dict[str, str]]:
+    if starting_time is None:
+        return None
+    return {"startingTime": starting_time.strftime("%Y-%m-%dT%H:%M:%S.000Z")}
+
+
+def fetch_window(game_id: str, starting_time: Optional[datetime] = None) -> Dict:
+    return http_get_json(
+        _livestats_url(f"window/{game_id}"),
+        params=_starting_time_params(starting_time),
+        limiter=source_limiter("livestats"),
+    )
 
 
-def fetch_details(game_id: str) -> Dict:
-    return http_get_json(_livestats_url(f"details/{game_id}"))
+def fetch_details(game_id: str, starting_time: Optional[datetime] = None) -> Dict:
+    return http_get_json(
+        _livestats_url(f"details/{game_id}"),
+        params=_starting_time_params(starting_time),
+        limiter=source_limiter("livestats"),
+    )
 
 
 def _window_has_data(window: Dict) -> bool:
@@ -31,17 +61,161 @@ def _window_has_data(window: Dict) -> bool:
     return False
 
 
-def _load_games_meta(meta_dir: str) -> List[Dict]:
+def load_games_meta(meta_dir: str) -> List[Dict]:
     path = f"{meta_dir}/esports_games.json"
     data = read_json(path, [])
     return data if isinstance(data, list) else []
 
 
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _timestamp_ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+def merge_frames(pages: List[Dict]) -> List[Tuple[int, Dict]]:
+    # Pages overlap; keep one frame per timestamp, in time order.
+    frames: Dict[int, Dict] = {}
+    for page in pages:
+        for frame in page.get("frames", []):
+            stamp = _parse_timestamp(frame.get("rfc460Timestamp"))
+            if stamp is not None:
+                frames.setdefault(_timestamp_ms(stamp), frame)
+    return sorted(frames.items())
+
+
+def _columns(rows: List[Dict]) -> Dict[str, List[Any]]:
+    # Numeric fields of aligned rows as one list per field.
+    fields = dict.fromkeys(
+        key for row in rows for key, value in row.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and key != "participantId"
+    )
+    return {field: [row.get(field) for row in rows] for field in fields}
+
+
+def _participant_columns(participant_lists: List[List[Dict]]) -> Dict[str, Dict[str, List[Any]]]:
+    by_frame = [{str(p.get("participantId")): p for p in participants} for participants in participant_lists]
+    ids = sorted({pid for frame in by_frame for pid in frame}, key=lambda pid: (len(pid), pid))
+    return {pid: _columns([frame.get(pid, {}) for frame in by_frame]) for pid in ids}
+
+
+def _team_row(team: Dict) -> Dict:
+    row = dict(team)
+    row["dragons"] = len(team.get("dragons") or [])
+    return row
+
+
+def window_columns(frames: List[Tuple[int, Dict]]) -> Dict[str, Any]:
+    # Columnar form of (timestamp ms, window frame) pairs.
+    return {
+        "timestamps": [stamp for stamp, _ in frames],
+        "gameState": [frame.get("gameState") for _, frame in frames],
+        "blueTeam": _columns([_team_row(frame.get("blueTeam", {})) for _, frame in frames]),
+        "redTeam": _columns([_team_row(frame.get("redTeam", {})) for _, frame in frames]),
+        "participants": _participant_columns([
+            frame.get("blueTeam", {}).get("participants", []) + frame.get("redTeam", {}).get("participants", [])
+            for _, frame in frames
+        ]),
+    }
+
+
+def _columnar_game(game_id: str, metadata: Dict, windows: List[Dict], details: List[Dict]) -> Dict:
+    detail_frames = merge_frames(details)
+    return {
+        "gameId": game_id,
+        "metadata": metadata,
+        "window": window_columns(merge_frames(windows)),
+        "details": {
+            "timestamps": [stamp for stamp, _ in detail_frames],
+            "participants": _participant_columns([frame.get("participants", []) for _, frame in detail_frames]),
+        },
+    }
+
+
+def _fetch_page(fetch: Any, game_id: str, starting_time: datetime) -> Tuple[Optional[Dict], Optional[Exception]]:
+    try:
+        return fetch(game_id, starting_time), None
+    except ValueError:
+        # The feed answers 204 with no body past the end of a game.
+        return {}, None
+    except Exception as exc:
+        return None, exc
+
+
+def _columnar_has_data(game: Dict) -> bool:
+    window = game.get("window", {})
+    for side in ("blueTeam", "redTeam"):
+        team = window.get(side, {})
+        if any(team.get("totalGold") or []) or any(team.get("totalKills") or []):
+            return True
+    return False
+
+
+def backfill_game(
+    executor: ThreadPoolExecutor,
+    game_id: str,
+    batch_pages: int,
+    step_s: int = 10,
+    max_pages: int = 1080,
+) -> Tuple[Optional[Dict], bool]:
+    # (columnar game or None when the feed has no frames, whether every page was read).
+    first = fetch_window(game_id)
+    first_frames = first.get("frames", [])
+    start = _parse_timestamp(first_frames[0].get("rfc460Timestamp")) if first_frames else None
+    if start is None:
+        return None, True
+    start = start.replace(second=start.second - start.second % step_s, microsecond=0)
+
+    windows = [first]
+    details: List[Dict] = []
+    complete = True
+    finished = False
+    page = 0
+    while not finished and page < max_pages:
+        times = [start + timedelta(seconds=step_s * i) for i in range(page, min(page + batch_pages, max_pages))]
+        window_pages = [executor.submit(_fetch_page, fetch_window, game_id, t) for t in times]
+        detail_pages = [executor.submit(_fetch_page, fetch_details, game_id, t) for t in times]
+        for window_future, detail_future in zip(window_pages, detail_pages):
+            window, error = window_future.result()
+            if error is not None:
+                complete = False
+                finished = True
+                break
+            frames = (window or {}).get("frames", [])
+            if not frames:
+                # Past the last frame of the game.
+                finished = True
+                break
+            windows.append(window)
+            detail, error = detail_future.result()
+            if error is not None:
+                complete = False
+            elif detail:
+                details.append(detail)
+            if any(frame.get("gameState") == "finished" for frame in frames):
+                finished = True
+                break
+        page += len(times)
+    if not finished:
+        complete = False
+    return _columnar_game(game_id, first.get("gameMetadata", {}), windows, details), complete
+
+
 def update_livestats(game_ids: List[str], config: Dict, data_dir: str, meta_dir: str) -> None:
-    state_path = f"{meta_dir}/livestats_state.json"
-    state = read_json(state_path, {})
-    downloaded_game_ids: Set[str] = set(state.get("downloaded_game_ids", []))
-    skipped_game_ids: Set[str] = set(state.get("skipped_game_ids", []))
+    configure_source_limiter("livestats", config)
+    store = open_state_store(meta_dir)
+    store.import_json_state(
+        "livestats",
+        f"{meta_dir}/livestats_state.json",
+        {"downloaded_game_ids": "livestats.downloaded", "skipped_game_ids": "livestats.skipped"},
+    )
     log_path = f"{data_dir}/logs/livestats.log"
     ensure_dir(f"{data_dir}/logs")
 
@@ -50,11 +224,18 @@ def update_livestats(game_ids: List[str], config: Dict, data_dir: str, meta_dir:
         with open(log_path, "a", encoding="utf-8") as f:
             f.write(f"[{timestamp}] {message}\n")
 
-    league_slugs = config.get("livestats", {}).get("league_slugs")
-    progress = bool(config.get("livestats", {}).get("progress", True))
-    skip_empty = bool(config.get("livestats", {}).get("skip_empty", True))
+    livestats_cfg = config.get("livestats", {})
+    league_slugs = livestats_cfg.get("league_slugs")
+    show_progress = bool(livestats_cfg.get("progress", True))
+    skip_empty = bool(livestats_cfg.get("skip_empty", True))
+    backfill = bool(livestats_cfg.get("backfill", False))
+    workers = max(1, int(livestats_cfg.get("workers") or 8))
+    step_s = max(10, int(livestats_cfg.get("step_s") or 10))
+    max_pages = max(1, int(livestats_cfg.get("max_pages") or 1080))
+    done_namespace = "livestats.backfilled" if backfill else "livestats.downloaded"
 
-    games_meta = _load_games_meta(meta_dir)
+    games_meta = load_games_meta(meta_dir)
+    league_by_game = {g.get("gameId"): g.get("leagueSlug") or "unknown" for g in games_meta if g.get("gameId")}
     if games_meta:
         if league_slugs:
             games = [g for g in games_meta if g.get("leagueSlug") in league_slugs]
@@ -62,37 +243,56 @@ def update_livestats(game_ids: List[str], config: Dict, data_dir: str, meta_dir:
             games = games_meta
         game_ids = [g.get("gameId") for g in games if g.get("gameId")]
 
-    total = len(game_ids)
-    for idx, game_id in enumerate(game_ids, start=1):
-        if not game_id:
-            continue
-        if game_id in downloaded_game_ids or game_id in skipped_game_ids:
-            continue
-        if progress:
-            print(f"\rFetching livestats {idx}/{total}", end="" if idx < total else "\n")
-        try:
-            window = fetch_window(game_id)
-            details = fetch_details(game_id)
-        except Exception as exc:
-            log(f"livestats fetch failed game_id={game_id} err={type(exc).__name__}")
-            continue
-        if skip_empty and not _window_has_data(window):
-            skipped_game_ids.add(game_id)
-            log(f"livestats empty window game_id={game_id}")
-            continue
-        league = "unknown"
-        for g in games_meta:
-            if g.get("gameId") == game_id:
-                league = g.get("leagueSlug") or "unknown"
-                break
-        base_dir = f"{data_dir}/raw/livestats/{league}/{game_id}"
-        write_json(f"{base_dir}/window.json", window)
-        write_json(f"{base_dir}/details.json", details)
-        downloaded_game_ids.add(game_id)
-
-    update_state(state_path, {
-        "downloaded_game_ids": sorted(downloaded_game_ids),
-        "skipped_game_ids": sorted(skipped_game_ids),
-        "last_run_time": int(time.time()),
-    })
+    progress = current_progress()
+    executor = None
+    if backfill:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="livestats", initializer=progress.bind)
+    try:
+        total = len(game_ids)
+        progress.stage("games", total=total)
+        for idx, game_id in enumerate(game_ids, start=1):
+            progress.advance()
+            if not game_id:
+                continue
+            if store.has(done_namespace, game_id) or store.has("livestats.skipped", game_id):
+                continue
+            if show_progress:
+                print(f"\rFetching livestats {idx}/{total}", end="" if idx < total else "\n")
+            base_dir = f"{data_dir}/raw/livestats/{league_by_game.get(game_id, 'unknown')}/{game_id}"
+            if backfill:
+                try:
+                    game, complete = backfill_game(executor, game_id, workers, step_s=step_s, max_pages=max_pages)
+                except Exception as exc:
+                    log(f"livestats backfill failed game_id={game_id} err={type(exc).__name__}")
+                    continue
+                if game is None or (skip_empty and not _columnar_has_data(game)):
+                    if skip_empty:
+                        store.add("livestats.skipped", [game_id])
+                    log(f"livestats empty window game_id={game_id}")
+                    continue
+                write_raw_json(f"{base_dir}/frames.json", game)
+                if not complete:
+                    # Kept as is and walked again on the next run.
+                    log(f"livestats backfill incomplete game_id={game_id}")
+                    continue
+                store.add(done_namespace, [game_id])
+                continue
+            try:
+                window = fetch_window(game_id)
+                details = fetch_details(game_id)
+            except Exception as exc:
+                log(f"livestats fetch failed game_id={game_id} err={type(exc).__name__}")
+                continue
+            if skip_empty and not _window_has_data(window):
+                store.add("livestats.skipped", [game_id])
+                log(f"livestats empty window game_id={game_id}")
+                continue
+            write_raw_json(f"{base_dir}/window.json", window)
+            write_raw_json(f"{base_dir}/details.json", details)
+            store.add("livestats.downloaded", [game_id])
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
 
+    store.update_meta("livestats", {"last_run_time": int(time.time())})
+    store.close()
@@ -1,12 +1,17 @@
-import json
-import os
+import threading
 import time
 import urllib.parse
-from typing import Dict, List, Set
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .config import env_or_default
 from .http import HttpError, http_get_json
-from .storage import ensure_dir, read_json, update_state, write_json
+from .lolapi_index import ensure_lolapi_index, index_match, index_timeline, record_player
+from .match_store import SEEN_NAMESPACE, has_match, load_match, merge_legacy_seen, save_match, save_timeline
+from .progress import current_progress
+from .ratelimit import configure_riot_limiter, riot_limiter
+from .state_store import open_state_store
+from .storage import ensure_dir, write_raw_json
 
 
 def _riot_headers() -> Dict[str, str]:
@@ -29,13 +34,13 @@ def fetch_account_by_riot_id(region: str, game_name: str, tag_line: str) -> Dict
     game_name = urllib.parse.quote(game_name)
     tag_line = urllib.parse.quote(tag_line)
     url = _region_url(region, f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}")
-    return http_get_json(url, headers=headers)
+    return http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="account-v1.by-riot-id")
 
 
 def fetch_account_by_puuid(region: str, puuid: str) -> Dict:
     headers = _riot_headers()
     url = _region_url(region, f"/riot/account/v1/accounts/by-puuid/{puuid}")
-    return http_get_json(url, headers=headers)
+    return http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="account-v1.by-puuid")
 
 
 def fetch_account_by_riot_id_with_fallback(regions: List[str], game_name: str, tag_line: str) -> Dict:
@@ -67,32 +72,42 @@ def fetch_account_by_puuid_with_fallback(regions: List[str], puuid: str) -> Dict
 def fetch_summoner_by_puuid(platform: str, puuid: str) -> Dict:
     headers = _riot_headers()
     url = _platform_url(platform, f"/lol/summoner/v4/summoners/by-puuid/{puuid}")
-    return http_get_json(url, headers=headers)
+    return http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="summoner-v4.by-puuid")
 
 
 def fetch_summoner_by_name(platform: str, summoner_name: str) -> Dict:
     headers = _riot_headers()
     summoner_name = urllib.parse.quote(summoner_name)
     url = _platform_url(platform, f"/lol/summoner/v4/summoners/by-name/{summoner_name}")
-    return http_get_json(url, headers=headers)
+    return http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="summoner-v4.by-name")
 
 
 def fetch_ranked_entries(platform: str, summoner_id: str) -> List[Dict]:
     headers = _riot_headers()
     url = _platform_url(platform, f"/lol/league/v4/entries/by-summoner/{summoner_id}")
-    return http_get_json(url, headers=headers)
+    return http_get_json(
+        url,
+        headers=headers,
+        limiter=riot_limiter(),
+        limit_key="league-v4.entries-by-summoner",
+    )
 
 
 def fetch_mastery_by_puuid(platform: str, puuid: str) -> List[Dict]:
     headers = _riot_headers()
     url = _platform_url(platform, f"/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}")
-    return http_get_json(url, headers=headers)
+    return http_get_json(
+        url,
+        headers=headers,
+        limiter=riot_limiter(),
+        limit_key="champion-mastery-v4.by-puuid",
+    )
 
 
 def fetch_challenges_by_puuid(platform: str, puuid: str) -> Dict:
     headers = _riot_headers()
     url = _platform_url(platform, f"/lol/challenges/v1/player-data/{puuid}")
-    return http_get_json(url, headers=headers)
+    return http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="challenges-v1.player-data")
 
 
 def fetch_match_ids(region: str, puuid: str, count: int, queue: str = None) -> List[str]:
@@ -101,19 +116,25 @@ def fetch_match_ids(region: str, puuid: str, count: int, queue: str = None) -> L
     if queue:
         params["queue"] = queue
     url = _region_url(region, f"/lol/match/v5/matches/by-puuid/{puuid}/ids")
-    return http_get_json(url, headers=headers, params=params)
+    return http_get_json(
+        url,
+        headers=headers,
+        params=params,
+        limiter=riot_limiter(),
+        limit_key="match-v5.ids-by-puuid",
+    )
 
 
 def fetch_match(region: str, match_id: str) -> Dict:
     headers = _riot_headers()
     url = _region_url(region, f"/lol/match/v5/matches/{match_id}")
-    return http_get_json(url, headers=headers)
+    return http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="match-v5.match")
 
 
 def fetch_match_timeline(region: str, match_id: str) -> Dict:
     headers = _riot_headers()
     url = _region_url(region, f"/lol/match/v5/matches/{match_id}/timeline")
-    return http_get_json(url, headers=headers)
+    return http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="match-v5.timeline")
 
 
 def update_lolapi(config: Dict, data_dir: str, meta_dir: str) -> None:
@@ -124,199 +145,299 @@ def update_lolapi(config: Dict, data_dir: str, meta_dir: str) -> None:
     seed_puuids = config["riot"].get("seed_puuids", [])
     seed_summoner_ids = config["riot"].get("seed_summoner_ids", [])
     matches_per_seed = int(config["riot"].get("matches_per_seed", 10))
-    sleep_s = float(config["riot"].get("request_sleep_s", 0.2))
     fetch_timeline = bool(config["riot"].get("fetch_timeline", False))
+    workers = max(1, int(config["riot"].get("workers") or 1))
+    configure_riot_limiter(config)
     account_regions = config["riot"].get("account_regions", [region])
     if not isinstance(account_regions, list) or not account_regions:
         account_regions = [region]
 
-    state_path = f"{meta_dir}/lolapi_state.json"
-    state = read_json(state_path, {})
-    seen_match_ids: Set[str] = set(state.get("seen_match_ids", []))
+    store = open_state_store(meta_dir)
+    store.import_json_state("lolapi", f"{meta_dir}/lolapi_state.json", {"seen_match_ids": "lolapi.match"})
+    merge_legacy_seen(store)
+    state = store.get_meta("lolapi")
     seed_summoner_ids.extend(state.get("seed_summoner_ids", []))
     summoner_id_by_puuid: Dict[str, str] = {}
-    account_name_by_puuid: Dict[str, str] = {}
-    summoner_name_by_puuid: Dict[str, str] = {}
     platform_by_summoner_id: Dict[str, str] = {}
     log_path = f"{data_dir}/logs/lolapi.log"
     ensure_dir(f"{data_dir}/logs")
+    match_index = ensure_lolapi_index(data_dir, meta_dir)
+    log_lock = threading.Lock()
+    match_locks: Dict[str, threading.Lock] = {}
+    match_locks_guard = threading.Lock()
+    fetched_this_run = set()
+
+    # Workers only fetch and write raw files; the index connection, the seen
+    # set and the per-seed bookkeeping stay on this thread, the bookkeeping
+    # merged in seed order, so any worker count produces the same files, index
+    # and state.
+    progress = current_progress()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lolapi", initializer=progress.bind)
 
     def log(message: str) -> None:
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-        with open(log_path, "a", encoding="utf-8") as f:
+        with log_lock, open(log_path, "a", encoding="utf-8") as f:
             f.write(f"[{timestamp}] {message}\n")
 
-    resolved_puuids: List[str] = []
-    for riot_id in seed_riot_ids:
-        if "#" not in riot_id:
-            continue
+    def player_path(puuid: str, name: str) -> str:
+        return f"{data_dir}/raw/lolapi/players/{puuid}/{name}.json"
+
+    def resolve_riot_id(riot_id: str) -> Optional[Dict]:
         game_name, tag_line = riot_id.split("#", 1)
         try:
-            account = fetch_account_by_riot_id_with_fallback(account_regions, game_name, tag_line)
+            return fetch_account_by_riot_id_with_fallback(account_regions, game_name, tag_line)
         except Exception:
-            continue
-        puuid = account.get("puuid")
-        if puuid:
-            resolved_puuids.append(puuid)
-            write_json(f"{data_dir}/raw/lolapi/players/{puuid}/account.json", account)
-            if account.get("gameName"):
-                account_name_by_puuid[puuid] = account["gameName"]
-        time.sleep(sleep_s)
-
-    for puuid in seed_puuids:
-        if puuid not in resolved_puuids:
-            resolved_puuids.append(puuid)
-
-    for puuid in resolved_puuids:
+            return None
+
+    def crawl_account(puuid: str) -> Optional[Dict]:
         try:
             account = fetch_account_by_puuid_with_fallback(account_regions, puuid)
-            write_json(f"{data_dir}/raw/lolapi/players/{puuid}/account.json", account)
-            if account.get("gameName"):
-                account_name_by_puuid[puuid] = account["gameName"]
         except Exception:
-            pass
-        time.sleep(sleep_s)
+            return None
+        write_raw_json(player_path(puuid, "account"), account)
+        return account
 
+    def crawl_summoner_by_name(puuid: str, name: str, context: str = "") -> Optional[Dict]:
         try:
-            summoner = fetch_summoner_by_puuid(platform, puuid)
-            write_json(f"{data_dir}/raw/lolapi/players/{puuid}/summoner.json", summoner)
-            summoner_id = summoner.get("id")
-            if summoner_id:
-                seed_summoner_ids.append(summoner_id)
-                summoner_id_by_puuid[puuid] = summoner_id
-            else:
+            summoner = fetch_summoner_by_name(platform, name)
+        except Exception as exc:
+            if context:
                 log(
-                    f"summoner by puuid missing id: puuid={puuid} "
-                    f"platform={platform} keys={sorted(list(summoner.keys()))}"
+                    f"summoner by name failed ({context}): puuid={puuid} "
+                    f"name={name} err={type(exc).__name__}"
                 )
-            if summoner.get("name"):
-                summoner_name_by_puuid[puuid] = summoner["name"]
-        except Exception:
-            summoner_id = None
-        time.sleep(sleep_s)
-
-        if not summoner_id and puuid in summoner_name_by_puuid:
-            try:
-                summoner = fetch_summoner_by_name(platform, summoner_name_by_puuid[puuid])
-                write_json(f"{data_dir}/raw/lolapi/players/{puuid}/summoner.json", summoner)
-                summoner_id = summoner.get("id")
-                if summoner_id:
-                    seed_summoner_ids.append(summoner_id)
-                    summoner_id_by_puuid[puuid] = summoner_id
-            except Exception:
-                log(f"summoner by name failed: puuid={puuid} name={summoner_name_by_puuid.get(puuid,'')}")
-            time.sleep(sleep_s)
+            else:
+                log(f"summoner by name failed: puuid={puuid} name={name}")
+            return None
+        write_raw_json(player_path(puuid, "summoner"), summoner)
+        return summoner
 
+    def crawl_summoner(puuid: str) -> List[Dict]:
+        # The by-puuid lookup, then a by-name lookup when it returned a name but no id.
         try:
-            mastery = fetch_mastery_by_puuid(platform, puuid)
-            write_json(f"{data_dir}/raw/lolapi/players/{puuid}/mastery.json", mastery)
+            summoner = fetch_summoner_by_puuid(platform, puuid)
         except Exception:
-            pass
-        time.sleep(sleep_s)
+            return []
+        write_raw_json(player_path(puuid, "summoner"), summoner)
+        fetched = [summoner]
+        if not summoner.get("id"):
+            log(
+                f"summoner by puuid missing id: puuid={puuid} "
+                f"platform={platform} keys={sorted(list(summoner.keys()))}"
+            )
+            if summoner.get("name"):
+                by_name = crawl_summoner_by_name(puuid, summoner["name"])
+                if by_name is not None:
+                    fetched.append(by_name)
+        return fetched
 
+    def crawl_player_file(puuid: str, name: str, fetch: Callable[[str, str], Any]) -> None:
         try:
-            challenges = fetch_challenges_by_puuid(platform, puuid)
-            write_json(f"{data_dir}/raw/lolapi/players/{puuid}/challenges.json", challenges)
+            data = fetch(platform, puuid)
         except Exception:
-            pass
-        time.sleep(sleep_s)
+            return
+        write_raw_json(player_path(puuid, name), data)
 
+    def crawl_match_ids(puuid: str) -> List[str]:
         try:
-            match_ids = fetch_match_ids(region, puuid, matches_per_seed, queue=queue)
+            return fetch_match_ids(region, puuid, matches_per_seed, queue=queue)
         except Exception:
-            match_ids = []
-        time.sleep(sleep_s)
-
-        match_platform = None
-        if match_ids:
-            match_platform = match_ids[0].split("_", 1)[0].lower()
-        for match_id in match_ids:
-            match_path = f"{data_dir}/raw/lolapi/matches/{region}/{match_id}.json"
-            if match_id in seen_match_ids and os.path.exists(match_path):
+            return []
+
+    def crawl_match(match_id: str) -> Tuple[Optional[Dict], Optional[Dict], str]:
+        # (match, timeline, status) with status "loaded", "fetched" or "failed".
+        # Seeds sharing a match take turns: the first fetches it, the rest load it.
+        # Marking a fetched match seen is left to the main thread, after indexing.
+        with match_locks_guard:
+            lock = match_locks.setdefault(match_id, threading.Lock())
+        with lock:
+            if match_id in fetched_this_run or has_match(store, data_dir, region, match_id):
                 try:
-                    with open(match_path, "r", encoding="utf-8") as f:
-                        match = json.load(f)
-                    for participant in match.get("info", {}).get("participants", []):
-                        if participant.get("puuid") == puuid and participant.get("summonerId"):
-                            summoner_id_by_puuid[puuid] = participant["summonerId"]
-                            seed_summoner_ids.append(participant["summonerId"])
-                            if match_platform:
-                                platform_by_summoner_id[participant["summonerId"]] = match_platform
-                            break
+                    return load_match(data_dir, region, match_id, {}), None, "loaded"
                 except Exception:
-                    pass
-                continue
+                    return None, None, "failed"
+            saved = None
             try:
                 match = fetch_match(region, match_id)
-                write_json(match_path, match)
+                save_match(data_dir, region, match_id, match)
+                saved = match
+                timeline = None
                 if fetch_timeline:
                     timeline = fetch_match_timeline(region, match_id)
-                    write_json(
-                        f"{data_dir}/raw/lolapi/matches/{region}/timeline/{match_id}.json",
-                        timeline,
-                    )
-                if puuid not in summoner_name_by_puuid:
-                    for participant in match.get("info", {}).get("participants", []):
-                        if participant.get("puuid") == puuid and participant.get("summonerName"):
-                            summoner_name_by_puuid[puuid] = participant["summonerName"]
-                            break
-                if puuid not in summoner_id_by_puuid:
-                    for participant in match.get("info", {}).get("participants", []):
-                        if participant.get("puuid") == puuid and participant.get("summonerId"):
-                            summoner_id_by_puuid[puuid] = participant["summonerId"]
-                            seed_summoner_ids.append(participant["summonerId"])
-                            if match_platform:
-                                platform_by_summoner_id[participant["summonerId"]] = match_platform
-                            break
+                    save_timeline(data_dir, region, match_id, timeline)
             except Exception:
-                continue
-            seen_match_ids.add(match_id)
-            time.sleep(sleep_s)
-
-        if not summoner_id and puuid in summoner_name_by_puuid:
-            try:
-                summoner = fetch_summoner_by_name(platform, summoner_name_by_puuid[puuid])
-                write_json(f"{data_dir}/raw/lolapi/players/{puuid}/summoner.json", summoner)
+                # A match saved without its timeline is still indexed but not marked seen.
+                return saved, None, "failed"
+            fetched_this_run.add(match_id)
+            return match, timeline, "fetched"
+
+    def own_participant(match: Dict, puuid: str, field: str) -> Optional[Dict]:
+        for participant in match.get("info", {}).get("participants", []):
+            if participant.get("puuid") == puuid and participant.get(field):
+                return participant
+        return None
+
+    try:
+        resolved_puuids: List[str] = []
+        riot_ids = [riot_id for riot_id in seed_riot_ids if "#" in riot_id]
+        progress.stage("seeds", total=len(riot_ids))
+        for account in executor.map(resolve_riot_id, riot_ids):
+            progress.advance()
+            puuid = (account or {}).get("puuid")
+            if puuid:
+                resolved_puuids.append(puuid)
+                write_raw_json(player_path(puuid, "account"), account)
+                record_player(match_index, puuid, account=account)
+
+        for puuid in seed_puuids:
+            if puuid not in resolved_puuids:
+                resolved_puuids.append(puuid)
+
+        # Per-seed steps that do not depend on each other run side by side, and the
+        # match downloads of every seed share the pool.
+        account_jobs = {puuid: executor.submit(crawl_account, puuid) for puuid in resolved_puuids}
+        summoner_jobs = {puuid: executor.submit(crawl_summoner, puuid) for puuid in resolved_puuids}
+        file_jobs = [
+            executor.submit(crawl_player_file, puuid, name, fetch)
+            for puuid in resolved_puuids
+            for name, fetch in (("mastery", fetch_mastery_by_puuid), ("challenges", fetch_challenges_by_puuid))
+        ]
+        match_ids_by_puuid = {puuid: executor.submit(crawl_match_ids, puuid) for puuid in resolved_puuids}
+        match_jobs: Dict[str, List[Tuple[str, Future]]] = {}
+        for puuid in resolved_puuids:
+            match_jobs[puuid] = [
+                (match_id, executor.submit(crawl_match, match_id)) for match_id in match_ids_by_puuid[puuid].result()
+            ]
+
+        # Downloads are indexed as they land and only then marked seen, so a run
+        # that stops early never leaves a seen match missing from the index. Only
+        # (match, status) is kept for the seed merge below; the futures, and the
+        # timelines they hold, are released once indexed.
+        match_outcomes: Dict[str, List[Any]] = {puuid: [None] * len(jobs) for puuid, jobs in match_jobs.items()}
+        job_slots = {
+            job: (puuid, pos, match_id)
+            for puuid, jobs in match_jobs.items()
+            for pos, (match_id, job) in enumerate(jobs)
+        }
+        match_jobs.clear()
+        progress.stage("matches", total=len(job_slots))
+        for job in as_completed(job_slots):
+            progress.advance()
+            puuid, pos, match_id = job_slots.pop(job)
+            match, timeline, status = job.result()
+            if status != "loaded" and match is not None:
+                index_match(match_index, region, match_id, match)
+                if timeline is not None:
+                    index_timeline(match_index, region, match_id, timeline)
+            if status == "fetched":
+                store.add(SEEN_NAMESPACE, [match_id])
+            match_outcomes[puuid][pos] = (match_id, match, status)
+
+        progress.stage("players", total=len(resolved_puuids))
+        for job in file_jobs:
+            job.result()
+
+        fetched_ids = {
+            match_id
+            for outcomes in match_outcomes.values()
+            for match_id, _, status in outcomes
+            if status == "fetched"
+        }
+        claimed_ids = set()
+        seed_ids_by_puuid: Dict[str, List[str]] = {}
+        retry_by_name: Dict[str, str] = {}
+        for puuid in resolved_puuids:
+            progress.advance()
+            seed_ids: List[str] = []
+            summoner_name = None
+            summoner_id = None
+            account = account_jobs[puuid].result()
+            if account is not None:
+                record_player(match_index, puuid, account=account)
+            for summoner in summoner_jobs[puuid].result():
+                record_player(match_index, puuid, summoner=summoner)
                 summoner_id = summoner.get("id")
                 if summoner_id:
-                    seed_summoner_ids.append(summoner_id)
+                    seed_ids.append(summoner_id)
                     summoner_id_by_puuid[puuid] = summoner_id
-            except Exception as exc:
+                if summoner_name is None and summoner.get("name"):
+                    summoner_name = summoner["name"]
+
+            outcomes = match_outcomes[puuid]
+            match_platform = outcomes[0][0].split("_", 1)[0].lower() if outcomes else None
+            for match_id, match, status in outcomes:
+                if match is None or status == "failed":
+                    continue
+                # The first seed in order that lists a match downloaded in this run
+                # is treated as the one that fetched it, as in a sequential crawl.
+                if match_id in fetched_ids and match_id not in claimed_ids:
+                    claimed_ids.add(match_id)
+                    participant = own_participant(match, puuid, "summonerName")
+                    if summoner_name is None and participant:
+                        summoner_name = participant["summonerName"]
+                    if puuid in summoner_id_by_puuid:
+                        continue
+                participant = own_participant(match, puuid, "summonerId")
+                if participant:
+                    summoner_id_by_puuid[puuid] = participant["summonerId"]
+                    seed_ids.append(participant["summonerId"])
+                    if match_platform:
+                        platform_by_summoner_id[participant["summonerId"]] = match_platform
+
+            seed_ids_by_puuid[puuid] = seed_ids
+            if not summoner_id and summoner_name:
+                retry_by_name[puuid] = summoner_name
+
+        retry_jobs = {
+            puuid: executor.submit(crawl_summoner_by_name, puuid, name, "from match")
+            for puuid, name in retry_by_name.items()
+        }
+        for puuid in resolved_puuids:
+            seed_summoner_ids.extend(seed_ids_by_puuid[puuid])
+            if puuid not in retry_jobs:
+                continue
+            summoner = retry_jobs[puuid].result()
+            if summoner is None:
+                continue
+            record_player(match_index, puuid, summoner=summoner)
+            if summoner.get("id"):
+                seed_summoner_ids.append(summoner["id"])
+                summoner_id_by_puuid[puuid] = summoner["id"]
+
+        def crawl_ranked(summoner_id: str) -> None:
+            try:
+                ranked_platform = platform_by_summoner_id.get(summoner_id, platform)
+                ranked = fetch_ranked_entries(ranked_platform, summoner_id)
+                matched_puuid = None
+                for puuid, stored_id in summoner_id_by_puuid.items():
+                    if stored_id == summoner_id:
+                        matched_puuid = puuid
+                        break
+                if matched_puuid:
+                    write_raw_json(player_path(matched_puuid, "ranked"), ranked)
+                else:
+                    write_raw_json(f"{data_dir}/raw/lolapi/ranked/{summoner_id}.json", ranked)
+            except HttpError as exc:
                 log(
-                    f"summoner by name failed (from match): puuid={puuid} "
-                    f"name={summoner_name_by_puuid.get(puuid,'')} err={type(exc).__name__}"
+                    f"ranked fetch failed summoner_id={summoner_id} "
+                    f"platform={platform_by_summoner_id.get(summoner_id, platform)} "
+                    f"status={exc.status} body={exc.body}"
                 )
-            time.sleep(sleep_s)
+            except Exception as exc:
+                log(f"ranked fetch failed summoner_id={summoner_id} err={type(exc).__name__}")
 
-    for summoner_id in list(dict.fromkeys(seed_summoner_ids)):
-        try:
-            ranked_platform = platform_by_summoner_id.get(summoner_id, platform)
-            ranked = fetch_ranked_entries(ranked_platform, summoner_id)
-            matched_puuid = None
-            for puuid, stored_id in summoner_id_by_puuid.items():
-                if stored_id == summoner_id:
-                    matched_puuid = puuid
-                    break
-            if matched_puuid:
-                write_json(f"{data_dir}/raw/lolapi/players/{matched_puuid}/ranked.json", ranked)
-            else:
-                write_json(f"{data_dir}/raw/lolapi/ranked/{summoner_id}.json", ranked)
-        except HttpError as exc:
-            log(
-                f"ranked fetch failed summoner_id={summoner_id} "
-                f"platform={platform_by_summoner_id.get(summoner_id, platform)} "
-                f"status={exc.status} body={exc.body}"
-            )
-            continue
-        except Exception as exc:
-            log(f"ranked fetch failed summoner_id={summoner_id} err={type(exc).__name__}")
-            continue
-        time.sleep(sleep_s)
+        ranked_ids = list(dict.fromkeys(seed_summoner_ids))
+        progress.stage("ranked", total=len(ranked_ids))
+        for _ in executor.map(crawl_ranked, ranked_ids):
+            progress.advance()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
-    update_state(state_path, {
-        "seen_match_ids": sorted(seen_match_ids),
+    match_index.close()
+    store.update_meta("lolapi", {
         "last_run_time": int(time.time()),
         "seed_riot_ids": seed_riot_ids,
         "seed_puuids": seed_puuids,
         "seed_summoner_ids": list(dict.fromkeys(seed_summoner_ids)),
     })
+    store.close()
@@ -0,0 +1,285 @@
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .match_store import iter_match_sources, match_regions, read_match_source
+from .storage import read_json
+
+# Per-participant summaries of the matches in the shared match store, so
+# player match history is an indexed query instead of a scan of every match,
+# plus a manifest of the players under raw/lolapi/players.
+
+# Bump when a table or an indexed source is added so existing index files are rebuilt once.
+INDEX_VERSION = 3
+
+SUMMARY_COLUMNS = [
+    "match_id", "puuid", "source", "champion", "kills", "deaths", "assists", "win",
+    "position", "queue_id", "duration_ms", "game_creation", "participant_id",
+]
+
+
+def lolapi_index_path(meta_dir: str) -> Path:
+    return Path(meta_dir) / "lolapi_index.sqlite"
+
+
+def open_lolapi_index(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS matches ("
+        "match_id TEXT PRIMARY KEY, region TEXT NOT NULL, "
+        "has_match INTEGER NOT NULL DEFAULT 0, has_timeline INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS participants ("
+        "match_id TEXT NOT NULL, puuid TEXT NOT NULL, source TEXT NOT NULL, champion TEXT, "
+        "kills INTEGER, deaths INTEGER, assists INTEGER, win INTEGER, position TEXT, "
+        "queue_id INTEGER, duration_ms INTEGER, game_creation INTEGER, participant_id INTEGER, "
+        "PRIMARY KEY (match_id, puuid))"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS participants_by_puuid "
+        "ON participants (puuid, game_creation DESC, match_id DESC)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS players ("
+        "puuid TEXT PRIMARY KEY, game_name TEXT, tag_line TEXT, summoner_name TEXT, "
+        "summoner_level INTEGER, profile_icon_id INTEGER)"
+    )
+    return conn
+
+
+def record_player(
+    conn: sqlite3.Connection,
+    puuid: str,
+    account: Optional[Dict[str, Any]] = None,
+    summoner: Optional[Dict[str, Any]] = None,
+) -> None:
+    # Only the fields of the file just written are updated.
+    updates: Dict[str, Any] = {}
+    if account is not None:
+        updates.update(game_name=account.get("gameName"), tag_line=account.get("tagLine"))
+    if summoner is not None:
+        updates.update(
+            summoner_name=summoner.get("name"),
+            summoner_level=summoner.get("summonerLevel"),
+            profile_icon_id=summoner.get("profileIconId"),
+        )
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO players (puuid) VALUES (?)", (puuid,))
+        if updates:
+            assignments = ", ".join(f"{col} = ?" for col in updates)
+            conn.execute(f"UPDATE players SET {assignments} WHERE puuid = ?", (*updates.values(), puuid))
+
+
+def _mark_match(conn: sqlite3.Connection, region: str, match_id: str, column: str) -> None:
+    conn.execute(
+        "INSERT INTO matches (match_id, region) VALUES (?, ?) ON CONFLICT(match_id) DO NOTHING",
+        (match_id, region),
+    )
+    conn.execute(f"UPDATE matches SET {column} = 1 WHERE match_id = ?", (match_id,))
+
+
+def _insert_rows(conn: sqlite3.Connection, rows: List[tuple], replace: bool) -> None:
+    verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+    placeholders = ",".join("?" for _ in SUMMARY_COLUMNS)
+    conn.executemany(
+        f"{verb} INTO participants ({','.join(SUMMARY_COLUMNS)}) VALUES ({placeholders})",
+        rows,
+    )
+
+
+def index_match(conn: sqlite3.Connection, region: str, match_id: str, match: Dict[str, Any]) -> None:
+    info = match.get("info", {})
+    duration = info.get("gameDuration")
+    duration_ms = int(duration * 1000) if duration is not None else None
+    rows = []
+    for participant in info.get("participants", []):
+        if not participant.get("puuid"):
+            continue
+        win = participant.get("win")
+        rows.append((
+            match_id,
+            participant["puuid"],
+            "match",
+            participant.get("championName"),
+            participant.get("kills"),
+            participant.get("deaths"),
+            participant.get("assists"),
+            None if win is None else int(bool(win)),
+            participant.get("teamPosition"),
+            info.get("queueId"),
+            duration_ms,
+            info.get("gameCreation"),
+            participant.get("participantId"),
+        ))
+    with conn:
+        _mark_match(conn, region, match_id, "has_match")
+        # Match detail rows win over summaries derived from the timeline.
+        _insert_rows(conn, rows, replace=True)
+
+
+def timeline_summaries(timeline: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    participants = timeline.get("metadata", {}).get("participants", [])
+    stats = {pid: {"kills": 0, "deaths": 0, "assists": 0} for pid in range(1, len(participants) + 1)}
+    duration_ms = 0
+    for frame in timeline.get("info", {}).get("frames", []):
+        duration_ms = max(duration_ms, int(frame.get("timestamp", 0)))
+        for event in frame.get("events", []):
+            if event.get("type") != "CHAMPION_KILL":
+                continue
+            if event.get("killerId") in stats:
+                stats[event["killerId"]]["kills"] += 1
+            if event.get("victimId") in stats:
+                stats[event["victimId"]]["deaths"] += 1
+            for pid in set(event.get("assistingParticipantIds", [])):
+                if pid in stats:
+                    stats[pid]["assists"] += 1
+    summaries = {}
+    for pid, puuid in enumerate(participants, start=1):
+        if puuid not in summaries:
+            summaries[puuid] = dict(stats[pid], durationMs=duration_ms, participantId=pid)
+    return summaries
+
+
+def index_timeline(conn: sqlite3.Connection, region: str, match_id: str, timeline: Dict[str, Any]) -> None:
+    rows = [
+        (match_id, puuid, "timeline", None, s["kills"], s["deaths"], s["assists"], None,
+         None, None, s["durationMs"], None, s["participantId"])
+        for puuid, s in timeline_summaries(timeline).items()
+    ]
+    with conn:
+        _mark_match(conn, region, match_id, "has_timeline")
+        _insert_rows(conn, rows, replace=False)
+
+
+def _read_json_file(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        data = read_json(str(path), None)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _read_object(data_dir: str, source: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+    try:
+        data = read_match_source(data_dir, source)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def rebuild_lolapi_index(data_dir: str, meta_dir: str) -> int:
+    db_path = lolapi_index_path(meta_dir)
+    tmp_path = db_path.with_suffix(".sqlite.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    players_dir = Path(data_dir) / "raw" / "lolapi" / "players"
+    conn = open_lolapi_index(tmp_path)
+    try:
+        for entry in sorted(players_dir.iterdir()) if players_dir.exists() else []:
+            if not entry.is_dir():
+                continue
+            account = _read_json_file(entry / "account.json") or {}
+            summoner = _read_json_file(entry / "summoner.json") or {}
+            record_player(conn, account.get("puuid", entry.name), account, summoner)
+        for region in match_regions(data_dir):
+            for match_id, source in iter_match_sources(data_dir, region):
+                match = _read_object(data_dir, source)
+                if match is not None:
+                    index_match(conn, region, match_id, match)
+            for match_id, source in iter_match_sources(data_dir, region, timeline=True):
+                timeline = _read_object(data_dir, source)
+                if timeline is not None:
+                    index_timeline(conn, region, match_id, timeline)
+        count = conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+        conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    finally:
+        conn.close()
+    tmp_path.replace(db_path)
+    return count
+
+
+def ensure_lolapi_index(data_dir: str, meta_dir: str) -> sqlite3.Connection:
+    # Index the files written before the index existed, then keep it current.
+    db_path = lolapi_index_path(meta_dir)
+    if _index_version(db_path) < INDEX_VERSION:
+        rebuild_lolapi_index(data_dir, meta_dir)
+    return open_lolapi_index(db_path)
+
+
+def _index_version(db_path: Path) -> int:
+    if not db_path.exists():
+        return 0
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    except sqlite3.DatabaseError:
+        return 0
+    finally:
+        conn.close()
+
+
+def _connect_readonly(db_path: Path) -> Optional[sqlite3.Connection]:
+    if not db_path.exists():
+        return None
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def count_indexed_matches(db_path: Path) -> Optional[int]:
+    conn = _connect_readonly(db_path)
+    if conn is None:
+        return None
+    try:
+        return conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        conn.close()
+
+
+def player_match_rows(db_path: Path, puuid: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+    conn = _connect_readonly(db_path)
+    if conn is None:
+        return None
+    try:
+        rows = conn.execute(
+            "SELECT p.*, m.has_match, m.has_timeline FROM participants p "
+            "JOIN matches m ON m.match_id = p.match_id WHERE p.puuid = ? "
+            "ORDER BY p.game_creation DESC, p.match_id DESC LIMIT ?",
+            (puuid, limit),
+        ).fetchall()
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        conn.close()
+    return [dict(row) for row in rows]
+
+
+def indexed_players(db_path: Path) -> Optional[List[Dict[str, Any]]]:
+    conn = _connect_readonly(db_path)
+    if conn is None:
+        return None
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] < INDEX_VERSION:
+            return None
+        rows = conn.execute(
+            "SELECT puuid, game_name, tag_line, summoner_name, summoner_level, profile_icon_id FROM players"
+        ).fetchall()
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        conn.close()
+    return [
+        {
+            "puuid": row["puuid"],
+            "gameName": row["game_name"],
+            "tagLine": row["tag_line"],
+            "summonerName": row["summoner_name"],
+            "summonerLevel": row["summoner_level"],
+            "profileIconId": row["profile_icon_id"],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,153 @@
+import shutil
+from pathlib import Path
+from typing import Any, Iterator, List, Tuple
+
+from .packstore import iter_objects, load_object, object_exists, pack_dir, pack_store, packs_root, save_object
+from .state_store import StateStore
+from .storage import load_json_file
+
+# Match-v5 payloads shared by the lolapi and match tasks. A matchId is unique
+# across regions and queues, so whichever task sees a match first stores it and
+# the other one reuses it:
+#   raw/matches/{region}/{matchId}.json           pack namespace matches/{region}
+#   raw/matches/{region}/timeline/{matchId}.json  pack namespace timelines/{region}
+# Trees written before the shared store kept lolapi matches under
+# raw/lolapi/matches and match_v5 ones under raw/match_v5 ({matchId}_timeline.json
+# next to the match); both are still read, and `compact` moves them here.
+
+SEEN_NAMESPACE = "match"
+LEGACY_SEEN_NAMESPACES = ("lolapi.match", "match_v5.match")
+TIMELINE_SUFFIX = "_timeline"
+
+
+def match_path(data_dir: str, region: str, match_id: str) -> str:
+    return f"{data_dir}/raw/matches/{region}/{match_id}.json"
+
+
+def timeline_path(data_dir: str, region: str, match_id: str) -> str:
+    return f"{data_dir}/raw/matches/{region}/timeline/{match_id}.json"
+
+
+def _sources(data_dir: str, region: str, timeline: bool) -> List[Tuple[str, str, str]]:
+    # (pack namespace, loose directory, key suffix) in lookup order, shared store first.
+    raw = Path(data_dir) / "raw"
+    if timeline:
+        return [
+            (f"timelines/{region}", str(raw / "matches" / region / "timeline"), ""),
+            (f"lolapi/timelines/{region}", str(raw / "lolapi" / "matches" / region / "timeline"), ""),
+            (f"match_v5/{region}", str(raw / "match_v5" / region), TIMELINE_SUFFIX),
+        ]
+    return [
+        (f"matches/{region}", str(raw / "matches" / region), ""),
+        (f"lolapi/matches/{region}", str(raw / "lolapi" / "matches" / region), ""),
+        (f"match_v5/{region}", str(raw / "match_v5" / region), ""),
+    ]
+
+
+def match_regions(data_dir: str) -> List[str]:
+    raw = Path(data_dir) / "raw"
+    packs = packs_root(data_dir)
+    regions = set()
+    for root in (raw / "matches", packs / "matches", raw / "lolapi" / "matches", packs / "lolapi" / "matches", raw / "match_v5"):
+        if root.exists():
+            regions.update(p.name for p in root.iterdir() if p.is_dir())
+    return sorted(regions)
+
+
+def merge_legacy_seen(store: StateStore) -> None:
+    # The per-task seen sets become one. Each task imports its legacy JSON
+    # state just before calling this, so a namespace is merged again whenever
+    # its size differs from the size at its last merge.
+    merged = store.get_meta("matches").get("_legacy_seen_merged")
+    merged = dict(merged) if isinstance(merged, dict) else {}
+    changed = False
+    for namespace in LEGACY_SEEN_NAMESPACES:
+        count = store.count(namespace)
+        if merged.get(namespace) == count:
+            continue
+        store.add(SEEN_NAMESPACE, store.ids(namespace))
+        merged[namespace] = count
+        changed = True
+    if changed:
+        store.update_meta("matches", {"_legacy_seen_merged": merged})
+
+
+def match_exists(data_dir: str, region: str, match_id: str, timeline: bool = False) -> bool:
+    for namespace, loose_dir, suffix in _sources(data_dir, region, timeline):
+        if object_exists(data_dir, namespace, match_id + suffix, f"{loose_dir}/{match_id}{suffix}.json"):
+            return True
+    return False
+
+
+def has_match(store: StateStore, data_dir: str, region: str, match_id: str) -> bool:
+    return store.has(SEEN_NAMESPACE, match_id) and match_exists(data_dir, region, match_id)
+
+
+def load_match(data_dir: str, region: str, match_id: str, default: Any = None, timeline: bool = False) -> Any:
+    for namespace, loose_dir, suffix in _sources(data_dir, region, timeline):
+        data = load_object(data_dir, namespace, match_id + suffix, f"{loose_dir}/{match_id}{suffix}.json", None)
+        if data is not None:
+            return data
+    return default
+
+
+def save_match(data_dir: str, region: str, match_id: str, match: Any) -> None:
+    save_object(data_dir, f"matches/{region}", match_id, match_path(data_dir, region, match_id), match)
+
+
+def save_timeline(data_dir: str, region: str, match_id: str, timeline: Any) -> None:
+    save_object(data_dir, f"timelines/{region}", match_id, timeline_path(data_dir, region, match_id), timeline)
+
+
+def _source_keys(data_dir: str, namespace: str, loose_dir: str, suffix: str) -> Iterator[Tuple[str, str, str]]:
+    # (matchId, key, loose file or "") for one location.
+    for key, file in iter_objects(data_dir, namespace, loose_dir):
+        if suffix:
+            if key.endswith(suffix):
+                yield key[: -len(suffix)], key, file
+        elif not key.endswith(TIMELINE_SUFFIX):
+            yield key, key, file
+
+
+def iter_match_sources(data_dir: str, region: str, timeline: bool = False) -> Iterator[Tuple[str, Tuple[str, str, str]]]:
+    # matchId -> (pack namespace, key, loose file or "") for every stored match;
+    # the shared store wins over the legacy locations.
+    seen = set()
+    for namespace, loose_dir, suffix in _sources(data_dir, region, timeline):
+        for match_id, key, file in _source_keys(data_dir, namespace, loose_dir, suffix):
+            if match_id not in seen:
+                seen.add(match_id)
+                yield match_id, (namespace, key, file)
+
+
+def read_match_source(data_dir: str, source: Tuple[str, str, str], default: Any = None) -> Any:
+    namespace, key, file = source
+    if file:
+        return load_json_file(file)
+    return pack_store(data_dir, namespace).get(key, default)
+
+
+def migrate_legacy_matches(data_dir: str) -> int:
+    # Move matches and timelines from the legacy locations into the shared store.
+    moved = 0
+    for region in match_regions(data_dir):
+        for timeline in (False, True):
+            save = save_timeline if timeline else save_match
+            target_path = timeline_path if timeline else match_path
+            sources = _sources(data_dir, region, timeline)
+            target = sources[0][0]
+            for namespace, loose_dir, suffix in sources[1:]:
+                for match_id, key, file in list(_source_keys(data_dir, namespace, loose_dir, suffix)):
+                    data = read_match_source(data_dir, (namespace, key, file))
+                    if data is None:
+                        continue
+                    if not object_exists(data_dir, target, match_id, target_path(data_dir, region, match_id)):
+                        save(data_dir, region, match_id, data)
+                        moved += 1
+                    if file:
+                        Path(file).unlink()
+                legacy_pack = pack_dir(data_dir, namespace)
+                if legacy_pack.exists():
+                    pack_store(data_dir, namespace).close()
+                    shutil.rmtree(legacy_pack)
+    return moved
@@ -1,10 +1,14 @@
 import time
 import urllib.parse
-from typing import Dict, List, Set
+from typing import Dict, List
 
 from .config import env_or_default
 from .http import http_get_json
-from .storage import read_json, update_state, write_json
+from .lolapi_index import ensure_lolapi_index, index_match, index_timeline
+from .match_store import SEEN_NAMESPACE, has_match, merge_legacy_seen, save_match, save_timeline
+from .progress import current_progress
+from .ratelimit import configure_riot_limiter, riot_limiter
+from .state_store import open_state_store
 
 
 def _riot_headers() -> Dict[str, str]:
@@ -37,7 +41,12 @@ def fetch_seed_summoner_ids(platform: str, leagues: List[str]) -> List[str]:
     summoner_ids: List[str] = []
     for league in leagues:
         url = _platform_url(platform, _league_endpoint(league))
-        data = http_get_json(url, headers=headers)
+        data = http_get_json(
+            url,
+            headers=headers,
+            limiter=riot_limiter(),
+            limit_key="league-v4.apex-by-queue",
+        )
         entries = data.get("entries", [])
         for entry in entries:
             if "summonerId" in entry:
@@ -48,14 +57,14 @@ def fetch_seed_summoner_ids(platform: str, leagues: List[str]) -> List[str]:
 def fetch_puuid_by_summoner_id(platform: str, summoner_id: str) -> str:
     headers = _riot_headers()
     url = _platform_url(platform, f"/lol/summoner/v4/summoners/{summoner_id}")
-    data = http_get_json(url, headers=headers)
+    data = http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="summoner-v4.by-summoner-id")
     return data["puuid"]
 
 
 def fetch_puuid_by_name(platform: str, summoner_name: str) -> str:
     headers = _riot_headers()
     url = _platform_url(platform, f"/lol/summoner/v4/summoners/by-name/{summoner_name}")
-    data = http_get_json(url, headers=headers)
+    data = http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="summoner-v4.by-name")
     return data["puuid"]
 
 
@@ -64,7 +73,7 @@ def fetch_puuid_by_riot_id(region: str, game_name: str, tag_line: str) -> str:
     game_name = urllib.parse.quote(game_name)
     tag_line = urllib.parse.quote(tag_line)
     url = _region_url(region, f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}")
-    data = http_get_json(url, headers=headers)
+    data = http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="account-v1.by-riot-id")
     return data["puuid"]
 
 
@@ -74,19 +83,25 @@ def fetch_match_ids(region: str, puuid: str, count: int, queue: str = None) -> L
     if queue:
         params["queue"] = queue
     url = _region_url(region, f"/lol/match/v5/matches/by-puuid/{puuid}/ids")
-    return http_get_json(url, headers=headers, params=params)
+    return http_get_json(
+        url,
+        headers=headers,
+        params=params,
+        limiter=riot_limiter(),
+        limit_key="match-v5.ids-by-puuid",
+    )
 
 
 def fetch_match(region: str, match_id: str) -> Dict:
     headers = _riot_headers()
     url = _region_url(region, f"/lol/match/v5/matches/{match_id}")
-    return http_get_json(url, headers=headers)
+    return http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="match-v5.match")
 
 
 def fetch_match_timeline(region: str, match_id: str) -> Dict:
     headers = _riot_headers()
     url = _region_url(region, f"/lol/match/v5/matches/{match_id}/timeline")
-    return http_get_json(url, headers=headers)
+    return http_get_json(url, headers=headers, limiter=riot_limiter(), limit_key="match-v5.timeline")
 
 
 def update_match_v5(config: Dict, data_dir: str, meta_dir: str) -> None:
@@ -97,17 +112,19 @@ def update_match_v5(config: Dict, data_dir: str, meta_dir: str) -> None:
     seed_names = config["riot"].get("seed_summoner_names", [])
     seed_riot_ids = config["riot"].get("seed_riot_ids", [])
     matches_per_seed = int(config["riot"].get("matches_per_seed", 10))
-    sleep_s = float(config["riot"].get("request_sleep_s", 0.2))
     fetch_timeline = bool(config["riot"].get("fetch_timeline", False))
+    configure_riot_limiter(config)
 
-    state_path = f"{meta_dir}/match_v5_state.json"
-    state = read_json(state_path, {})
-    seen_match_ids: Set[str] = set(state.get("seen_match_ids", []))
+    store = open_state_store(meta_dir)
+    store.import_json_state("match_v5", f"{meta_dir}/match_v5_state.json", {"seen_match_ids": "match_v5.match"})
+    merge_legacy_seen(store)
+    match_index = ensure_lolapi_index(data_dir, meta_dir)
 
+    progress = current_progress()
+    progress.stage("seeds")
     seed_summoner_ids: List[str] = []
     if leagues:
         seed_summoner_ids.extend(fetch_seed_summoner_ids(platform, leagues))
-        time.sleep(sleep_s)
 
     seed_puuids: List[str] = []
     for summoner_id in seed_summoner_ids:
@@ -115,14 +132,12 @@ def update_match_v5(config: Dict, data_dir: str, meta_dir: str) -> None:
             seed_puuids.append(fetch_puuid_by_summoner_id(platform, summoner_id))
         except Exception:
             continue
-        time.sleep(sleep_s)
 
     for name in seed_names:
         try:
             seed_puuids.append(fetch_puuid_by_name(platform, name))
         except Exception:
             continue
-        time.sleep(sleep_s)
 
     for riot_id in seed_riot_ids:
         if "#" not in riot_id:
@@ -132,39 +147,41 @@ def update_match_v5(config: Dict, data_dir: str, meta_dir: str) -> None:
             seed_puuids.append(fetch_puuid_by_riot_id(region, game_name, tag_line))
         except Exception:
             continue
-        time.sleep(sleep_s)
 
     new_match_ids: List[str] = []
+    progress.stage("match ids", total=len(seed_puuids))
     for puuid in seed_puuids:
+        progress.advance()
         try:
             ids = fetch_match_ids(region, puuid, matches_per_seed, queue=queue)
         except Exception:
             continue
         for match_id in ids:
-            if match_id not in seen_match_ids:
+            if match_id not in new_match_ids and not has_match(store, data_dir, region, match_id):
                 new_match_ids.append(match_id)
-        time.sleep(sleep_s)
 
+    progress.stage("matches", total=len(new_match_ids))
     for match_id in new_match_ids:
+        progress.advance()
         try:
             data = fetch_match(region, match_id)
         except Exception:
             continue
-        out_path = f"{data_dir}/raw/match_v5/{region}/{match_id}.json"
-        write_json(out_path, data)
+        save_match(data_dir, region, match_id, data)
+        index_match(match_index, region, match_id, data)
         if fetch_timeline:
             try:
                 timeline = fetch_match_timeline(region, match_id)
-                timeline_path = f"{data_dir}/raw/match_v5/{region}/{match_id}_timeline.json"
-                write_json(timeline_path, timeline)
+                save_timeline(data_dir, region, match_id, timeline)
+                index_timeline(match_index, region, match_id, timeline)
             except Exception:
                 pass
-        seen_match_ids.add(match_id)
-        time.sleep(sleep_s)
+        store.add(SEEN_NAMESPACE, [match_id])
 
-    update_state(state_path, {
-        "seen_match_ids": sorted(seen_match_ids),
+    match_index.close()
+    store.update_meta("match_v5", {
         "last_run_time": int(time.time()),
         "seed_players": seed_names,
         "seed_riot_ids": seed_riot_ids,
     })
+    store.close()
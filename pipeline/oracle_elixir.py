@@ -1,9 +1,13 @@
+import hashlib
+import os
 import shutil
 import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
-from .storage import update_state, write_json
+from .oracle_ingest import ingest_oracle_elixir
+from .progress import current_progress
+from .storage import read_json, update_state, write_json
 
 FOLDER_ID = "1gLSw0RLjBbtaNy0dgnGQDAZOHIgCe-HH"
 
@@ -20,7 +24,49 @@ def _list_csvs(root: Path) -> List[Path]:
     return list(root.rglob("*.csv"))
 
 
-def download_oracle_elixir_full(out_dir: str, keep_tmp: bool) -> List[Path]:
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _known_sha256(path: Path, name: str, known: Dict[str, Dict]) -> Optional[str]:
+    # Reuse the hash from the last run while the file's size and mtime are unchanged.
+    entry = known.get(name)
+    stat = path.stat()
+    if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+        return entry.get("sha256")
+    return _file_sha256(path)
+
+
+def sync_changed_files(src_dir: Path, out_path: Path, known: Dict[str, Dict]) -> Tuple[Dict[str, Dict], List[Path]]:
+    out_path.mkdir(parents=True, exist_ok=True)
+    hashes: Dict[str, Dict] = {}
+    changed: List[Path] = []
+    incoming = {item.relative_to(src_dir).as_posix(): item for item in src_dir.rglob("*") if item.is_file()}
+    for name, item in sorted(incoming.items()):
+        target = out_path / name
+        digest = _file_sha256(item)
+        if not (target.exists() and target.stat().st_size == item.stat().st_size
+                and _known_sha256(target, name, known) == digest):
+            # Copy next to the target first so readers never see a partial file.
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_target = target.with_name(f".{target.name}.tmp")
+            shutil.copy2(item, tmp_target)
+            os.replace(tmp_target, target)
+            changed.append(target)
+        stat = target.stat()
+        hashes[name] = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    for target in list(out_path.rglob("*")):
+        if target.is_file() and target.relative_to(out_path).as_posix() not in incoming:
+            target.unlink()
+            changed.append(target)
+    return hashes, changed
+
+
+def download_oracle_elixir_full(out_dir: str, keep_tmp: bool, known: Optional[Dict[str, Dict]] = None) -> Tuple[List[Path], Dict[str, Dict], List[Path]]:
     gdown = _require_gdown()
 
     out_path = Path(out_dir).resolve()
@@ -34,40 +80,43 @@ def download_oracle_elixir_full(out_dir: str, keep_tmp: bool) -> List[Path]:
     url = f"https://drive.google.com/drive/folders/{FOLDER_ID}"
     gdown.download_folder(url=url, output=str(tmp_dir), quiet=False, use_cookies=False)
 
-    if out_path.exists():
-        shutil.rmtree(out_path)
-    out_path.mkdir(parents=True, exist_ok=True)
-
-    for item in tmp_dir.iterdir():
-        target = out_path / item.name
-        if item.is_dir():
-            shutil.copytree(item, target)
-        else:
-            shutil.copy2(item, target)
+    hashes, changed = sync_changed_files(tmp_dir, out_path, known or {})
 
     saved = _list_csvs(out_path)
 
     if not keep_tmp:
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
-    return saved
+    return saved, hashes, changed
 
 
 def update_oracle_elixir(config: Dict, data_dir: str, meta_dir: str) -> None:
     oracle_cfg = config.get("oracle_elixir", {})
     keep_tmp = bool(oracle_cfg.get("keep_tmp", False))
+    ingest = bool(oracle_cfg.get("ingest", True))
     out_dir = oracle_cfg.get("out_dir") or f"{data_dir}/raw/oracle_elixir"
 
-    saved = download_oracle_elixir_full(out_dir, keep_tmp)
+    state_path = f"{meta_dir}/oracle_elixir_state.json"
+    known = read_json(state_path, {}).get("hashes", {})
+    progress = current_progress()
+    progress.stage("download")
+    saved, hashes, changed = download_oracle_elixir_full(out_dir, keep_tmp, known)
     update_state(
-        f"{meta_dir}/oracle_elixir_state.json",
+        state_path,
         {
             "last_run_time": int(time.time()),
             "files": [str(p) for p in saved],
+            "hashes": hashes,
+            "changed_files": [str(p) for p in changed],
         },
     )
     write_json(
         f"{meta_dir}/oracle_elixir_latest.json",
         {"files": [str(p) for p in saved]},
     )
+    print(f"Oracle's Elixir: {len(changed)} changed of {len(saved)} files")
+    # Unchanged CSVs keep their size and mtime, so ingest skips their years.
+    if ingest:
+        progress.stage("ingest")
+        ingest_oracle_elixir(config, data_dir, meta_dir)
 
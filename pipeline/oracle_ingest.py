@@ -0,0 +1,320 @@
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .oracle_rollups import ROLLUPS, build_rollup
+from .storage import update_state
+
+ORACLE_CSV_RE = re.compile(r"(\d{4})_LoL_esports_match_data_from_OraclesElixir\.csv")
+SOURCE_META_KEY = b"vislol.source"
+FORMAT_META_KEY = b"vislol.format"
+# Bump when the converted layout or ORACLE_SCHEMA changes so old files get rebuilt.
+CONVERTED_FORMAT = "2"
+
+# Every Oracle's Elixir column the server reads. Numeric columns are stored with
+# non-finite values replaced by 0, which is the default every query applies.
+ORACLE_SCHEMA: Dict[str, str] = {
+    "gameid": "string",
+    "league": "category",
+    "year": "int16",
+    "split": "string",
+    "date": "string",
+    "patch": "string",
+    "side": "category",
+    "position": "category",
+    "teamname": "category",
+    "teamid": "string",
+    "playername": "string",
+    "playerid": "string",
+    "champion": "category",
+    "result": "int8",
+    "gamelength": "int32",
+    "kills": "int16",
+    "deaths": "int16",
+    "assists": "int16",
+    "teamkills": "int16",
+    "damagetochampions": "int32",
+    "totalgold": "int32",
+    "earned gpm": "float32",
+    "dpm": "float32",
+    "visionscore": "float32",
+    "damageshare": "float32",
+    "ban1": "string",
+    "ban2": "string",
+    "ban3": "string",
+    "ban4": "string",
+    "ban5": "string",
+}
+
+
+def _require_arrow():
+    try:
+        import pandas as pd  # type: ignore
+        import pyarrow as pa  # type: ignore
+        import pyarrow.feather as feather  # type: ignore
+    except Exception as exc:
+        raise RuntimeError("pandas and pyarrow are required. Install with: pip install pandas pyarrow") from exc
+    return pd, pa, feather
+
+
+def oracle_csv_dir(config: Dict, data_dir: str) -> Path:
+    out_dir = config.get("oracle_elixir", {}).get("out_dir") or f"{data_dir}/raw/oracle_elixir"
+    return Path(out_dir)
+
+
+def oracle_processed_dir(data_dir: str) -> Path:
+    return Path(data_dir) / "processed" / "oracle_elixir"
+
+
+def converted_path(data_dir: str, year: str) -> Path:
+    return oracle_processed_dir(data_dir) / f"{year}.arrow"
+
+
+def rollup_path(data_dir: str, year: str, name: str) -> Path:
+    return oracle_processed_dir(data_dir) / "rollups" / f"{year}_{name}.arrow"
+
+
+def gameid_index_path(data_dir: str) -> Path:
+    return oracle_processed_dir(data_dir) / "gameid_index.sqlite"
+
+
+def list_oracle_csvs(csv_dir: Path) -> Dict[str, Path]:
+    found: Dict[str, Path] = {}
+    if not csv_dir.exists():
+        return found
+    for file in csv_dir.glob("*_LoL_esports_match_data_from_OraclesElixir.csv"):
+        match = ORACLE_CSV_RE.fullmatch(file.name)
+        if match:
+            found[match.group(1)] = file
+    return dict(sorted(found.items()))
+
+
+def source_fingerprint(csv_path: Path) -> str:
+    stat = csv_path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _read_converted_metadata(arrow_path: Path) -> Dict[bytes, bytes]:
+    try:
+        import pyarrow as pa  # type: ignore
+    except Exception:
+        return {}
+    try:
+        with pa.memory_map(str(arrow_path), "r") as source:
+            return pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return {}
+
+
+def is_converted_fresh(csv_path: Path, arrow_path: Path) -> bool:
+    if not arrow_path.exists():
+        return False
+    metadata = _read_converted_metadata(arrow_path)
+    if metadata.get(FORMAT_META_KEY, b"").decode("utf-8") != CONVERTED_FORMAT:
+        return False
+    return metadata.get(SOURCE_META_KEY, b"").decode("utf-8") == source_fingerprint(csv_path)
+
+
+def coerce_numeric(series, dtype: str, default: float = 0):
+    import numpy as np  # type: ignore
+    import pandas as pd  # type: ignore
+
+    if not pd.api.types.is_numeric_dtype(series.dtype):
+        series = pd.to_numeric(series, errors="coerce")
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    values = np.where(np.isfinite(values), values, default)
+    return pd.Series(values.astype(dtype), index=series.index, name=series.name)
+
+
+def apply_oracle_schema(df):
+    for col, dtype in ORACLE_SCHEMA.items():
+        if col not in df.columns:
+            continue
+        if dtype == "string":
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+        elif dtype == "category":
+            df[col] = df[col].astype("category")
+        else:
+            df[col] = coerce_numeric(df[col], dtype)
+    return df
+
+
+def read_oracle_csv(csv_path: Path, columns: Optional[List[str]] = None):
+    import pandas as pd  # type: ignore
+
+    text_columns = {col: str for col, dtype in ORACLE_SCHEMA.items() if dtype in ("string", "category")}
+    wanted = set(columns) if columns is not None else None
+    df = pd.read_csv(
+        csv_path,
+        usecols=(lambda c: c in wanted) if wanted is not None else None,
+        dtype=text_columns,
+        low_memory=False,
+    )
+    return apply_oracle_schema(df)
+
+
+def write_derived(df, out_path: Path, fingerprint: str) -> Path:
+    pd, pa, feather = _require_arrow()
+    for col in df.columns:
+        if col in ORACLE_SCHEMA:
+            continue
+        if df[col].dtype == object:
+            df[col] = df[col].astype("string")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Drop the pandas metadata so object columns come back as plain objects.
+    table = table.replace_schema_metadata({
+        SOURCE_META_KEY: fingerprint.encode("utf-8"),
+        FORMAT_META_KEY: CONVERTED_FORMAT.encode("utf-8"),
+    })
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_suffix(".arrow.tmp")
+    # Uncompressed IPC so readers can memory-map the columns without decoding.
+    feather.write_feather(table, str(tmp_path), compression="uncompressed")
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def convert_oracle_csv(csv_path: Path, out_path: Path):
+    fingerprint = source_fingerprint(csv_path)
+    df = read_oracle_csv(csv_path)
+    write_derived(df, out_path, fingerprint)
+    return df
+
+
+def read_converted(arrow_path: Path):
+    _, _, feather = _require_arrow()
+    return feather.read_table(str(arrow_path), memory_map=True).to_pandas()
+
+
+def _open_gameid_index(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS games ("
+        "gameid TEXT NOT NULL, year TEXT NOT NULL, start INTEGER NOT NULL, stop INTEGER NOT NULL, "
+        "PRIMARY KEY (gameid, year))"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS sources (year TEXT PRIMARY KEY, fingerprint TEXT NOT NULL)")
+    return conn
+
+
+def gameid_index_fingerprints(db_path: Path) -> Dict[str, str]:
+    if not db_path.exists():
+        return {}
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return dict(conn.execute("SELECT year, fingerprint FROM sources").fetchall())
+    except sqlite3.DatabaseError:
+        return {}
+    finally:
+        conn.close()
+
+
+def build_gameid_index(db_path: Path, year: str, df, fingerprint: str) -> None:
+    import numpy as np  # type: ignore
+    import pandas as pd  # type: ignore
+
+    # Row ranges refer to the converted file, which keeps the CSV row order.
+    positions = pd.Series(np.arange(df.shape[0]), index=df.index)
+    ranges = positions.groupby(df["gameid"]).agg(["min", "max"])
+    rows = [(str(gameid), year, int(lo), int(hi) + 1) for gameid, lo, hi in ranges.itertuples()]
+    conn = _open_gameid_index(db_path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM games WHERE year = ?", (year,))
+            conn.executemany("INSERT INTO games (gameid, year, start, stop) VALUES (?, ?, ?, ?)", rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO sources (year, fingerprint) VALUES (?, ?)",
+                (year, fingerprint),
+            )
+    finally:
+        conn.close()
+
+
+def prune_gameid_index(db_path: Path, years: List[str]) -> None:
+    if not db_path.exists():
+        return
+    conn = _open_gameid_index(db_path)
+    placeholders = ",".join("?" for _ in years) or "''"
+    try:
+        with conn:
+            conn.execute(f"DELETE FROM games WHERE year NOT IN ({placeholders})", years)
+            conn.execute(f"DELETE FROM sources WHERE year NOT IN ({placeholders})", years)
+    finally:
+        conn.close()
+
+
+def lookup_gameid(db_path: Path, game_id: str) -> List[Tuple[str, int, int]]:
+    if not db_path.exists():
+        return []
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute(
+            "SELECT year, start, stop FROM games WHERE gameid = ? ORDER BY year",
+            (game_id,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def prune_derived(data_dir: str, years: List[str]) -> None:
+    # Drop converted files and rollups whose source CSV no longer exists.
+    processed = oracle_processed_dir(data_dir)
+    for path in list(processed.glob("*.arrow")) + list(processed.glob("rollups/*.arrow")):
+        if path.name.split("_")[0].split(".")[0] not in years:
+            path.unlink()
+
+
+def ingest_oracle_elixir(
+    config: Dict,
+    data_dir: str,
+    meta_dir: str,
+    years: Optional[List[str]] = None,
+    force: bool = False,
+) -> List[str]:
+    csvs = list_oracle_csvs(oracle_csv_dir(config, data_dir))
+    index_path = gameid_index_path(data_dir)
+    indexed = gameid_index_fingerprints(index_path)
+    converted: List[str] = []
+    rebuilt_rollups: List[str] = []
+    for year, csv_path in csvs.items():
+        if years and year not in years:
+            continue
+        out_path = converted_path(data_dir, year)
+        df = None
+        if force or not is_converted_fresh(csv_path, out_path):
+            df = convert_oracle_csv(csv_path, out_path)
+            converted.append(year)
+        fingerprint = source_fingerprint(csv_path)
+        stale = [
+            name for name in ROLLUPS
+            if force or df is not None or not is_converted_fresh(csv_path, rollup_path(data_dir, year, name))
+        ]
+        index_stale = force or df is not None or indexed.get(year) != fingerprint
+        if not stale and not index_stale:
+            continue
+        if df is None:
+            df = read_converted(out_path)
+        if index_stale:
+            build_gameid_index(index_path, year, df, fingerprint)
+        if not stale:
+            continue
+        for name in stale:
+            write_derived(build_rollup(name, df), rollup_path(data_dir, year, name), fingerprint)
+        rebuilt_rollups.append(year)
+    if not years:
+        prune_gameid_index(index_path, list(csvs))
+        prune_derived(data_dir, list(csvs))
+    update_state(
+        f"{meta_dir}/oracle_ingest_state.json",
+        {
+            "last_run_time": int(time.time()),
+            "years": list(csvs),
+            "converted_years": converted,
+            "rollup_years": rebuilt_rollups,
+        },
+    )
+    return converted
@@ -0,0 +1,152 @@
+from typing import Callable, Dict, List
+
+# Additive partial aggregates per year file. Every rollup keeps league and split
+# as keys (nulls included) so any league filter is a sum over cube rows.
+# firstRow is the position of the group's first source row; it orders leagues
+# and breaks count ties by first appearance, as a scan over the rows would.
+
+TEAM_COLUMNS = [
+    "league", "split", "gameid", "teamname", "teamid", "position", "result",
+    "earned gpm", "dpm", "visionscore", "damageshare", "damagetochampions",
+    "kills", "deaths", "assists",
+]
+PLAYER_COLUMNS = [
+    "league", "split", "playername", "playerid", "position", "result",
+    "dpm", "visionscore", "earned gpm", "kills", "deaths", "assists", "teamkills",
+]
+CHAMPION_COLUMNS = ["league", "split", "position", "champion", "result", "side"]
+BAN_COLUMNS = ["league", "split", "position", "ban1", "ban2", "ban3", "ban4", "ban5"]
+
+
+def _row_positions(df):
+    import numpy as np  # type: ignore
+
+    return np.arange(df.shape[0])
+
+
+def _widen(df, columns: List[str], dtype: str):
+    # The stored columns are narrow (int8/float32); sums over a year need room.
+    return df.assign(**{col: df[col].astype(dtype) for col in columns})
+
+
+def build_team_rollup(df):
+    df = _widen(df, ["earned gpm", "dpm", "visionscore", "damageshare"], "float64")
+    df = _widen(df, ["result"], "int64")
+    players = df[df["position"] != "team"]
+    teams = df[df["position"] == "team"]
+    if not players.empty:
+        team_damage = (
+            players.groupby(["teamname", "teamid", "gameid"], observed=True)["damagetochampions"]
+            .sum()
+            .reset_index()
+        )
+        game_total = (
+            players.groupby(["gameid"])["damagetochampions"]
+            .sum()
+            .reset_index()
+            .rename(columns={"damagetochampions": "game_damage"})
+        )
+        team_damage = team_damage.merge(game_total, on="gameid", how="left")
+        team_damage["team_damage_share"] = team_damage["damagetochampions"] / team_damage["game_damage"].replace(0, 1)
+        teams = teams.merge(
+            team_damage[["teamname", "teamid", "gameid", "team_damage_share"]],
+            on=["teamname", "teamid", "gameid"],
+            how="left",
+        )
+        teams["damageshare"] = teams["team_damage_share"].fillna(teams["damageshare"])
+    teams = teams.assign(kda=(teams["kills"] + teams["assists"]) / teams["deaths"].replace(0, 1))
+    return (
+        teams.groupby(["league", "split", "teamname", "teamid"], dropna=False, observed=True)
+        .agg(
+            matches=("result", "size"),
+            wins=("result", "sum"),
+            sumDpm=("dpm", "sum"),
+            sumEarnedGpm=("earned gpm", "sum"),
+            sumVision=("visionscore", "sum"),
+            sumDamageShare=("damageshare", "sum"),
+            sumKda=("kda", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def build_player_rollup(df):
+    df = _widen(df, ["earned gpm", "dpm", "visionscore"], "float64")
+    df = _widen(df, ["result"], "int64")
+    df = df[df["position"] != "team"]
+    df = df.assign(
+        kda=(df["kills"] + df["assists"]) / df["deaths"].replace(0, 1),
+        kp=(df["kills"] + df["assists"]) / df["teamkills"].replace(0, 1),
+    )
+    return (
+        df.groupby(["league", "split", "playername", "playerid", "position"], dropna=False, observed=True)
+        .agg(
+            matches=("result", "size"),
+            wins=("result", "sum"),
+            sumDpm=("dpm", "sum"),
+            sumEarnedGpm=("earned gpm", "sum"),
+            sumVision=("visionscore", "sum"),
+            sumKda=("kda", "sum"),
+            sumKp=("kp", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def build_champion_rollup(df):
+    df = _widen(df, ["result"], "int64")
+    df = df.assign(_row=_row_positions(df))
+    df = df[df["position"] != "team"]
+    df = df.assign(
+        blue=(df["side"] == "Blue").astype("int32"),
+        red=(df["side"] == "Red").astype("int32"),
+    )
+    return (
+        df.groupby(["league", "split", "position", "champion"], dropna=False, observed=True)
+        .agg(
+            picks=("result", "size"),
+            wins=("result", "sum"),
+            bluePicks=("blue", "sum"),
+            redPicks=("red", "sum"),
+            firstRow=("_row", "min"),
+        )
+        .reset_index()
+    )
+
+
+def build_ban_rollup(df):
+    import pandas as pd  # type: ignore
+
+    df = df.assign(_row=_row_positions(df))
+    df = df[df["position"] == "team"]
+    parts = []
+    for slot, col in enumerate(["ban1", "ban2", "ban3", "ban4", "ban5"]):
+        part = df[["league", "split", col, "_row"]].rename(columns={col: "champion"})
+        # Match the row-major order of DataFrame.stack() over ban1..ban5.
+        parts.append(part.assign(_row=part["_row"] * 5 + slot))
+    bans = pd.concat(parts, ignore_index=True)
+    bans = bans[bans["champion"].notna()]
+    return (
+        bans.groupby(["league", "split", "champion"], dropna=False, observed=True)
+        .agg(bans=("_row", "size"), firstRow=("_row", "min"))
+        .reset_index()
+    )
+
+
+ROLLUPS: Dict[str, Callable] = {
+    "team": build_team_rollup,
+    "player": build_player_rollup,
+    "champion": build_champion_rollup,
+    "ban": build_ban_rollup,
+}
+
+ROLLUP_COLUMNS: Dict[str, List[str]] = {
+    "team": TEAM_COLUMNS,
+    "player": PLAYER_COLUMNS,
+    "champion": CHAMPION_COLUMNS,
+    "ban": BAN_COLUMNS,
+}
+
+
+def build_rollup(name: str, df):
+    return ROLLUPS[name](df[ROLLUP_COLUMNS[name]])
@@ -0,0 +1,262 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process.
+    fcntl = None
+
+from .storage import (
+    COMPRESSION_SUFFIXES,
+    decode_json_bytes,
+    encode_json_bytes,
+    find_json,
+    iter_json_files,
+    json_variants,
+    load_json_file,
+    storage_settings,
+    write_raw_json,
+)
+
+# Append-only pack files for raw objects that would otherwise be one small file
+# each. A namespace directory holds numbered segment files and index.sqlite,
+# which maps a key (matchId, eventId) to the segment, offset and length of its
+# latest record. Records are encoded like write_raw_json would store them.
+# Several processes (the lolapi and match tasks, API-launched jobs) may append
+# to one namespace, so a write holds an flock on the namespace's write.lock
+# while it picks the segment, appends and records the offset.
+
+SEGMENT_NAME = "seg-{:06d}.pack"
+LOCK_NAME = "write.lock"
+
+
+def packs_root(data_dir: str) -> Path:
+    return Path(data_dir) / "raw" / "packs"
+
+
+def pack_dir(data_dir: str, namespace: str) -> Path:
+    return packs_root(data_dir) / namespace
+
+
+class PackStore:
+    def __init__(self, root: Path, segment_bytes: int = 256 * 1024 * 1024, readonly: bool = False):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None:
+            return self._conn
+        db_path = self.root / "index.sqlite"
+        if self.readonly:
+            if not db_path.exists():
+                return None
+            self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+            return self._conn
+        self.root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS objects ("
+            "key TEXT PRIMARY KEY, segment INTEGER NOT NULL, offset INTEGER NOT NULL, "
+            "length INTEGER NOT NULL, codec TEXT NOT NULL)"
+        )
+        self._conn = conn
+        return conn
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.root / SEGMENT_NAME.format(segment)
+
+    def _active_segment(self) -> int:
+        segments = sorted(int(p.stem.split("-")[1]) for p in self.root.glob("seg-*.pack"))
+        if not segments:
+            return 0
+        last = segments[-1]
+        if self._segment_path(last).stat().st_size >= self.segment_bytes:
+            return last + 1
+        return last
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / LOCK_NAME, "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def put(self, key: str, data: Any) -> None:
+        settings = storage_settings()
+        payload = encode_json_bytes(data, settings["compression"], settings["level"])
+        with self._write_lock():
+            conn = self._db()
+            segment = self._active_segment()
+            fd = os.open(self._segment_path(segment), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                view = memoryview(payload)
+                while view:
+                    view = view[os.write(fd, view):]
+                # The record ends at the end of the file while the lock is held.
+                offset = os.fstat(fd).st_size - len(payload)
+            finally:
+                os.close(fd)
+            # The index row is written after the bytes, so a crash only leaves
+            # an unreferenced tail in the segment.
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO objects (key, segment, offset, length, codec) VALUES (?, ?, ?, ?, ?)",
+                    (key, segment, offset, len(payload), settings["compression"]),
+                )
+
+    def _locate(self, key: str) -> Optional[Tuple[int, int, int, str]]:
+        with self._lock:
+            conn = self._db()
+            if conn is None:
+                return None
+            return conn.execute(
+                "SELECT segment, offset, length, codec FROM objects WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+    def has(self, key: str) -> bool:
+        return self._locate(key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        found = self._locate(key)
+        if found is None:
+            return default
+        segment, offset, length, codec = found
+        with self._segment_path(segment).open("rb") as f:
+            f.seek(offset)
+            raw = f.read(length)
+        return decode_json_bytes("record" + COMPRESSION_SUFFIXES[codec], raw)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            conn = self._db()
+            if conn is None:
+                return []
+            return [row[0] for row in conn.execute("SELECT key FROM objects ORDER BY key")]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# One store per namespace root and process, so repeated lookups share a single
+# index connection instead of opening a new one each time.
+_writers: Dict[str, PackStore] = {}
+_readers: Dict[str, PackStore] = {}
+_writers_lock = threading.Lock()
+
+
+def pack_writer(data_dir: str, namespace: str) -> PackStore:
+    root = pack_dir(data_dir, namespace).resolve()
+    with _writers_lock:
+        store = _writers.get(str(root))
+        if store is None:
+            segment_mb = float(storage_settings().get("segment_mb") or 256)
+            store = PackStore(root, segment_bytes=int(segment_mb * 1024 * 1024))
+            _writers[str(root)] = store
+        return store
+
+
+def pack_reader(data_dir: str, namespace: str) -> PackStore:
+    root = pack_dir(data_dir, namespace).resolve()
+    with _writers_lock:
+        store = _readers.get(str(root))
+        if store is None:
+            store = PackStore(root, readonly=True)
+            _readers[str(root)] = store
+        return store
+
+
+def save_object(data_dir: str, namespace: str, key: str, loose_path: str, data: Any) -> None:
+    # Write to the pack when packs are enabled, otherwise to the loose file.
+    if storage_settings()["packs"]:
+        pack_writer(data_dir, namespace).put(key, data)
+        for candidate in json_variants(loose_path):
+            if os.path.exists(candidate):
+                os.remove(candidate)
+    else:
+        write_raw_json(loose_path, data)
+
+
+def object_exists(data_dir: str, namespace: str, key: str, loose_path: str) -> bool:
+    if find_json(loose_path) is not None:
+        return True
+    return pack_store(data_dir, namespace).has(key)
+
+
+def load_object(data_dir: str, namespace: str, key: str, loose_path: str, default: Any) -> Any:
+    found = find_json(loose_path)
+    if found is not None:
+        return load_json_file(found)
+    return pack_store(data_dir, namespace).get(key, default)
+
+
+def pack_store(data_dir: str, namespace: str) -> PackStore:
+    # The pipeline's own writer sees its latest records; other readers open read-only.
+    root = str(pack_dir(data_dir, namespace).resolve())
+    with _writers_lock:
+        store = _writers.get(root)
+    return store if store is not None else pack_reader(data_dir, namespace)
+
+
+def iter_objects(data_dir: str, namespace: str, loose_dir: str) -> Iterator[Tuple[str, str]]:
+    # (key, source) pairs for loose files and packed records; loose files win.
+    loose = {}
+    for name, path in iter_json_files(loose_dir):
+        loose[name[: -len(".json")]] = path
+    for key, path in loose.items():
+        yield key, path
+    for key in pack_store(data_dir, namespace).keys():
+        if key not in loose:
+            yield key, ""
+
+
+def compact_loose_files(data_dir: str, namespace: str, loose_dir: str, skip_suffix: Optional[str] = None) -> int:
+    store = pack_writer(data_dir, namespace)
+    moved = 0
+    for name, path in list(iter_json_files(loose_dir)):
+        key = name[: -len(".json")]
+        if skip_suffix and key.endswith(skip_suffix):
+            continue
+        store.put(key, load_json_file(path))
+        os.remove(path)
+        moved += 1
+    return moved
+
+
+def pack_namespaces(data_dir: str) -> List[Tuple[str, str, Optional[str]]]:
+    # (namespace, loose directory, key suffix to leave alone) for every packable tree.
+    raw = Path(data_dir) / "raw"
+    found: List[Tuple[str, str, Optional[str]]] = []
+    match_dir = raw / "matches"
+    if match_dir.exists():
+        for region_dir in sorted(p for p in match_dir.iterdir() if p.is_dir()):
+            found.append((f"matches/{region_dir.name}", str(region_dir), "_timeline"))
+            found.append((f"timelines/{region_dir.name}", str(region_dir / "timeline"), None))
+    found.append(("esports_gw/events", str(raw / "esports_gw" / "events"), None))
+    return found
+
+
+def compact_packs(data_dir: str) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for namespace, loose_dir, skip_suffix in pack_namespaces(data_dir):
+        moved = compact_loose_files(data_dir, namespace, loose_dir, skip_suffix)
+        if moved:
+            counts[namespace] = moved
+    return counts
@@ -0,0 +1,115 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Structured progress for a running task: current stage, items done/total,
+# HTTP requests made and bytes received. A task tracked with track() binds its
+# Progress to the calling thread; worker pools pass initializer=progress.bind
+# so requests made by their threads are counted too. Listeners get a snapshot
+# on every stage change and at most every EMIT_INTERVAL_S otherwise; untracked
+# code gets a Progress that reports to nobody.
+
+EMIT_INTERVAL_S = 0.25
+
+Listener = Callable[[Dict[str, Any]], None]
+
+_listeners: List[Listener] = []
+_listeners_lock = threading.Lock()
+_local = threading.local()
+
+
+class Progress:
+    def __init__(self, task: str):
+        self.task = task
+        self.stage_name: Optional[str] = None
+        self.done = 0
+        self.total: Optional[int] = None
+        self.requests = 0
+        self.bytes = 0
+        self.started_at = time.time()
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+
+    def bind(self) -> None:
+        _local.progress = self
+
+    def stage(self, name: str, total: Optional[int] = None) -> None:
+        with self._lock:
+            self.stage_name = name
+            self.done = 0
+            self.total = total
+        self._emit(force=True)
+
+    def advance(self, count: int = 1) -> None:
+        with self._lock:
+            self.done += count
+            force = self.total is not None and self.done >= self.total
+        self._emit(force=force)
+
+    def record_request(self, nbytes: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.bytes += nbytes
+        self._emit()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "task": self.task,
+                "stage": self.stage_name,
+                "done": self.done,
+                "total": self.total,
+                "requests": self.requests,
+                "bytes": self.bytes,
+                "startedAt": self.started_at,
+                "elapsedS": round(time.time() - self.started_at, 3),
+            }
+
+    def _emit(self, force: bool = False) -> None:
+        if not self.task:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_emit < EMIT_INTERVAL_S:
+                return
+            self._last_emit = now
+        snapshot = self.snapshot()
+        with _listeners_lock:
+            listeners = list(_listeners)
+        for listener in listeners:
+            listener(snapshot)
+
+
+_untracked = Progress("")
+
+
+def current_progress() -> Progress:
+    return getattr(_local, "progress", None) or _untracked
+
+
+def record_request(nbytes: int) -> None:
+    current_progress().record_request(nbytes)
+
+
+@contextmanager
+def track(task: str) -> Iterator[Progress]:
+    previous = getattr(_local, "progress", None)
+    progress = Progress(task)
+    progress.bind()
+    try:
+        yield progress
+    finally:
+        progress._emit(force=True)
+        _local.progress = previous
+
+
+def add_progress_listener(listener: Listener) -> None:
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_progress_listener(listener: Listener) -> None:
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
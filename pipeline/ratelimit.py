@@ -0,0 +1,174 @@
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+
+# Riot API rate limits, learned from response headers. Every response carries
+# X-App-Rate-Limit / X-Method-Rate-Limit ("20:1,100:120" = 20 requests per
+# second and 100 per two minutes) plus -Count headers with the usage the
+# server has recorded. Application limits are per routing host (na1, americas,
+# ...); method limits are per host and endpoint.
+
+DEFAULT_APP_LIMITS = "20:1,100:120"
+# The public sources (Data Dragon, the esports API and its livestats feed)
+# send no rate headers. Each gets its own limiter with the fixed limits in its
+# config section's rate_limits, so sources that run side by side in
+# `pipeline all` are paced independently of each other and of Riot.
+DEFAULT_SOURCE_LIMITS = {"ddragon": "50:1", "esports": "20:1", "livestats": "20:1"}
+
+
+def parse_limits(value: Optional[str]) -> List[Tuple[int, float]]:
+    # "20:1,100:120" -> [(20, 1.0), (100, 120.0)]
+    pairs: List[Tuple[int, float]] = []
+    for part in (value or "").split(","):
+        count, _, window = part.strip().partition(":")
+        try:
+            pairs.append((int(count), float(window)))
+        except ValueError:
+            continue
+    return pairs
+
+
+class Bucket:
+    def __init__(self, limit: int, window_s: float):
+        self.limit = limit
+        self.window_s = window_s
+        self.count = 0
+        self.reset_at = 0.0
+
+    def _roll(self, now: float) -> None:
+        if now >= self.reset_at:
+            self.count = 0
+            self.reset_at = now + self.window_s
+
+    def wait_time(self, now: float) -> float:
+        self._roll(now)
+        return 0.0 if self.count < self.limit else self.reset_at - now
+
+    def take(self, now: float) -> None:
+        self._roll(now)
+        self.count += 1
+
+    def observe(self, server_count: int, now: float) -> None:
+        # Trust the server's count when it is ahead of ours, e.g. after a
+        # restart or when another process shares the key.
+        self._roll(now)
+        if server_count > self.count:
+            self.count = server_count
+
+
+class RateLimiter:
+    def __init__(self, app_limits: str = DEFAULT_APP_LIMITS, margin: int = 0):
+        self.initial_app_limits = parse_limits(app_limits)
+        self.margin = margin
+        self._buckets: Dict[Tuple[str, ...], List[Bucket]] = {}
+        self._blocked_until: Dict[Tuple[str, ...], float] = {}
+        self._cond = threading.Condition()
+
+    def _keys(self, host: str, method: Optional[str]) -> List[Tuple[str, ...]]:
+        keys: List[Tuple[str, ...]] = [("app", host)]
+        if method:
+            keys.append(("method", host, method))
+        return keys
+
+    def _bucket_list(self, key: Tuple[str, ...]) -> List[Bucket]:
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            # Until the first response, application buckets use the configured limits.
+            limits = self.initial_app_limits if key[0] == "app" else []
+            buckets = [Bucket(max(1, limit - self.margin), window) for limit, window in limits]
+            self._buckets[key] = buckets
+        return buckets
+
+    def acquire(self, host: str, method: Optional[str] = None) -> None:
+        keys = self._keys(host, method)
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = max([self._blocked_until.get(key, 0.0) - now for key in keys] + [0.0])
+                for key in keys:
+                    for bucket in self._bucket_list(key):
+                        wait = max(wait, bucket.wait_time(now))
+                if wait <= 0:
+                    for key in keys:
+                        for bucket in self._bucket_list(key):
+                            bucket.take(now)
+                    return
+                self._cond.wait(wait)
+
+    def update(self, host: str, method: Optional[str], headers: Mapping[str, str]) -> None:
+        now = time.monotonic()
+        scopes = [(("app", host), "x-app-rate-limit")]
+        if method:
+            scopes.append((("method", host, method), "x-method-rate-limit"))
+        with self._cond:
+            for key, header in scopes:
+                limits = parse_limits(headers.get(header))
+                if not limits:
+                    continue
+                counts = {window: count for count, window in parse_limits(headers.get(f"{header}-count"))}
+                existing = {b.window_s: b for b in self._bucket_list(key)}
+                buckets = []
+                for limit, window in limits:
+                    bucket = existing.get(window) or Bucket(limit, window)
+                    bucket.limit = max(1, limit - self.margin)
+                    if window in counts:
+                        bucket.observe(counts[window], now)
+                    buckets.append(bucket)
+                self._buckets[key] = buckets
+            self._cond.notify_all()
+
+    def penalize(self, host: str, method: Optional[str], retry_after_s: float, limit_type: Optional[str] = None) -> None:
+        # A 429 blocks the scope it names; without a type, block the whole host.
+        if limit_type == "method" and method:
+            key: Tuple[str, ...] = ("method", host, method)
+        else:
+            key = ("app", host)
+        with self._cond:
+            until = time.monotonic() + max(retry_after_s, 0.0)
+            self._blocked_until[key] = max(self._blocked_until.get(key, 0.0), until)
+            self._cond.notify_all()
+
+
+_riot_limiter: Optional[RateLimiter] = None
+_riot_limiter_lock = threading.Lock()
+
+
+def configure_riot_limiter(config: Dict) -> RateLimiter:
+    global _riot_limiter
+    riot_cfg = config.get("riot", {})
+    limiter = RateLimiter(
+        app_limits=riot_cfg.get("rate_limits") or DEFAULT_APP_LIMITS,
+        margin=int(riot_cfg.get("rate_limit_margin", 0)),
+    )
+    with _riot_limiter_lock:
+        _riot_limiter = limiter
+    return limiter
+
+
+def riot_limiter() -> RateLimiter:
+    global _riot_limiter
+    with _riot_limiter_lock:
+        if _riot_limiter is None:
+            _riot_limiter = RateLimiter()
+        return _riot_limiter
+
+
+_source_limiters: Dict[str, RateLimiter] = {}
+_source_limiters_lock = threading.Lock()
+
+
+def configure_source_limiter(source: str, config: Dict) -> RateLimiter:
+    limits = config.get(source, {}).get("rate_limits") or DEFAULT_SOURCE_LIMITS[source]
+    limiter = RateLimiter(app_limits=limits)
+    with _source_limiters_lock:
+        _source_limiters[source] = limiter
+    return limiter
+
+
+def source_limiter(source: str) -> RateLimiter:
+    with _source_limiters_lock:
+        limiter = _source_limiters.get(source)
+        if limiter is None:
+            limiter = RateLimiter(app_limits=DEFAULT_SOURCE_LIMITS[source])
+            _source_limiters[source] = limiter
+        return limiter
@@ -0,0 +1,112 @@
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Sequence
+
+from .progress import track
+
+# Runs pipeline steps as a small dependency graph. Steps whose inputs are ready
+# start right away on a thread pool, so sources on different hosts download
+# side by side and a downstream step (livestats after esports) starts as soon
+# as its own inputs finish rather than after everything else. A step whose
+# dependency failed is skipped. Dependencies on steps that are not part of the
+# run are ignored.
+
+
+class Step:
+    def __init__(self, name: str, run: Callable[[], Any], after: Sequence[str] = ()):
+        self.name = name
+        self.run = run
+        self.after = tuple(after)
+
+
+def _check_order(steps: List[Step]) -> None:
+    names = {step.name for step in steps}
+    if len(names) != len(steps):
+        raise ValueError("duplicate step names")
+    ready: set = set()
+    remaining = list(steps)
+    while remaining:
+        runnable = [step for step in remaining if all(dep in ready or dep not in names for dep in step.after)]
+        if not runnable:
+            raise ValueError("step dependencies form a cycle: " + ", ".join(step.name for step in remaining))
+        ready.update(step.name for step in runnable)
+        remaining = [step for step in remaining if step.name not in ready]
+
+
+def _run_step(step: Step, run_start: float) -> Dict[str, Any]:
+    print(f"[{step.name}] started")
+    start = time.monotonic()
+    status, error = "success", None
+    with track(step.name) as progress:
+        try:
+            step.run()
+        except Exception as exc:
+            status, error = "error", f"{type(exc).__name__}: {exc}"
+            traceback.print_exc()
+    snapshot = progress.snapshot()
+    elapsed = time.monotonic() - start
+    print(f"[{step.name}] {status} in {elapsed:.1f}s")
+    return {
+        "name": step.name,
+        "status": status,
+        "error": error,
+        "start_s": start - run_start,
+        "elapsed_s": elapsed,
+        "requests": snapshot["requests"],
+        "bytes": snapshot["bytes"],
+    }
+
+
+def run_steps(steps: List[Step], workers: int = 4) -> List[Dict[str, Any]]:
+    # One result per step, in the order given: name, status (success, error or
+    # skipped), error, start_s (from the start of the run), elapsed_s,
+    # requests, bytes.
+    _check_order(steps)
+    names = {step.name for step in steps}
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = list(steps)
+    running: Dict[Future, Step] = {}
+    run_start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pipeline") as executor:
+        while pending or running:
+            for step in list(pending):
+                deps = [dep for dep in step.after if dep in names]
+                if any(dep not in results for dep in deps):
+                    continue
+                pending.remove(step)
+                failed = [dep for dep in deps if results[dep]["status"] != "success"]
+                if failed:
+                    print(f"[{step.name}] skipped: {', '.join(failed)} did not succeed")
+                    results[step.name] = {
+                        "name": step.name,
+                        "status": "skipped",
+                        "error": None,
+                        "start_s": None,
+                        "elapsed_s": 0.0,
+                        "requests": 0,
+                        "bytes": 0,
+                    }
+                    continue
+                running[executor.submit(_run_step, step, run_start)] = step
+            if not running:
+                # Skipping a step may have made others decidable.
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                results[step.name] = future.result()
+    return [results[step.name] for step in steps]
+
+
+def format_summary(results: List[Dict[str, Any]], total_s: float) -> str:
+    lines = [f"{'stage':<16}{'status':<10}{'start':>9}{'time':>9}{'requests':>10}{'MB':>9}"]
+    for result in results:
+        start = f"{result['start_s']:.1f}s" if result["start_s"] is not None else "-"
+        lines.append(
+            f"{result['name']:<16}{result['status']:<10}{start:>9}{result['elapsed_s']:>8.1f}s"
+            f"{result['requests']:>10}{result['bytes'] / (1024 * 1024):>9.1f}"
+        )
+    busy = sum(result["elapsed_s"] for result in results)
+    lines.append(f"total {total_s:.1f}s wall, {busy:.1f}s of stage time")
+    return "\n".join(lines)
@@ -0,0 +1,111 @@
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Seen ids and run metadata for the crawling pipelines, replacing the lists that
+# used to be rewritten into the *_state.json files on every flush. Ids live in
+# (namespace, id) rows such as ("lolapi.match", "NA1_123"); run metadata is one
+# JSON value per (namespace, key).
+
+
+def state_store_path(meta_dir: str) -> Path:
+    return Path(meta_dir) / "state.sqlite"
+
+
+class StateStore:
+    def __init__(self, db_path: Path, readonly: bool = False):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+            return
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "namespace TEXT NOT NULL, id TEXT NOT NULL, PRIMARY KEY (namespace, id)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+
+    def has(self, namespace: str, item_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM seen WHERE namespace = ? AND id = ?",
+                (namespace, item_id),
+            ).fetchone()
+        return row is not None
+
+    def add(self, namespace: str, item_ids: Iterable[str]) -> None:
+        rows = [(namespace, str(item_id)) for item_id in item_ids]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO seen (namespace, id) VALUES (?, ?)", rows)
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def ids(self, namespace: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM seen WHERE namespace = ? ORDER BY id", (namespace,)).fetchall()
+        return [row[0] for row in rows]
+
+    def get_meta(self, namespace: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM meta WHERE namespace = ?", (namespace,)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def update_meta(self, namespace: str, updates: Dict[str, Any]) -> None:
+        rows = [(namespace, key, json.dumps(value, ensure_ascii=False)) for key, value in updates.items()]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO meta (namespace, key, value) VALUES (?, ?, ?)", rows)
+
+    def import_json_state(self, namespace: str, path: str, seen_keys: Dict[str, str]) -> None:
+        # One-time import of a legacy *_state.json: id lists become seen rows,
+        # everything else becomes run metadata.
+        if self.get_meta(namespace).get("_imported_from") or not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if not isinstance(state, dict):
+            state = {}
+        for key, seen_namespace in seen_keys.items():
+            self.add(seen_namespace, state.get(key, []))
+        meta = {key: value for key, value in state.items() if key not in seen_keys}
+        meta["_imported_from"] = os.path.basename(path)
+        self.update_meta(namespace, meta)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_state_store(meta_dir: str) -> StateStore:
+    return StateStore(state_store_path(meta_dir))
+
+
+def read_state_meta(meta_dir: str, namespace: str, counts: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+    # Read-only view for the server; None when the store does not exist yet.
+    db_path = state_store_path(meta_dir)
+    if not db_path.exists():
+        return None
+    store = StateStore(db_path, readonly=True)
+    try:
+        meta = store.get_meta(namespace)
+        for key, seen_namespace in (counts or {}).items():
+            meta[key] = store.count(seen_namespace)
+        return meta
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        store.close()
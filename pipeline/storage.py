@@ -1,17 +1,101 @@
+import gzip
 import json
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Raw API payloads may be stored as compact, compressed JSON. The logical path
+# always ends in .json; the file on disk may carry a .gz or .zst suffix.
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+_storage: Dict[str, Any] = {"compression": "none", "level": None, "packs": False, "segment_mb": 256}
+
+
+def _require_zstd():
+    try:
+        import zstandard  # type: ignore
+    except Exception as exc:
+        raise RuntimeError("zstandard is required for zstd storage. Install with: pip install zstandard") from exc
+    return zstandard
+
+
+def configure_storage(config: Dict[str, Any]) -> None:
+    storage_cfg = config.get("storage", {})
+    compression = storage_cfg.get("compression") or "none"
+    if compression not in COMPRESSION_SUFFIXES:
+        raise RuntimeError(f"Unknown storage.compression: {compression}")
+    if compression == "zstd":
+        _require_zstd()
+    _storage.update(
+        compression=compression,
+        level=storage_cfg.get("level"),
+        packs=bool(storage_cfg.get("packs", False)),
+        segment_mb=storage_cfg.get("segment_mb") or 256,
+    )
+
+
+def storage_settings() -> Dict[str, Any]:
+    return dict(_storage)
 
 
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
+def json_variants(path: str) -> List[str]:
+    return [path + suffix for suffix in COMPRESSION_SUFFIXES.values()]
+
+
+def find_json(path: str) -> Optional[str]:
+    for candidate in json_variants(path):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def json_exists(path: str) -> bool:
+    return find_json(path) is not None
+
+
+def logical_json_name(name: str) -> Optional[str]:
+    # "NA1_1.json.gz" -> "NA1_1.json"; None for files that are not JSON.
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if suffix and name.endswith(".json" + suffix):
+            return name[: -len(suffix)]
+    return name if name.endswith(".json") else None
+
+
+def iter_json_files(directory: str) -> Iterator[Tuple[str, str]]:
+    # (logical name, path on disk) for each JSON file directly in directory.
+    if not os.path.isdir(directory):
+        return
+    seen = set()
+    for name in sorted(os.listdir(directory)):
+        logical = logical_json_name(name)
+        if logical is None or logical in seen:
+            continue
+        full = os.path.join(directory, name)
+        if os.path.isfile(full):
+            seen.add(logical)
+            yield logical, full
+
+
+def decode_json_bytes(path: str, raw: bytes) -> Any:
+    if path.endswith(".gz"):
+        raw = gzip.decompress(raw)
+    elif path.endswith(".zst"):
+        raw = _require_zstd().ZstdDecompressor().decompressobj().decompress(raw)
+    return json.loads(raw)
+
+
+def load_json_file(path: str) -> Any:
+    with open(path, "rb") as f:
+        return decode_json_bytes(path, f.read())
+
+
 def read_json(path: str, default: Any) -> Any:
-    if not os.path.exists(path):
+    found = find_json(path)
+    if found is None:
         return default
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_json_file(found)
 
 
 def write_json(path: str, data: Any) -> None:
@@ -20,6 +104,70 @@ def write_json(path: str, data: Any) -> None:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
+def encode_json_bytes(data: Any, compression: str, level: Optional[int] = None) -> bytes:
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if compression == "gzip":
+        return gzip.compress(raw, compresslevel=6 if level is None else int(level), mtime=0)
+    if compression == "zstd":
+        return _require_zstd().ZstdCompressor(level=3 if level is None else int(level)).compress(raw)
+    return raw
+
+
+def _replace_variants(path: str, target: str, payload: bytes) -> None:
+    ensure_dir(os.path.dirname(path))
+    tmp_path = target + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, target)
+    # Drop copies of the same document stored with another codec.
+    for candidate in json_variants(path):
+        if candidate != target and os.path.exists(candidate):
+            os.remove(candidate)
+
+
+def write_raw_json(path: str, data: Any) -> str:
+    compression = _storage["compression"]
+    if compression == "none":
+        # Uncompressed raw files keep the original pretty-printed layout.
+        _replace_variants(path, path, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+        return path
+    target = path + COMPRESSION_SUFFIXES[compression]
+    _replace_variants(path, target, encode_json_bytes(data, compression, _storage["level"]))
+    return target
+
+
+def recompress_tree(root: str, compression: str, level: Optional[int] = None) -> Dict[str, int]:
+    suffix = COMPRESSION_SUFFIXES[compression]
+    stats = {"files": 0, "rewritten": 0, "bytes_before": 0, "bytes_after": 0}
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            logical = logical_json_name(name)
+            if logical is None:
+                continue
+            full = os.path.join(dirpath, name)
+            if not os.path.exists(full):
+                continue
+            stat = os.stat(full)
+            stats["files"] += 1
+            stats["bytes_before"] += stat.st_size
+            if name == logical + suffix:
+                stats["bytes_after"] += stat.st_size
+                continue
+            data = load_json_file(full)
+            logical_path = os.path.join(dirpath, logical)
+            if compression == "none":
+                payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+            else:
+                payload = encode_json_bytes(data, compression, level)
+            target = logical_path + suffix
+            _replace_variants(logical_path, target, payload)
+            # Keep mtimes so freshness checks keyed on them still hold.
+            os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            stats["rewritten"] += 1
+            stats["bytes_after"] += len(payload)
+    return stats
+
+
 def update_state(path: str, updates: Dict[str, Any]) -> Dict[str, Any]:
     state = read_json(path, {})
     if not isinstance(state, dict):
@@ -27,4 +175,3 @@ def update_state(path: str, updates: Dict[str, Any]) -> Dict[str, Any]:
     state.update(updates)
     write_json(path, state)
     return state
-
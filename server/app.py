@@ -1,20 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from fastapi import BackgroundTasks, FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 from .data_access import (
     AppPaths,
+    count_match_ids,
+    enable_pandas_copy_on_write,
     get_config,
     get_paths,
     list_ddragon_versions,
-    list_lolapi_players,
-    list_match_ids,
     list_oracle_leagues,
     list_oracle_years,
     load_champion_map,
@@ -27,26 +32,26 @@ from .data_access import (
     load_player_profile,
     oracle_champion_stats,
     oracle_champion_trend,
+    oracle_data_version,
     oracle_bp_heatmap,
     oracle_bp_sankey,
+    oracle_cache_stats,
     oracle_match_details,
     oracle_overview,
     oracle_player_stats,
     oracle_team_stats,
+    query_lolapi_players,
     read_ddragon_realms,
     resolve_ddragon_version,
 )
-from pipeline.ddragon import update_ddragon
-from pipeline.esports import update_esports
-from pipeline.lolapi import update_lolapi
-from pipeline.oracle_elixir import update_oracle_elixir
+from .live_stream import EventBroadcaster, LiveHub, sse_message
+from .response_cache import ResponseCache
+from .warmup import WarmupState, start_warmup
+from pipeline.jobs import JOB_TASKS, JobStore, jobs_db_path, launch_job
+from pipeline.live import LivePoller
+from pipeline.storage import configure_storage
 
-pipeline_status = {
-    "ddragon": {"status": "idle"},
-    "lolapi": {"status": "idle"},
-    "esports": {"status": "idle"},
-    "oracle": {"status": "idle"},
-}
+TERMINAL_STATUSES = ("success", "error", "cancelled")
 
 
 class PipelineRequest(BaseModel):
@@ -54,34 +59,74 @@ class PipelineRequest(BaseModel):
     riot_id: Optional[str] = None
 
 
-def _run_pipeline(task: str, riot_id: Optional[str] = None) -> None:
-    pipeline_status[task] = {"status": "running"}
-    try:
-        if task == "ddragon":
-            update_ddragon(config, str(paths.data_dir), str(paths.meta_dir))
-        elif task == "esports":
-            update_esports(config, str(paths.data_dir), str(paths.meta_dir))
-        elif task == "oracle":
-            update_oracle_elixir(config, str(paths.data_dir), str(paths.meta_dir))
-        elif task == "lolapi":
-            local_config = {**config}
-            riot_cfg = dict(local_config.get("riot", {}))
-            if riot_id:
-                riot_cfg["seed_riot_ids"] = [riot_id]
-                riot_cfg["seed_puuids"] = []
-                riot_cfg["seed_summoner_ids"] = []
-            local_config["riot"] = riot_cfg
-            update_lolapi(local_config, str(paths.data_dir), str(paths.meta_dir))
-        else:
-            raise ValueError(f"unknown task: {task}")
-        pipeline_status[task] = {"status": "success"}
-    except Exception as exc:
-        pipeline_status[task] = {"status": "error", "message": str(exc)}
-
-app = FastAPI(title="VisLOL")
+def _job_status(job: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if job is None:
+        return {"status": "idle"}
+    status = {"status": job["status"], "jobId": job["id"]}
+    if job["message"]:
+        status["message"] = job["message"]
+    if job["progress"]:
+        status["progress"] = job["progress"]
+    return status
+
+
+def _pipeline_status() -> Dict[str, Dict[str, Any]]:
+    job_store.reap_lost()
+    latest = job_store.latest_by_task()
+    return {task: _job_status(latest.get(task)) for task in JOB_TASKS}
+
+
+async def _watch_jobs(stop: asyncio.Event, interval_s: float) -> None:
+    # Jobs run in their own processes; their rows are polled and changes are
+    # pushed to /api/pipeline/events as "status" and "progress" events.
+    previous = await asyncio.to_thread(_pipeline_status)
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval_s)
+        except asyncio.TimeoutError:
+            pass
+        current = await asyncio.to_thread(_pipeline_status)
+        for task, status in current.items():
+            before = previous.get(task, {})
+            if status.get("status") != before.get("status") or status.get("jobId") != before.get("jobId"):
+                pipeline_events.publish("status", {task: status})
+                if status["status"] in TERMINAL_STATUSES:
+                    response_cache.invalidate()
+            elif status.get("progress") != before.get("progress"):
+                pipeline_events.publish("progress", status["progress"])
+        previous = current
+
 
 paths = get_paths()
 config = get_config()
+configure_storage(config)
+# The Oracle frame cache hands shared frames to every request (see data_access).
+enable_pandas_copy_on_write()
+response_cache = ResponseCache(int(float(config.get("server", {}).get("response_cache_mb", 64)) * 1024 * 1024))
+warmup_state = WarmupState()
+pipeline_events = EventBroadcaster()
+job_store = JobStore(jobs_db_path(str(paths.meta_dir)))
+live_hub = LiveHub(int(config.get("live", {}).get("max_frames") or 20000))
+live_poller = LivePoller(config, str(paths.meta_dir), live_hub.publish)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    start_warmup(paths, config, warmup_state)
+    pipeline_events.attach(asyncio.get_running_loop())
+    stop = asyncio.Event()
+    job_poll_s = float(config.get("server", {}).get("job_poll_s") or 1)
+    jobs_task = asyncio.create_task(_watch_jobs(stop, job_poll_s))
+    live_task = asyncio.create_task(live_poller.run(stop)) if config.get("live", {}).get("enabled") else None
+    yield
+    stop.set()
+    await jobs_task
+    if live_task is not None:
+        await live_task
+    pipeline_events.attach(None)
+
+
+app = FastAPI(title="VisLOL", lifespan=lifespan)
 
 DASHBOARD_DIR = Path(__file__).resolve().parent.parent / "dashboard"
 app.mount("/static", StaticFiles(directory=DASHBOARD_DIR), name="static")
@@ -98,11 +143,54 @@ def _parse_list(value: Optional[str]) -> List[str]:
     return [item for item in value.split(",") if item]
 
 
+def _sorted_list(value: Optional[str]) -> List[str]:
+    return sorted(set(_parse_list(value)))
+
+
+def _selected_years(value: Optional[str], default_all: bool = False) -> List[str]:
+    years = _sorted_list(value)
+    if years:
+        return years
+    available = list_oracle_years(paths)
+    return available if default_all else available[-1:]
+
+
+def _cached_json(request: Request, endpoint: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Response:
+    key = json.dumps([endpoint, params], sort_keys=True)
+    version = oracle_data_version(paths)
+    cached = response_cache.get(key, version)
+    if cached is None:
+        try:
+            payload = compute()
+        except RuntimeError as exc:
+            raise HTTPException(status_code=500, detail=str(exc))
+        body = json.dumps(
+            jsonable_encoder(payload),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        etag = response_cache.put(key, version, body)
+    else:
+        body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/api/health")
 def health():
     return {"ok": True}
 
 
+@app.get("/api/ready")
+def ready():
+    snapshot = warmup_state.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
 @app.get("/api/ddragon/meta")
 def ddragon_meta(version: Optional[str] = None):
     resolved = resolve_ddragon_version(paths, config, version)
@@ -137,8 +225,14 @@ def lolapi_state():
 
 
 @app.get("/api/lolapi/players")
-def lolapi_players():
-    return {"players": list_lolapi_players(paths)}
+def lolapi_players(
+    q: Optional[str] = None,
+    sort: str = Query("name", pattern="^(name|level)$"),
+    desc: bool = False,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+):
+    return query_lolapi_players(paths, q=q, sort=sort, desc=desc, offset=offset, limit=limit)
 
 
 @app.get("/api/lolapi/player/{puuid}/profile")
@@ -182,119 +276,243 @@ def esports_meta():
     return {
         "years": years,
         "leagues": leagues,
-        "availableMatches": len(list_match_ids(paths)),
+        "availableMatches": count_match_ids(paths),
     }
 
 
+@app.get("/api/esports/cache")
+def esports_cache():
+    return {"frames": oracle_cache_stats(), "responses": response_cache.stats()}
+
+
 @app.get("/api/esports/overview")
-def esports_overview(years: Optional[str] = None, leagues: Optional[str] = None):
-    selected_years = _parse_list(years) or list_oracle_years(paths)[-1:]
-    selected_leagues = _parse_list(leagues)
-    try:
-        return oracle_overview(paths, selected_years, selected_leagues)
-    except RuntimeError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+def esports_overview(request: Request, years: Optional[str] = None, leagues: Optional[str] = None):
+    selected_years = _selected_years(years)
+    selected_leagues = _sorted_list(leagues)
+    return _cached_json(
+        request,
+        "overview",
+        {"years": selected_years, "leagues": selected_leagues},
+        lambda: oracle_overview(paths, selected_years, selected_leagues),
+    )
 
 
 @app.get("/api/esports/teams")
-def esports_teams(years: Optional[str] = None, leagues: Optional[str] = None, limit: int = Query(20, ge=1, le=200)):
-    selected_years = _parse_list(years) or list_oracle_years(paths)[-1:]
-    selected_leagues = _parse_list(leagues)
-    try:
+def esports_teams(
+    request: Request,
+    years: Optional[str] = None,
+    leagues: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+):
+    selected_years = _selected_years(years)
+    selected_leagues = _sorted_list(leagues)
+
+    def compute():
         rows = oracle_team_stats(paths, selected_years, selected_leagues)
-    except RuntimeError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
-    return {"items": rows[:limit]}
+        return {"items": rows[:limit]}
+
+    return _cached_json(
+        request,
+        "teams",
+        {"years": selected_years, "leagues": selected_leagues, "limit": limit},
+        compute,
+    )
 
 
 @app.get("/api/esports/players")
 def esports_players(
+    request: Request,
     years: Optional[str] = None,
     leagues: Optional[str] = None,
     positions: Optional[str] = None,
     limit: int = Query(50, ge=1, le=200),
 ):
-    selected_years = _parse_list(years) or list_oracle_years(paths)[-1:]
-    selected_leagues = _parse_list(leagues)
-    selected_positions = _parse_list(positions)
-    try:
+    selected_years = _selected_years(years)
+    selected_leagues = _sorted_list(leagues)
+    selected_positions = _sorted_list(positions)
+
+    def compute():
         result = oracle_player_stats(paths, selected_years, selected_leagues, selected_positions)
-    except RuntimeError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
-    return {
-        "items": result["players"][:limit],
-        "positionBox": result["positionBox"],
-    }
+        return {
+            "items": result["players"][:limit],
+            "positionBox": result["positionBox"],
+        }
+
+    return _cached_json(
+        request,
+        "players",
+        {"years": selected_years, "leagues": selected_leagues, "positions": selected_positions, "limit": limit},
+        compute,
+    )
 
 
 @app.get("/api/esports/champions")
-def esports_champions(years: Optional[str] = None, leagues: Optional[str] = None, limit: int = Query(20, ge=1, le=200)):
-    selected_years = _parse_list(years) or list_oracle_years(paths)[-1:]
-    selected_leagues = _parse_list(leagues)
-    try:
+def esports_champions(
+    request: Request,
+    years: Optional[str] = None,
+    leagues: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+):
+    selected_years = _selected_years(years)
+    selected_leagues = _sorted_list(leagues)
+
+    def compute():
         stats = oracle_champion_stats(paths, selected_years, selected_leagues)
-    except RuntimeError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
-    return {
-        "picks": stats["picks"][:limit],
-        "bans": stats["bans"][:limit],
-    }
+        return {
+            "picks": stats["picks"][:limit],
+            "bans": stats["bans"][:limit],
+        }
+
+    return _cached_json(
+        request,
+        "champions",
+        {"years": selected_years, "leagues": selected_leagues, "limit": limit},
+        compute,
+    )
 
 
 @app.get("/api/esports/champion-trend")
-def esports_champion_trend(champion: str, years: Optional[str] = None, leagues: Optional[str] = None):
-    selected_years = _parse_list(years) or list_oracle_years(paths)
-    selected_leagues = _parse_list(leagues)
-    try:
-        trend = oracle_champion_trend(paths, selected_years, selected_leagues, champion)
-    except RuntimeError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
-    return {"items": trend}
+def esports_champion_trend(request: Request, champion: str, years: Optional[str] = None, leagues: Optional[str] = None):
+    selected_years = _selected_years(years, default_all=True)
+    selected_leagues = _sorted_list(leagues)
+    return _cached_json(
+        request,
+        "champion-trend",
+        {"champion": champion, "years": selected_years, "leagues": selected_leagues},
+        lambda: {"items": oracle_champion_trend(paths, selected_years, selected_leagues, champion)},
+    )
 
 
 @app.get("/api/esports/bp-heatmap")
-def esports_bp_heatmap(years: Optional[str] = None, leagues: Optional[str] = None):
-    selected_years = _parse_list(years) or list_oracle_years(paths)[-1:]
-    selected_leagues = _parse_list(leagues)
-    try:
-        return oracle_bp_heatmap(paths, selected_years, selected_leagues)
-    except RuntimeError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+def esports_bp_heatmap(request: Request, years: Optional[str] = None, leagues: Optional[str] = None):
+    selected_years = _selected_years(years)
+    # Heatmap rows follow the requested league order, so it is part of the key.
+    selected_leagues = list(dict.fromkeys(_parse_list(leagues)))
+    return _cached_json(
+        request,
+        "bp-heatmap",
+        {"years": selected_years, "leagues": selected_leagues},
+        lambda: oracle_bp_heatmap(paths, selected_years, selected_leagues),
+    )
 
 
 @app.get("/api/esports/bp-sankey")
-def esports_bp_sankey(years: Optional[str] = None, leagues: Optional[str] = None):
-    selected_years = _parse_list(years) or list_oracle_years(paths)[-1:]
-    selected_leagues = _parse_list(leagues)
-    try:
-        return oracle_bp_sankey(paths, selected_years, selected_leagues)
-    except RuntimeError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+def esports_bp_sankey(request: Request, years: Optional[str] = None, leagues: Optional[str] = None):
+    selected_years = _selected_years(years)
+    selected_leagues = _sorted_list(leagues)
+    return _cached_json(
+        request,
+        "bp-sankey",
+        {"years": selected_years, "leagues": selected_leagues},
+        lambda: oracle_bp_sankey(paths, selected_years, selected_leagues),
+    )
 
 
 @app.get("/api/esports/match/{game_id}")
-def esports_match(game_id: str, year: Optional[str] = None):
-    try:
+def esports_match(request: Request, game_id: str, year: Optional[str] = None):
+    def compute():
         details = oracle_match_details(paths, game_id, year)
-    except RuntimeError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
-    if not details:
-        raise HTTPException(status_code=404, detail="match not found")
-    return details
+        if not details:
+            raise HTTPException(status_code=404, detail="match not found")
+        return details
+
+    return _cached_json(request, "match", {"gameid": game_id, "year": year}, compute)
+
+
+@app.get("/api/live/games")
+def live_games():
+    return {"items": live_hub.games(live_poller.intervals)}
+
+
+@app.get("/api/live/{game_id}/events")
+async def live_events(request: Request, game_id: str):
+    # Server-Sent Events: one "snapshot" with the series so far, then "frames"
+    # deltas as the poller sees them; a comment line keeps idle streams open.
+    async def stream():
+        with live_hub.subscribe(game_id) as (queue, series, snapshot_seq):
+            yield "retry: 5000\n\n"
+            if series is not None:
+                yield sse_message("snapshot", series, snapshot_seq)
+            while not await request.is_disconnected():
+                try:
+                    seq, event, data = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if seq <= snapshot_seq:
+                    continue
+                yield sse_message(event, data, seq)
+                if data.get("finished"):
+                    yield sse_message("end", {"gameId": game_id}, seq)
+                    break
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/api/pipeline/run")
-def pipeline_run(payload: PipelineRequest, background_tasks: BackgroundTasks):
+def pipeline_run(payload: PipelineRequest):
     task = payload.task
-    riot_id = payload.riot_id
-    if task not in pipeline_status:
+    if task not in JOB_TASKS:
         raise HTTPException(status_code=400, detail="unknown task")
-    if pipeline_status.get(task, {}).get("status") == "running":
-        return {"status": "running"}
-    background_tasks.add_task(_run_pipeline, task, riot_id)
-    return {"status": "queued"}
+    # One active job per task across every API worker; a second
+    # request gets the job that is already there.
+    job, created = job_store.create(task, {"riot_id": payload.riot_id})
+    if created:
+        config_path = os.path.abspath(os.environ.get("VISLOL_CONFIG", "config.json"))
+        proc = launch_job(job["id"], config_path, str(paths.data_dir), str(paths.meta_dir))
+        job_store.set_pid(job["id"], proc.pid)
+    return {"status": job["status"], "jobId": job["id"]}
 
 
 @app.get("/api/pipeline/status")
 def pipeline_status_endpoint():
-    return pipeline_status
+    return _pipeline_status()
+
+
+@app.get("/api/pipeline/jobs")
+def pipeline_jobs(task: Optional[str] = None, limit: int = Query(50, ge=1, le=500)):
+    job_store.reap_lost()
+    return {"items": job_store.list(task, limit)}
+
+
+@app.get("/api/pipeline/jobs/{job_id}")
+def pipeline_job(job_id: int):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
+
+
+@app.post("/api/pipeline/jobs/{job_id}/cancel")
+def pipeline_job_cancel(job_id: int):
+    job = job_store.request_cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
+
+
+@app.get("/api/pipeline/events")
+async def pipeline_events_endpoint(request: Request):
+    # Server-Sent Events: "status" with every task first, then "status" for one
+    # task when it changes and "progress" snapshots while it runs.
+    async def stream():
+        with pipeline_events.subscribe() as queue:
+            yield "retry: 5000\n\n"
+            yield sse_message("status", await asyncio.to_thread(_pipeline_status), pipeline_events.seq)
+            while not await request.is_disconnected():
+                try:
+                    seq, event, data = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse_message(event, data, seq)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,15 +1,36 @@
 from __future__ import annotations
 
-import json
+import hashlib
 import os
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from functools import lru_cache
 from pathlib import Path
-import math
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from pipeline.config import load_config, DEFAULT_CONFIG
+from pipeline.lolapi_index import count_indexed_matches, indexed_players, lolapi_index_path, player_match_rows
+from pipeline.oracle_ingest import (
+    ORACLE_SCHEMA,
+    coerce_numeric,
+    converted_path,
+    gameid_index_fingerprints,
+    gameid_index_path,
+    is_converted_fresh,
+    list_oracle_csvs,
+    lookup_gameid,
+    oracle_processed_dir,
+    read_converted,
+    read_oracle_csv,
+    rollup_path,
+    source_fingerprint,
+)
+from pipeline.oracle_rollups import ROLLUP_COLUMNS, build_rollup
+from pipeline.match_store import SEEN_NAMESPACE, iter_match_sources, load_match, match_regions, read_match_source
+from pipeline.state_store import read_state_meta
+from pipeline.storage import find_json, load_json_file, read_json
 
 
 @dataclass
@@ -19,10 +40,36 @@ class AppPaths:
 
 
 def _read_json(path: Path, default: Any) -> Any:
-    if not path.exists():
+    return read_json(str(path), default)
+
+
+_json_cache_lock = threading.Lock()
+_json_cache: "OrderedDict[str, Tuple[Tuple[int, int], Any]]" = OrderedDict()
+_JSON_CACHE_MAX = 65536
+
+
+def _read_json_cached(path: Path, default: Any) -> Any:
+    # Only for files whose parsed value callers treat as read-only.
+    found = find_json(str(path))
+    try:
+        stat = os.stat(found) if found else None
+    except OSError:
+        stat = None
+    if stat is None:
         return default
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    key = found
+    version = (stat.st_size, stat.st_mtime_ns)
+    with _json_cache_lock:
+        entry = _json_cache.get(key)
+        if entry and entry[0] == version:
+            _json_cache.move_to_end(key)
+            return entry[1]
+    data = load_json_file(found)
+    with _json_cache_lock:
+        _json_cache[key] = (version, data)
+        while len(_json_cache) > _JSON_CACHE_MAX:
+            _json_cache.popitem(last=False)
+    return data
 
 
 def get_paths() -> AppPaths:
@@ -87,7 +134,7 @@ def read_ddragon_realms(paths: AppPaths, config: Dict[str, Any], version: str) -
 def _load_ddragon_json(paths: AppPaths, config: Dict[str, Any], version: str, name: str) -> Dict[str, Any]:
     _, locale = get_ddragon_locale_region(config)
     path = paths.data_dir / "raw" / "ddragon" / version / locale / name
-    return _read_json(path, {})
+    return _read_json_cached(path, {})
 
 
 def load_champions(paths: AppPaths, config: Dict[str, Any], version: str) -> List[Dict[str, Any]]:
@@ -152,7 +199,7 @@ def load_items(paths: AppPaths, config: Dict[str, Any], version: str) -> List[Di
     return items
 
 
-def list_lolapi_players(paths: AppPaths) -> List[Dict[str, Any]]:
+def _scan_lolapi_players(paths: AppPaths) -> List[Dict[str, Any]]:
     players_dir = paths.data_dir / "raw" / "lolapi" / "players"
     if not players_dir.exists():
         return []
@@ -160,8 +207,8 @@ def list_lolapi_players(paths: AppPaths) -> List[Dict[str, Any]]:
     for entry in players_dir.iterdir():
         if not entry.is_dir():
             continue
-        account = _read_json(entry / "account.json", {})
-        summoner = _read_json(entry / "summoner.json", {})
+        account = _read_json_cached(entry / "account.json", {})
+        summoner = _read_json_cached(entry / "summoner.json", {})
         players.append({
             "puuid": account.get("puuid", entry.name),
             "gameName": account.get("gameName"),
@@ -170,10 +217,69 @@ def list_lolapi_players(paths: AppPaths) -> List[Dict[str, Any]]:
             "summonerLevel": summoner.get("summonerLevel"),
             "profileIconId": summoner.get("profileIconId"),
         })
-    players.sort(key=lambda p: (p.get("gameName") or "", p.get("tagLine") or ""))
     return players
 
 
+def _player_name_key(p: Dict[str, Any]) -> Tuple[str, str, str]:
+    return ((p.get("gameName") or "").lower(), (p.get("tagLine") or "").lower(), p.get("puuid") or "")
+
+
+# Every key ends in the puuid, so each order is total and desc is its exact reverse.
+PLAYER_SORTS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "name": _player_name_key,
+    "level": lambda p: (p.get("summonerLevel") or 0, _player_name_key(p)),
+}
+
+
+_player_manifest: Dict[str, Any] = {"version": None, "players": []}
+_player_manifest_lock = threading.Lock()
+
+
+def list_lolapi_players(paths: AppPaths) -> List[Dict[str, Any]]:
+    db_path = lolapi_index_path(str(paths.meta_dir))
+    try:
+        stat = db_path.stat()
+        version: Optional[str] = f"{db_path}:{stat.st_size}:{stat.st_mtime_ns}"
+    except OSError:
+        version = None
+    with _player_manifest_lock:
+        if version is not None and _player_manifest["version"] == version:
+            return _player_manifest["players"]
+    players = indexed_players(db_path) if version is not None else None
+    if players is None:
+        version = None
+        players = _scan_lolapi_players(paths)
+    players.sort(key=PLAYER_SORTS["name"])
+    if version is not None:
+        # The manifest only changes when the pipeline writes the index file.
+        with _player_manifest_lock:
+            _player_manifest.update(version=version, players=players)
+    return players
+
+
+def query_lolapi_players(
+    paths: AppPaths,
+    q: Optional[str] = None,
+    sort: str = "name",
+    desc: bool = False,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    players = list_lolapi_players(paths)
+    if q:
+        needle = q.lower()
+        players = [
+            p for p in players
+            if any(needle in (p.get(key) or "").lower() for key in ("gameName", "tagLine", "summonerName", "puuid"))
+        ]
+    # The manifest is already in PLAYER_SORTS["name"] order.
+    if sort != "name" or desc:
+        players = sorted(players, key=PLAYER_SORTS[sort], reverse=desc)
+    total = len(players)
+    end = None if limit is None else offset + limit
+    return {"players": players[offset:end], "total": total}
+
+
 def load_player_profile(paths: AppPaths, puuid: str) -> Dict[str, Any]:
     base = paths.data_dir / "raw" / "lolapi" / "players" / puuid
     account = _read_json(base / "account.json", {})
@@ -199,36 +305,43 @@ def load_player_challenges(paths: AppPaths, puuid: str) -> Dict[str, Any]:
 
 
 def load_lolapi_state(paths: AppPaths) -> Dict[str, Any]:
-    return _read_json(paths.meta_dir / "lolapi_state.json", {})
+    state = read_state_meta(str(paths.meta_dir), "lolapi", {"seen_match_count": SEEN_NAMESPACE})
+    if state is None:
+        return _read_json(paths.meta_dir / "lolapi_state.json", {})
+    return state
+
+
+def _match_files(paths: AppPaths) -> Tuple[Dict[str, Tuple[str, str, str]], Dict[str, Tuple[str, str, str]]]:
+    # matchId -> (pack namespace, key, loose file or "" when the object is packed).
+    match_files: Dict[str, Tuple[str, str, str]] = {}
+    timeline_files: Dict[str, Tuple[str, str, str]] = {}
+    data_dir = str(paths.data_dir)
+    for region in match_regions(data_dir):
+        for match_id, source in iter_match_sources(data_dir, region):
+            match_files.setdefault(match_id, source)
+        for match_id, source in iter_match_sources(data_dir, region, timeline=True):
+            timeline_files.setdefault(match_id, source)
+    return match_files, timeline_files
 
 
-def _match_files(paths: AppPaths) -> Tuple[List[Path], List[Path]]:
-    match_dir = paths.data_dir / "raw" / "lolapi" / "matches"
-    match_files = []
-    timeline_files = []
-    if not match_dir.exists():
-        return match_files, timeline_files
-    for region_dir in match_dir.iterdir():
-        if not region_dir.is_dir():
-            continue
-        for file in region_dir.glob("*.json"):
-            if file.name.endswith("_timeline.json"):
-                continue
-            match_files.append(file)
-        timeline_dir = region_dir / "timeline"
-        if timeline_dir.exists():
-            timeline_files.extend(timeline_dir.glob("*.json"))
-    return match_files, timeline_files
+def _load_match_source(paths: AppPaths, source: Tuple[str, str, str]) -> Dict[str, Any]:
+    if source[2]:
+        return _read_json(Path(source[2]), {})
+    return read_match_source(str(paths.data_dir), source, {})
+
+
+def load_lolapi_match(paths: AppPaths, match_id: str, timeline: bool = False) -> Optional[Dict[str, Any]]:
+    data_dir = str(paths.data_dir)
+    for region in match_regions(data_dir):
+        data = load_match(data_dir, region, match_id, None, timeline=timeline)
+        if data is not None:
+            return data
+    return None
 
 
 def list_match_ids(paths: AppPaths) -> List[str]:
     match_files, timeline_files = _match_files(paths)
-    ids = set()
-    for file in match_files:
-        ids.add(file.stem)
-    for file in timeline_files:
-        ids.add(file.stem)
-    return sorted(ids)
+    return sorted(set(match_files) | set(timeline_files))
 
 
 def _timeline_summary(puuid: str, timeline: Dict[str, Any]) -> Dict[str, Any]:
@@ -258,10 +371,55 @@ def _timeline_summary(puuid: str, timeline: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def count_match_ids(paths: AppPaths) -> int:
+    count = count_indexed_matches(lolapi_index_path(str(paths.meta_dir)))
+    return count if count is not None else len(list_match_ids(paths))
+
+
+def _indexed_player_matches(paths: AppPaths, puuid: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+    rows = player_match_rows(lolapi_index_path(str(paths.meta_dir)), puuid, limit)
+    if rows is None:
+        return None
+    matches = []
+    for row in rows:
+        summary: Dict[str, Any] = {
+            "matchId": row["match_id"],
+            "hasMatch": bool(row["has_match"]),
+            "hasTimeline": bool(row["has_timeline"]),
+            "source": row["source"],
+        }
+        if row["source"] == "match":
+            duration_ms = row["duration_ms"]
+            summary.update({
+                "championName": row["champion"],
+                "kills": row["kills"],
+                "deaths": row["deaths"],
+                "assists": row["assists"],
+                "teamPosition": row["position"],
+                "win": None if row["win"] is None else bool(row["win"]),
+                "gameDuration": None if duration_ms is None else duration_ms // 1000,
+                "queueId": row["queue_id"],
+                "gameCreation": row["game_creation"],
+            })
+            if duration_ms is not None:
+                summary["durationMs"] = duration_ms
+        else:
+            summary.update({
+                "kills": row["kills"],
+                "deaths": row["deaths"],
+                "assists": row["assists"],
+                "durationMs": row["duration_ms"],
+                "participantId": row["participant_id"],
+            })
+        matches.append(summary)
+    return matches
+
+
 def load_player_matches(paths: AppPaths, puuid: str, limit: int = 20) -> List[Dict[str, Any]]:
-    match_files, timeline_files = _match_files(paths)
-    match_by_id = {file.stem: file for file in match_files}
-    timeline_by_id = {file.stem: file for file in timeline_files}
+    indexed = _indexed_player_matches(paths, puuid, limit)
+    if indexed is not None:
+        return indexed
+    match_by_id, timeline_by_id = _match_files(paths)
     match_ids = sorted(set(match_by_id) | set(timeline_by_id), reverse=True)
     matches = []
     for match_id in match_ids[:limit]:
@@ -273,8 +431,8 @@ def load_player_matches(paths: AppPaths, puuid: str, limit: int = 20) -> List[Di
             "hasTimeline": bool(timeline_path),
             "source": "match" if match_path else "timeline",
         }
-        if match_path and match_path.exists():
-            match = _read_json(match_path, {})
+        if match_path:
+            match = _load_match_source(paths, match_path)
             for participant in match.get("info", {}).get("participants", []):
                 if participant.get("puuid") != puuid:
                     continue
@@ -291,8 +449,8 @@ def load_player_matches(paths: AppPaths, puuid: str, limit: int = 20) -> List[Di
                 break
             if summary.get("gameDuration") is not None:
                 summary["durationMs"] = int(summary["gameDuration"] * 1000)
-        if (not match_path) and timeline_path and timeline_path.exists():
-            timeline = _read_json(timeline_path, {})
+        if (not match_path) and timeline_path:
+            timeline = _load_match_source(paths, timeline_path)
             summary.update(_timeline_summary(puuid, timeline))
         matches.append(summary)
     return matches
@@ -318,60 +476,247 @@ def _oracle_path(paths: AppPaths, year: str) -> Optional[Path]:
     return file if file.exists() else None
 
 
-@lru_cache(maxsize=6)
-def _load_oracle_df(paths_key: str, year: str, columns: Tuple[str, ...]):
+_oracle_version: Dict[str, Any] = {"signature": None, "version": None}
+_oracle_version_lock = threading.Lock()
+
+
+def _oracle_version_signature(paths: AppPaths) -> Tuple[Any, ...]:
+    # Downloads and ingest replace files through a temporary name, which bumps
+    # the directory mtime, and both end by rewriting their state file. A year
+    # CSV or its .arrow file can also be overwritten in place (say, dropped in
+    # by hand), so the files requests actually read are stat'ed as well: a few
+    # stats tell whether the full walk below could give a new answer.
+    raw = paths.data_dir / "raw" / "oracle_elixir"
+    processed = oracle_processed_dir(str(paths.data_dir))
+    watched = [
+        raw,
+        processed,
+        processed / "rollups",
+        paths.meta_dir / "oracle_elixir_state.json",
+        paths.meta_dir / "oracle_ingest_state.json",
+    ]
+    for year, csv_path in list_oracle_csvs(raw).items():
+        watched.extend([csv_path, converted_path(str(paths.data_dir), year)])
+    signature = []
+    for path in watched:
+        try:
+            stat = path.stat()
+            signature.append((str(path), stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append((str(path), None, None))
+    return tuple(signature)
+
+
+def oracle_data_version(paths: AppPaths) -> str:
+    signature = _oracle_version_signature(paths)
+    with _oracle_version_lock:
+        if _oracle_version["signature"] == signature:
+            return _oracle_version["version"]
+    version = _scan_oracle_data_version(paths)
+    with _oracle_version_lock:
+        _oracle_version.update(signature=signature, version=version)
+    return version
+
+
+def _scan_oracle_data_version(paths: AppPaths) -> str:
+    files = []
+    for root in (paths.data_dir / "raw" / "oracle_elixir", oracle_processed_dir(str(paths.data_dir))):
+        if not root.exists():
+            continue
+        for file in root.rglob("*"):
+            if file.is_file():
+                stat = file.stat()
+                files.append(f"{file.relative_to(root)}:{stat.st_size}:{stat.st_mtime_ns}")
+    files.sort()
+    return hashlib.sha1("\n".join(files).encode("utf-8")).hexdigest()
+
+
+def _converted_oracle_path(paths: AppPaths, year: str, csv_path: Path) -> Optional[Path]:
+    file = converted_path(str(paths.data_dir), year)
+    return file if is_converted_fresh(csv_path, file) else None
+
+
+_pandas_module = None
+
+
+def enable_pandas_copy_on_write() -> None:
+    # Cached frames are shared between requests; copy-on-write lets callers
+    # filter and assign on projections without ever touching the cache. It is
+    # a process-wide pandas mode, so the app switches it on once at startup
+    # rather than as a side effect of the first read.
     try:
         import pandas as pd  # type: ignore
-    except Exception as exc:
-        raise RuntimeError("pandas is required to read Oracle CSV files") from exc
-    path = Path(paths_key)
-    df = pd.read_csv(path, usecols=list(columns), low_memory=False)
-    return df
+    except Exception:
+        return
+    pd.set_option("mode.copy_on_write", True)
+
+
+def _require_pandas():
+    global _pandas_module
+    if _pandas_module is None:
+        try:
+            import pandas as pd  # type: ignore
+        except Exception as exc:
+            raise RuntimeError("pandas is required to read Oracle CSV files") from exc
+        _pandas_module = pd
+    return _pandas_module
+
+
+def _load_oracle_columns(path: Path, columns: Sequence[str]):
+    pd = _require_pandas()
+    wanted = set(columns)
+    if path.suffix == ".arrow":
+        import pyarrow as pa  # type: ignore
+        import pyarrow.feather as feather  # type: ignore
+
+        with pa.memory_map(str(path), "r") as source:
+            names = pa.ipc.open_file(source).schema.names
+        table = feather.read_table(str(path), columns=[c for c in names if c in wanted], memory_map=True)
+        return table.to_pandas()
+    return read_oracle_csv(path, list(wanted))
+
+
+class _OracleFrameCache:
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def _lookup(self, key: str, version: str, columns: Sequence[str]):
+        entry = self._entries.get(key)
+        if not entry or entry[0] != version:
+            return None, list(columns)
+        frame = entry[1]
+        return frame, [c for c in columns if c not in frame.columns]
+
+    def get(self, source: Path, columns: Sequence[str]):
+        key = str(source)
+        stat = source.stat()
+        version = f"{stat.st_size}:{stat.st_mtime_ns}"
+        with self._lock:
+            frame, missing = self._lookup(key, version, columns)
+            if frame is not None and not missing:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return frame[list(columns)]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                frame, missing = self._lookup(key, version, columns)
+                if frame is not None and not missing:
+                    self.hits += 1
+                    return frame[list(columns)]
+                self.misses += 1
+            if frame is None:
+                # First touch of this file: pull every column the endpoints use at once.
+                missing = list(dict.fromkeys([*missing, *ORACLE_SCHEMA]))
+            loaded = _load_oracle_columns(source, missing)
+            if frame is not None:
+                frame = _require_pandas().concat([frame, loaded], axis=1)
+            else:
+                frame = loaded
+            with self._lock:
+                self._entries[key] = (version, frame)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._load_locks.pop(evicted, None)
+        return frame[list(columns)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = [
+                {
+                    "path": key,
+                    "columns": len(frame.columns),
+                    "rows": int(frame.shape[0]),
+                    "bytes": int(frame.memory_usage(index=False).sum()),
+                }
+                for key, (_, frame) in self._entries.items()
+            ]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+_oracle_cache = _OracleFrameCache()
+
+
+def oracle_cache_stats() -> Dict[str, Any]:
+    return _oracle_cache.stats()
+
+
+def warm_oracle_year(paths: AppPaths, year: str) -> None:
+    # An empty projection still loads every schema column the year file has.
+    if _read_oracle(paths, year, []) is None:
+        return
+    for name in ROLLUP_COLUMNS:
+        _read_rollup(paths, year, name)
 
 
 def _read_oracle(paths: AppPaths, year: str, columns: Sequence[str]):
     path = _oracle_path(paths, year)
     if not path:
         return None
-    df = _load_oracle_df(str(path), year, tuple(columns))
-    return df.copy()
+    source = _converted_oracle_path(paths, year, path) or path
+    return _oracle_cache.get(source, columns)
+
+
+_year_pool: Optional[ThreadPoolExecutor] = None
+_year_pool_lock = threading.Lock()
+
+
+def _year_executor() -> ThreadPoolExecutor:
+    global _year_pool
+    with _year_pool_lock:
+        if _year_pool is None:
+            workers = get_config().get("server", {}).get("oracle_workers") or min(8, os.cpu_count() or 1)
+            _year_pool = ThreadPoolExecutor(max_workers=int(workers), thread_name_prefix="oracle-year")
+        return _year_pool
+
+
+def _map_years(years: Sequence[str], func: Callable[[str], Any]) -> List[Any]:
+    # Map step of the multi-year queries: load and partially aggregate each year
+    # on a worker thread (pyarrow and the pandas kernels release the GIL), then
+    # hand the partials back in year order for the caller to merge.
+    years = list(years)
+    if len(years) <= 1:
+        return [func(year) for year in years]
+    return list(_year_executor().map(func, years))
 
 
 def list_oracle_leagues(paths: AppPaths, years: Sequence[str]) -> List[str]:
-    leagues = set()
-    for year in years:
+    def year_leagues(year: str) -> List[str]:
         df = _read_oracle(paths, year, ["league"])
         if df is None:
-            continue
-        leagues.update([l for l in df["league"].dropna().unique().tolist()])
+            return []
+        return df["league"].dropna().unique().tolist()
+
+    leagues = set()
+    for partial in _map_years(years, year_leagues):
+        leagues.update(partial)
     return sorted(leagues)
 
 
 def _to_numeric(series, default=0.0):
-    def _coerce(value):
-        if value in ("", None):
-            return default
-        try:
-            numeric = float(value)
-        except Exception:
-            return default
-        return numeric if math.isfinite(numeric) else default
-
-    return series.apply(_coerce).astype(float)
+    if series.dtype.kind in "iu":
+        return series
+    return coerce_numeric(series, "float32" if series.dtype == "float32" else "float64", default)
 
 
 def oracle_overview(paths: AppPaths, years: Sequence[str], leagues: Sequence[str]) -> Dict[str, Any]:
-    records = []
-    box = []
-    for year in years:
+    def year_overview(year: str):
+        records = []
+        box = []
         df = _read_oracle(paths, year, ["league", "year", "split", "gamelength", "kills", "gameid", "position"])
         if df is None:
-            continue
+            return records, box
         df = df[df["position"] == "team"]
         if leagues:
             df = df[df["league"].isin(leagues)]
         if df.empty:
-            continue
+            return records, box
         df["gamelength"] = _to_numeric(df["gamelength"], 0)
         df["kills"] = _to_numeric(df["kills"], 0)
         for league in df["league"].dropna().unique().tolist():
@@ -401,173 +746,167 @@ def oracle_overview(paths: AppPaths, years: Sequence[str], leagues: Sequence[str
                 "q3": float(stats[3]),
                 "max": float(stats[4]),
             })
+        return records, box
+
+    records = []
+    box = []
+    for year_records, year_box in _map_years(years, year_overview):
+        records.extend(year_records)
+        box.extend(year_box)
     return {
         "records": records,
         "boxplot": box,
     }
 
 
+_rollup_lock = threading.Lock()
+_rollup_frames: Dict[str, Tuple[str, Any]] = {}
+
+TEAM_SUMS = ["matches", "wins", "sumDpm", "sumEarnedGpm", "sumVision", "sumDamageShare", "sumKda"]
+PLAYER_SUMS = ["matches", "wins", "sumDpm", "sumEarnedGpm", "sumVision", "sumKda", "sumKp"]
+PICK_SUMS = ["picks", "wins", "bluePicks", "redPicks"]
+# Orders cube rows across years by (year position, first source row).
+_ORDER_STRIDE = 1 << 32
+
+
+def _read_rollup(paths: AppPaths, year: str, name: str):
+    csv_path = _oracle_path(paths, year)
+    if not csv_path:
+        return None
+    file = rollup_path(str(paths.data_dir), year, name)
+    version = source_fingerprint(csv_path)
+    with _rollup_lock:
+        entry = _rollup_frames.get(str(file))
+    if entry and entry[0] == version:
+        return entry[1]
+    if is_converted_fresh(csv_path, file):
+        frame = read_converted(file)
+    else:
+        # Not ingested yet, or the CSV changed since the last ingest.
+        frame = build_rollup(name, _read_oracle(paths, year, ROLLUP_COLUMNS[name]))
+    with _rollup_lock:
+        _rollup_frames[str(file)] = (version, frame)
+    return frame
+
+
+def _filter_leagues(df, leagues: Sequence[str]):
+    if leagues:
+        return df[df["league"].isin(leagues)]
+    return df
+
+
+def _merge_partials(partials, keys: List[str], sums: List[str]):
+    pd = _require_pandas()
+    combined = pd.concat(partials, ignore_index=True)
+    # sort=False keeps first-seen order: year by year, sorted within a year.
+    return combined.groupby(keys, sort=False, observed=True)[sums].sum()
+
+
 def oracle_team_stats(paths: AppPaths, years: Sequence[str], leagues: Sequence[str]) -> List[Dict[str, Any]]:
-    team_map: Dict[Tuple[str, str], Dict[str, Any]] = {}
-    for year in years:
-        df = _read_oracle(paths, year, [
-            "league", "year", "gameid", "teamname", "teamid", "result", "gamelength",
-            "earned gpm", "dpm", "visionscore", "damageshare", "damagetochampions",
-            "kills", "deaths", "assists", "position"
-        ])
-        if df is None:
-            continue
-        players_df = df[df["position"] != "team"].copy()
-        df = df[df["position"] == "team"].copy()
-        if leagues:
-            df = df[df["league"].isin(leagues)]
-            players_df = players_df[players_df["league"].isin(leagues)]
-        if df.empty:
-            continue
-        for col in ["result", "earned gpm", "dpm", "visionscore", "damageshare", "kills", "deaths", "assists"]:
-            df[col] = _to_numeric(df[col], 0)
-        if not players_df.empty:
-            players_df["damagetochampions"] = _to_numeric(players_df["damagetochampions"], 0)
-            team_damage = (
-                players_df.groupby(["teamname", "teamid", "gameid"])["damagetochampions"]
-                .sum()
-                .reset_index()
-            )
-            game_total = (
-                players_df.groupby(["gameid"])["damagetochampions"]
-                .sum()
-                .reset_index()
-                .rename(columns={"damagetochampions": "game_damage"})
-            )
-            team_damage = team_damage.merge(game_total, on="gameid", how="left")
-            team_damage["team_damage_share"] = team_damage["damagetochampions"] / team_damage["game_damage"].replace(0, 1)
-            df = df.merge(
-                team_damage[["teamname", "teamid", "gameid", "team_damage_share"]],
-                on=["teamname", "teamid", "gameid"],
-                how="left",
-            )
-            df["damageshare"] = df["team_damage_share"].fillna(df["damageshare"])
-            df = df.drop(columns=["team_damage_share"])
-        df["kda"] = (df["kills"] + df["assists"]) / df["deaths"].replace(0, 1)
-        grouped = df.groupby(["teamname", "teamid"])
-        for (teamname, teamid), group in grouped:
-            matches = group.shape[0]
-            wins = group["result"].sum()
-            key = (teamname, teamid)
-            bucket = team_map.setdefault(key, {
-                "teamname": teamname,
-                "teamid": teamid,
-                "matches": 0,
-                "wins": 0,
-                "sumDpm": 0.0,
-                "sumEarnedGpm": 0.0,
-                "sumVision": 0.0,
-                "sumDamageShare": 0.0,
-                "sumKda": 0.0,
-            })
-            bucket["matches"] += int(matches)
-            bucket["wins"] += int(wins)
-            bucket["sumDpm"] += float(group["dpm"].mean()) * matches
-            bucket["sumEarnedGpm"] += float(group["earned gpm"].mean()) * matches
-            bucket["sumVision"] += float(group["visionscore"].mean()) * matches
-            bucket["sumDamageShare"] += float(group["damageshare"].mean()) * matches
-            bucket["sumKda"] += float(group["kda"].mean()) * matches
+    def year_partial(year: str):
+        cube = _read_rollup(paths, year, "team")
+        if cube is None:
+            return None
+        cube = _filter_leagues(cube, leagues)
+        if cube.empty:
+            return None
+        return cube.groupby(["teamname", "teamid"], observed=True)[TEAM_SUMS].sum().reset_index()
+
+    partials = [p for p in _map_years(years, year_partial) if p is not None]
+    if not partials:
+        return []
     rows = []
-    for bucket in team_map.values():
-        matches = bucket["matches"]
-        wins = bucket["wins"]
+    totals = _merge_partials(partials, ["teamname", "teamid"], TEAM_SUMS)
+    for (teamname, teamid), bucket in zip(totals.index, totals.itertuples(index=False)):
+        matches = int(bucket.matches)
+        wins = int(bucket.wins)
         rows.append({
-            "teamname": bucket["teamname"],
-            "teamid": bucket["teamid"],
+            "teamname": teamname,
+            "teamid": teamid,
             "matches": matches,
             "wins": wins,
             "losses": matches - wins,
             "winRate": float(wins / matches) if matches else 0,
-            "avgDpm": float(bucket["sumDpm"] / matches) if matches else 0,
-            "avgEarnedGpm": float(bucket["sumEarnedGpm"] / matches) if matches else 0,
-            "avgVision": float(bucket["sumVision"] / matches) if matches else 0,
-            "avgDamageShare": float(bucket["sumDamageShare"] / matches) if matches else 0,
-            "avgKda": float(bucket["sumKda"] / matches) if matches else 0,
+            "avgDpm": float(bucket.sumDpm / matches) if matches else 0,
+            "avgEarnedGpm": float(bucket.sumEarnedGpm / matches) if matches else 0,
+            "avgVision": float(bucket.sumVision / matches) if matches else 0,
+            "avgDamageShare": float(bucket.sumDamageShare / matches) if matches else 0,
+            "avgKda": float(bucket.sumKda / matches) if matches else 0,
         })
     rows.sort(key=lambda r: (r["winRate"], r["matches"]), reverse=True)
     return rows
 
 
+def _position_box(paths: AppPaths, year: str, leagues: Sequence[str], positions: Sequence[str]) -> List[Dict[str, Any]]:
+    # Quantiles are not additive, so the box plot still reads the player rows.
+    df = _read_oracle(paths, year, ["league", "position", "dpm", "earned gpm", "kills", "assists", "teamkills"])
+    if df is None:
+        return []
+    df = df[df["position"] != "team"]
+    df = _filter_leagues(df, leagues)
+    if positions:
+        df = df[df["position"].isin(positions)]
+    if df.empty:
+        return []
+    df = df.assign(kp=(df["kills"] + df["assists"]) / df["teamkills"].replace(0, 1))
+    box = []
+    for pos in df["position"].dropna().unique().tolist():
+        pos_df = df[df["position"] == pos]
+        for metric in ["dpm", "earned gpm", "kp"]:
+            quantiles = _to_numeric(pos_df[metric], 0).quantile([0.1, 0.25, 0.5, 0.75, 0.9]).tolist()
+            box.append({
+                "position": pos,
+                "metric": metric,
+                "p10": float(quantiles[0]),
+                "q1": float(quantiles[1]),
+                "median": float(quantiles[2]),
+                "q3": float(quantiles[3]),
+                "p90": float(quantiles[4]),
+            })
+    return box
+
+
 def oracle_player_stats(paths: AppPaths, years: Sequence[str], leagues: Sequence[str], positions: Sequence[str]) -> Dict[str, Any]:
-    player_map: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
-    position_box = []
-    for year in years:
-        df = _read_oracle(paths, year, [
-            "league", "year", "playername", "playerid", "position", "result",
-            "dpm", "visionscore", "earned gpm", "kills", "deaths", "assists", "teamkills"
-        ])
-        if df is None:
-            continue
-        df = df[df["position"] != "team"]
-        if leagues:
-            df = df[df["league"].isin(leagues)]
+    keys = ["playername", "playerid", "position"]
+
+    def year_partial(year: str):
+        cube = _read_rollup(paths, year, "player")
+        if cube is None:
+            return None
+        cube = _filter_leagues(cube, leagues)
         if positions:
-            df = df[df["position"].isin(positions)]
-        if df.empty:
+            cube = cube[cube["position"].isin(positions)]
+        if cube.empty:
+            return None
+        partial = cube.groupby(keys, observed=True)[PLAYER_SUMS].sum().reset_index()
+        return partial, _position_box(paths, year, leagues, positions)
+
+    partials = []
+    position_box = []
+    for result in _map_years(years, year_partial):
+        if result is None:
             continue
-        for col in ["result", "dpm", "visionscore", "earned gpm", "kills", "deaths", "assists", "teamkills"]:
-            df[col] = _to_numeric(df[col], 0)
-        df["kda"] = (df["kills"] + df["assists"]) / df["deaths"].replace(0, 1)
-        df["kp"] = (df["kills"] + df["assists"]) / df["teamkills"].replace(0, 1)
-        grouped = df.groupby(["playername", "playerid", "position"])
-        for (playername, playerid, position), group in grouped:
-            matches = group.shape[0]
-            wins = group["result"].sum()
-            key = (playername, playerid, position)
-            bucket = player_map.setdefault(key, {
+        partials.append(result[0])
+        position_box.extend(result[1])
+    players = []
+    if partials:
+        totals = _merge_partials(partials, keys, PLAYER_SUMS)
+        for (playername, playerid, position), bucket in zip(totals.index, totals.itertuples(index=False)):
+            matches = int(bucket.matches)
+            wins = int(bucket.wins)
+            players.append({
                 "playername": playername,
                 "playerid": playerid,
                 "position": position,
-                "matches": 0,
-                "wins": 0,
-                "sumDpm": 0.0,
-                "sumEarnedGpm": 0.0,
-                "sumVision": 0.0,
-                "sumKda": 0.0,
-                "sumKp": 0.0,
+                "matches": matches,
+                "wins": wins,
+                "winRate": float(wins / matches) if matches else 0,
+                "avgDpm": float(bucket.sumDpm / matches) if matches else 0,
+                "avgEarnedGpm": float(bucket.sumEarnedGpm / matches) if matches else 0,
+                "avgVision": float(bucket.sumVision / matches) if matches else 0,
+                "avgKda": float(bucket.sumKda / matches) if matches else 0,
+                "avgKp": float(bucket.sumKp / matches) if matches else 0,
             })
-            bucket["matches"] += int(matches)
-            bucket["wins"] += int(wins)
-            bucket["sumDpm"] += float(group["dpm"].mean()) * matches
-            bucket["sumEarnedGpm"] += float(group["earned gpm"].mean()) * matches
-            bucket["sumVision"] += float(group["visionscore"].mean()) * matches
-            bucket["sumKda"] += float(group["kda"].mean()) * matches
-            bucket["sumKp"] += float(group["kp"].mean()) * matches
-        for pos in df["position"].dropna().unique().tolist():
-            pos_df = df[df["position"] == pos]
-            for metric in ["dpm", "earned gpm", "kp"]:
-                quantiles = pos_df[metric].quantile([0.1, 0.25, 0.5, 0.75, 0.9]).tolist()
-                position_box.append({
-                    "position": pos,
-                    "metric": metric,
-                    "p10": float(quantiles[0]),
-                    "q1": float(quantiles[1]),
-                    "median": float(quantiles[2]),
-                    "q3": float(quantiles[3]),
-                    "p90": float(quantiles[4]),
-                })
-    players = []
-    for bucket in player_map.values():
-        matches = bucket["matches"]
-        wins = bucket["wins"]
-        players.append({
-            "playername": bucket["playername"],
-            "playerid": bucket["playerid"],
-            "position": bucket["position"],
-            "matches": matches,
-            "wins": wins,
-            "winRate": float(wins / matches) if matches else 0,
-            "avgDpm": float(bucket["sumDpm"] / matches) if matches else 0,
-            "avgEarnedGpm": float(bucket["sumEarnedGpm"] / matches) if matches else 0,
-            "avgVision": float(bucket["sumVision"] / matches) if matches else 0,
-            "avgKda": float(bucket["sumKda"] / matches) if matches else 0,
-            "avgKp": float(bucket["sumKp"] / matches) if matches else 0,
-        })
     players.sort(key=lambda r: (r["avgKda"], r["matches"]), reverse=True)
     return {
         "players": players,
@@ -576,134 +915,125 @@ def oracle_player_stats(paths: AppPaths, years: Sequence[str], leagues: Sequence
 
 
 def oracle_champion_stats(paths: AppPaths, years: Sequence[str], leagues: Sequence[str]) -> Dict[str, Any]:
-    pick_map: Dict[str, Dict[str, Any]] = {}
-    ban_map: Dict[str, int] = {}
-    for year in years:
-        df = _read_oracle(paths, year, ["league", "year", "split", "champion", "result", "side", "position"])
-        if df is None:
-            continue
-        df = df[df["position"] != "team"]
-        if leagues:
-            df = df[df["league"].isin(leagues)]
-        if df.empty:
-            continue
-        df["result"] = _to_numeric(df["result"], 0)
-        grouped = df.groupby("champion")
-        for champ, group in grouped:
-            bucket = pick_map.setdefault(champ, {
+    def year_partial(year: str):
+        cube = _read_rollup(paths, year, "champion")
+        if cube is None:
+            return None, None
+        cube = _filter_leagues(cube, leagues)
+        if cube.empty:
+            return None, None
+        year_picks = cube.groupby("champion", observed=True)[PICK_SUMS].sum().reset_index()
+        ban_cube = _filter_leagues(_read_rollup(paths, year, "ban"), leagues)
+        if ban_cube.empty:
+            return year_picks, None
+        year_bans = (
+            ban_cube.groupby("champion", observed=True)
+            .agg(bans=("bans", "sum"), firstRow=("firstRow", "min"))
+            .reset_index()
+            .sort_values(["bans", "firstRow"], ascending=[False, True], kind="stable")
+        )
+        return year_picks, year_bans
+
+    pick_partials = []
+    ban_partials = []
+    for year_picks, year_bans in _map_years(years, year_partial):
+        if year_picks is not None:
+            pick_partials.append(year_picks)
+        if year_bans is not None:
+            ban_partials.append(year_bans)
+    picks = []
+    if pick_partials:
+        totals = _merge_partials(pick_partials, ["champion"], PICK_SUMS)
+        for champ, bucket in zip(totals.index, totals.itertuples(index=False)):
+            picks.append({
                 "champion": champ,
-                "picks": 0,
-                "wins": 0,
-                "bluePicks": 0,
-                "redPicks": 0,
+                "picks": int(bucket.picks),
+                "wins": int(bucket.wins),
+                "winRate": float(bucket.wins / bucket.picks) if bucket.picks else 0,
+                "bluePicks": int(bucket.bluePicks),
+                "redPicks": int(bucket.redPicks),
             })
-            bucket["picks"] += int(group.shape[0])
-            bucket["wins"] += int(group["result"].sum())
-            bucket["bluePicks"] += int(group[group["side"] == "Blue"].shape[0])
-            bucket["redPicks"] += int(group[group["side"] == "Red"].shape[0])
-        ban_df = _read_oracle(paths, year, ["league", "year", "split", "position", "ban1", "ban2", "ban3", "ban4", "ban5"])
-        if ban_df is None:
-            continue
-        ban_df = ban_df[ban_df["position"] == "team"]
-        if leagues:
-            ban_df = ban_df[ban_df["league"].isin(leagues)]
-        if ban_df.empty:
-            continue
-        ban_series = ban_df[["ban1", "ban2", "ban3", "ban4", "ban5"]].stack().dropna()
-        ban_counts = ban_series.value_counts()
-        for champ, count in ban_counts.items():
-            ban_map[champ] = ban_map.get(champ, 0) + int(count)
-    picks = []
-    for champ, bucket in pick_map.items():
-        picks.append({
-            "champion": champ,
-            "picks": bucket["picks"],
-            "wins": bucket["wins"],
-            "winRate": float(bucket["wins"] / bucket["picks"]) if bucket["picks"] else 0,
-            "bluePicks": bucket["bluePicks"],
-            "redPicks": bucket["redPicks"],
-        })
-    bans = [{"champion": champ, "bans": count} for champ, count in ban_map.items()]
+    bans = []
+    if ban_partials:
+        totals = _merge_partials(ban_partials, ["champion"], ["bans"])
+        bans = [{"champion": champ, "bans": int(count)} for champ, count in totals["bans"].items()]
     picks.sort(key=lambda r: r["picks"], reverse=True)
     bans.sort(key=lambda r: r["bans"], reverse=True)
     return {"picks": picks, "bans": bans}
 
 
 def oracle_champion_trend(paths: AppPaths, years: Sequence[str], leagues: Sequence[str], champion: str) -> List[Dict[str, Any]]:
-    trend = []
-    for year in years:
-        df = _read_oracle(paths, year, ["league", "year", "champion", "position"])
-        if df is None:
-            continue
-        df = df[df["position"] != "team"]
-        if leagues:
-            df = df[df["league"].isin(leagues)]
+    def year_picks(year: str) -> Optional[Dict[str, Any]]:
+        cube = _read_rollup(paths, year, "champion")
+        if cube is None:
+            return None
+        cube = _filter_leagues(cube, leagues)
         if champion:
-            df = df[df["champion"] == champion]
-        count = int(df.shape[0])
-        trend.append({"year": int(year), "picks": count})
-    return trend
+            cube = cube[cube["champion"] == champion]
+        return {"year": int(year), "picks": int(cube["picks"].sum())}
+
+    return [point for point in _map_years(years, year_picks) if point is not None]
+
+
+def _champion_picks(paths: AppPaths, years: Sequence[str], leagues: Sequence[str]):
+    def year_partial(item: Tuple[int, str]):
+        idx, year = item
+        cube = _read_rollup(paths, year, "champion")
+        if cube is None:
+            return None
+        cube = _filter_leagues(cube, leagues)
+        if cube.empty:
+            return None
+        cube = cube[["league", "position", "champion", "picks", "firstRow"]]
+        return cube.assign(order=cube["firstRow"] + idx * _ORDER_STRIDE)
+
+    partials = [p for p in _map_years(list(enumerate(years)), year_partial) if p is not None]
+    if not partials:
+        return None
+    pd = _require_pandas()
+    picks = pd.concat(partials, ignore_index=True)
+    for col in ["league", "position", "champion"]:
+        picks[col] = picks[col].astype(object)
+    return picks
+
+
+def _top_champions(picks, top_n: int) -> List[str]:
+    ranked = (
+        picks.groupby("champion")
+        .agg(picks=("picks", "sum"), order=("order", "min"))
+        .sort_values(["picks", "order"], ascending=[False, True], kind="stable")
+    )
+    ranked = ranked[ranked["picks"] > 0]
+    return ranked.head(top_n).index.tolist()
 
 
 def oracle_bp_heatmap(paths: AppPaths, years: Sequence[str], leagues: Sequence[str], top_n: int = 12) -> Dict[str, Any]:
-    combined = []
-    for year in years:
-        df = _read_oracle(paths, year, ["league", "champion", "position"])
-        if df is None:
-            continue
-        df = df[df["position"] != "team"]
-        if leagues:
-            df = df[df["league"].isin(leagues)]
-        if df.empty:
-            continue
-        combined.append(df)
-    if not combined:
+    picks = _champion_picks(paths, years, leagues)
+    if picks is None:
         return {"leagues": [], "champions": [], "values": []}
-    import pandas as pd  # type: ignore
-
-    df = pd.concat(combined, ignore_index=True)
-    top_champions = df["champion"].value_counts().head(top_n).index.tolist()
-    league_list = df["league"].dropna().unique().tolist()
+    top_champions = _top_champions(picks, top_n)
+    league_list = picks.groupby("league")["order"].min().sort_values(kind="stable").index.tolist()
     if leagues:
         league_list = [l for l in leagues if l in league_list]
+    counts = picks.groupby(["league", "champion"])["picks"].sum()
     values = []
     for league in league_list:
-        row = []
-        league_df = df[df["league"] == league]
-        counts = league_df["champion"].value_counts()
-        for champ in top_champions:
-            row.append(int(counts.get(champ, 0)))
-        values.append(row)
+        values.append([int(counts.get((league, champ), 0)) for champ in top_champions])
     return {"leagues": league_list, "champions": top_champions, "values": values}
 
 
 def oracle_bp_sankey(paths: AppPaths, years: Sequence[str], leagues: Sequence[str], top_n: int = 8) -> Dict[str, Any]:
-    combined = []
-    for year in years:
-        df = _read_oracle(paths, year, ["league", "champion", "position"])
-        if df is None:
-            continue
-        df = df[df["position"] != "team"]
-        if leagues:
-            df = df[df["league"].isin(leagues)]
-        if df.empty:
-            continue
-        combined.append(df)
-    if not combined:
+    picks = _champion_picks(paths, years, leagues)
+    if picks is None:
         return {"positions": [], "champions": [], "links": []}
-    import pandas as pd  # type: ignore
-
-    df = pd.concat(combined, ignore_index=True)
     positions = ["top", "jng", "mid", "bot", "sup"]
-    df = df[df["position"].isin(positions)]
-    top_champions = df["champion"].value_counts().head(top_n).index.tolist()
-    df = df[df["champion"].isin(top_champions)]
+    picks = picks[picks["position"].isin(positions)]
+    top_champions = _top_champions(picks, top_n)
+    counts = picks.groupby(["position", "champion"])["picks"].sum()
     links = []
     for pos_idx, pos in enumerate(positions):
-        pos_df = df[df["position"] == pos]
-        counts = pos_df["champion"].value_counts()
         for champ_idx, champ in enumerate(top_champions):
-            value = int(counts.get(champ, 0))
+            value = int(counts.get((pos, champ), 0))
             if value:
                 links.append({
                     "sourceIndex": pos_idx,
@@ -712,55 +1042,89 @@ def oracle_bp_sankey(paths: AppPaths, years: Sequence[str], leagues: Sequence[st
                 })
     return {"positions": positions, "champions": top_champions, "links": links}
 
+MATCH_COLUMNS = [
+    "gameid", "league", "year", "split", "date", "patch", "side", "position",
+    "teamname", "playername", "playerid", "champion", "result",
+    "kills", "deaths", "assists", "damagetochampions", "totalgold",
+    "ban1", "ban2", "ban3", "ban4", "ban5"
+]
+
+
+def _match_payload(game_id: str, game_df) -> Dict[str, Any]:
+    summary = {
+        "gameid": game_id,
+        "league": game_df["league"].iloc[0],
+        "year": int(game_df["year"].iloc[0]) if str(game_df["year"].iloc[0]).isdigit() else game_df["year"].iloc[0],
+        "split": game_df["split"].iloc[0],
+        "date": game_df["date"].iloc[0],
+        "patch": game_df["patch"].iloc[0],
+    }
+    teams = game_df[game_df["position"] == "team"]
+    bans = []
+    for _, row in teams.iterrows():
+        bans.append({
+            "teamname": row.get("teamname"),
+            "side": row.get("side"),
+            "result": row.get("result"),
+            "bans": [row.get("ban1"), row.get("ban2"), row.get("ban3"), row.get("ban4"), row.get("ban5")],
+        })
+    players = []
+    for _, row in game_df[game_df["position"] != "team"].iterrows():
+        players.append({
+            "teamname": row.get("teamname"),
+            "side": row.get("side"),
+            "playername": row.get("playername"),
+            "playerid": row.get("playerid"),
+            "champion": row.get("champion"),
+            "result": row.get("result"),
+            "kills": row.get("kills"),
+            "deaths": row.get("deaths"),
+            "assists": row.get("assists"),
+            "damagetochampions": row.get("damagetochampions"),
+            "totalgold": row.get("totalgold"),
+        })
+    return {
+        "summary": summary,
+        "bans": bans,
+        "players": players,
+    }
+
+
+def _indexed_match_details(paths: AppPaths, game_id: str, year: Optional[str]) -> Optional[Dict[str, Any]]:
+    index_path = gameid_index_path(str(paths.data_dir))
+    indexed = gameid_index_fingerprints(index_path)
+    years = [year] if year else list_oracle_years(paths)
+    for y in years:
+        csv_path = _oracle_path(paths, y)
+        if csv_path and indexed.get(y) != source_fingerprint(csv_path):
+            # The index is missing this year or predates its CSV.
+            return None
+    for y, start, stop in lookup_gameid(index_path, game_id):
+        if y not in years:
+            continue
+        converted = _converted_oracle_path(paths, y, _oracle_path(paths, y))
+        if not converted:
+            return None
+        import pyarrow.feather as feather  # type: ignore
+
+        table = feather.read_table(str(converted), columns=MATCH_COLUMNS, memory_map=True)
+        game_df = table.slice(start, stop - start).to_pandas()
+        game_df = game_df[game_df["gameid"] == game_id]
+        return _match_payload(game_id, game_df) if not game_df.empty else {}
+    return {}
+
+
 def oracle_match_details(paths: AppPaths, game_id: str, year: Optional[str] = None) -> Dict[str, Any]:
+    details = _indexed_match_details(paths, game_id, year)
+    if details is not None:
+        return details
     years = [year] if year else list_oracle_years(paths)
     for y in years:
-        df = _read_oracle(paths, y, [
-            "gameid", "league", "year", "split", "date", "patch", "side", "position",
-            "teamname", "playername", "playerid", "champion", "result",
-            "kills", "deaths", "assists", "damagetochampions", "totalgold",
-            "ban1", "ban2", "ban3", "ban4", "ban5"
-        ])
+        df = _read_oracle(paths, y, MATCH_COLUMNS)
         if df is None:
             continue
         game_df = df[df["gameid"] == game_id]
         if game_df.empty:
             continue
-        summary = {
-            "gameid": game_id,
-            "league": game_df["league"].iloc[0],
-            "year": int(game_df["year"].iloc[0]) if str(game_df["year"].iloc[0]).isdigit() else game_df["year"].iloc[0],
-            "split": game_df["split"].iloc[0],
-            "date": game_df["date"].iloc[0],
-            "patch": game_df["patch"].iloc[0],
-        }
-        teams = game_df[game_df["position"] == "team"]
-        bans = []
-        for _, row in teams.iterrows():
-            bans.append({
-                "teamname": row.get("teamname"),
-                "side": row.get("side"),
-                "result": row.get("result"),
-                "bans": [row.get("ban1"), row.get("ban2"), row.get("ban3"), row.get("ban4"), row.get("ban5")],
-            })
-        players = []
-        for _, row in game_df[game_df["position"] != "team"].iterrows():
-            players.append({
-                "teamname": row.get("teamname"),
-                "side": row.get("side"),
-                "playername": row.get("playername"),
-                "playerid": row.get("playerid"),
-                "champion": row.get("champion"),
-                "result": row.get("result"),
-                "kills": row.get("kills"),
-                "deaths": row.get("deaths"),
-                "assists": row.get("assists"),
-                "damagetochampions": row.get("damagetochampions"),
-                "totalgold": row.get("totalgold"),
-            })
-        return {
-            "summary": summary,
-            "bans": bans,
-            "players": players,
-        }
+        return _match_payload(game_id, game_df)
     return {}
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Frame deltas from the live poller, kept per game so a new subscriber starts
+# from the whole series, and fanned out to Server-Sent Event streams. Everything
+# here runs on the server's event loop. Snapshots handed out are copies taken
+# at a known seq; the series keeps growing after that, and the frames added
+# later reach the stream as deltas with a higher seq.
+
+SERIES_FIELDS = ("blueTeam", "redTeam")
+QUEUE_SIZE = 256
+
+
+def _extend_columns(target: Dict[str, List[Any]], delta: Dict[str, List[Any]], before: int, added: int) -> None:
+    # Columns first seen in this delta are padded with nulls for earlier frames.
+    for field, values in delta.items():
+        target.setdefault(field, [None] * before).extend(values)
+    for field, values in target.items():
+        if field not in delta:
+            values.extend([None] * added)
+
+
+def _trim(series: Dict[str, Any], keep: int) -> None:
+    drop = len(series["timestamps"]) - keep
+    if drop <= 0:
+        return
+    series["timestamps"] = series["timestamps"][drop:]
+    series["gameState"] = series["gameState"][drop:]
+    for side in SERIES_FIELDS:
+        series[side] = {field: values[drop:] for field, values in series[side].items()}
+    series["participants"] = {
+        pid: {field: values[drop:] for field, values in columns.items()}
+        for pid, columns in series["participants"].items()
+    }
+
+
+def sse_message(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+class LiveHub:
+    def __init__(self, max_frames: int = 20000) -> None:
+        self.max_frames = max_frames
+        self.seq = 0
+        self._series: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def publish(self, game_id: str, delta: Dict[str, Any]) -> None:
+        series = self._series.setdefault(game_id, {
+            "gameId": game_id,
+            "finished": False,
+            "timestamps": [],
+            "gameState": [],
+            "blueTeam": {},
+            "redTeam": {},
+            "participants": {},
+        })
+        before = len(series["timestamps"])
+        added = len(delta.get("timestamps", []))
+        series["timestamps"].extend(delta.get("timestamps", []))
+        series["gameState"].extend(delta.get("gameState", []))
+        for side in SERIES_FIELDS:
+            _extend_columns(series[side], delta.get(side, {}), before, added)
+        participants = delta.get("participants", {})
+        for pid in set(series["participants"]) | set(participants):
+            _extend_columns(series["participants"].setdefault(pid, {}), participants.get(pid, {}), before, added)
+        series["finished"] = bool(delta.get("finished"))
+        _trim(series, self.max_frames)
+
+        self.seq += 1
+        for queue in self._subscribers.get(game_id, []):
+            try:
+                queue.put_nowait((self.seq, "frames", delta))
+            except asyncio.QueueFull:
+                # A client that fell behind starts over from the whole series.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait((self.seq, "snapshot", copy.deepcopy(series)))
+
+    def snapshot(self, game_id: str) -> Optional[Dict[str, Any]]:
+        return self._series.get(game_id)
+
+    def games(self, intervals: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        intervals = intervals or {}
+        items = []
+        for game_id, series in self._series.items():
+            items.append({
+                "gameId": game_id,
+                "finished": series["finished"],
+                "frames": len(series["timestamps"]),
+                "lastTimestamp": series["timestamps"][-1] if series["timestamps"] else None,
+                "gameState": series["gameState"][-1] if series["gameState"] else None,
+                "pollIntervalS": intervals.get(game_id),
+                "subscribers": len(self._subscribers.get(game_id, [])),
+            })
+        return items
+
+    @contextmanager
+    def subscribe(self, game_id: str) -> Iterator[Tuple[asyncio.Queue, Optional[Dict[str, Any]], int]]:
+        # (queue of (seq, event, data), copy of the series so far, its seq) for
+        # one stream; queued items with a seq not above it are already in the copy.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.setdefault(game_id, []).append(queue)
+        series = self._series.get(game_id)
+        try:
+            yield queue, copy.deepcopy(series) if series is not None else None, self.seq
+        finally:
+            queue_list = self._subscribers.get(game_id, [])
+            if queue in queue_list:
+                queue_list.remove(queue)
+            if not queue_list:
+                self._subscribers.pop(game_id, None)
+
+
+class EventBroadcaster:
+    # Fan-out of (event, data) to every open stream. publish() may be called
+    # from pipeline threads; delivery happens on the event loop given to attach().
+    # "progress" events are running snapshots: a stream that falls QUEUE_SIZE
+    # events behind keeps only the latest one per task. Every other event, such
+    # as a task's "status" transition, is always delivered.
+    def __init__(self) -> None:
+        self.seq = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: List[asyncio.Queue] = []
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        self._loop = loop
+
+    def publish(self, event: str, data: Any) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._deliver, event, data)
+
+    def _deliver(self, event: str, data: Any) -> None:
+        self.seq += 1
+        for queue in self._queues:
+            if queue.qsize() >= QUEUE_SIZE:
+                _collapse_progress(queue)
+            queue.put_nowait((self.seq, event, data))
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues.append(queue)
+        try:
+            yield queue
+        finally:
+            self._queues.remove(queue)
+
+
+def _collapse_progress(queue: asyncio.Queue) -> None:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    latest = {}
+    for index, (_, event, data) in enumerate(items):
+        if event == "progress":
+            latest[data.get("task")] = index
+    keep = set(latest.values())
+    for index, item in enumerate(items):
+        if item[1] != "progress" or index in keep:
+            queue.put_nowait(item)
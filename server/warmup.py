@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .data_access import (
+    AppPaths,
+    list_lolapi_players,
+    list_oracle_years,
+    load_champions,
+    load_items,
+    resolve_ddragon_version,
+    warm_oracle_year,
+)
+
+
+class WarmupState:
+    def __init__(self) -> None:
+        self.status = "pending"
+        self.done = 0
+        self.total = 0
+        self.current: Optional[str] = None
+        self.errors: List[Dict[str, str]] = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "disabled")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "status": self.status,
+                "done": self.done,
+                "total": self.total,
+                "current": self.current,
+                "errors": list(self.errors),
+                "startedAt": self.started_at,
+                "finishedAt": self.finished_at,
+            }
+
+
+def _warmup_steps(paths: AppPaths, config: Dict[str, Any]) -> List[Tuple[str, Callable[[], Any]]]:
+    server_cfg = config.get("server", {})
+    steps: List[Tuple[str, Callable[[], Any]]] = []
+    years = int(server_cfg.get("warmup_years", 1))
+    for year in list_oracle_years(paths)[-years:] if years > 0 else []:
+        steps.append((f"oracle:{year}", lambda year=year: warm_oracle_year(paths, year)))
+    version = resolve_ddragon_version(paths, config, None)
+    if version:
+        steps.append((f"ddragon:{version}:champions", lambda: load_champions(paths, config, version)))
+        steps.append((f"ddragon:{version}:items", lambda: load_items(paths, config, version)))
+    steps.append(("lolapi:players", lambda: list_lolapi_players(paths)))
+    return steps
+
+
+def _record_error(state: WarmupState, step: str, exc: Exception) -> None:
+    with state._lock:
+        state.errors.append({"step": step, "message": f"{type(exc).__name__}: {exc}"})
+
+
+def run_warmup(paths: AppPaths, config: Dict[str, Any], state: WarmupState) -> None:
+    # Whatever fails, warmup ends "ready" with the errors recorded: requests
+    # still work cold, and a dead warmup must not keep /api/ready at 503.
+    with state._lock:
+        state.status = "running"
+        state.started_at = time.time()
+    try:
+        steps = _warmup_steps(paths, config)
+        with state._lock:
+            state.total = len(steps)
+        for name, step in steps:
+            with state._lock:
+                state.current = name
+            try:
+                step()
+            except Exception as exc:
+                # A broken year file should not keep the server out of rotation.
+                _record_error(state, name, exc)
+            with state._lock:
+                state.done += 1
+    except Exception as exc:
+        _record_error(state, "plan", exc)
+    finally:
+        with state._lock:
+            state.current = None
+            state.status = "ready"
+            state.finished_at = time.time()
+
+
+def start_warmup(paths: AppPaths, config: Dict[str, Any], state: WarmupState) -> None:
+    if not config.get("server", {}).get("warmup", True):
+        with state._lock:
+            state.status = "disabled"
+        return
+    thread = threading.Thread(target=run_warmup, args=(paths, config, state), name="warmup", daemon=True)
+    thread.start()
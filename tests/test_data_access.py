@@ -0,0 +1,22 @@
+import os
+
+from server.data_access import AppPaths, oracle_data_version
+
+CSV_NAME = "2024_LoL_esports_match_data_from_OraclesElixir.csv"
+
+
+def test_oracle_version_sees_csv_overwritten_in_place(tmp_path):
+    raw = tmp_path / "data" / "raw" / "oracle_elixir"
+    raw.mkdir(parents=True)
+    paths = AppPaths(data_dir=(tmp_path / "data").resolve(), meta_dir=(tmp_path / "data" / "meta").resolve())
+    csv_path = raw / CSV_NAME
+    csv_path.write_text("gameid,league\n1,LCK\n")
+    first = oracle_data_version(paths)
+    assert oracle_data_version(paths) == first
+
+    dir_mtime = raw.stat().st_mtime_ns
+    with open(csv_path, "a") as f:
+        f.write("2,LPL\n")
+    os.utime(raw, ns=(dir_mtime, dir_mtime))
+
+    assert oracle_data_version(paths) != first
@@ -0,0 +1,97 @@
+import copy
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from pipeline import esports
+from pipeline.config import DEFAULT_CONFIG
+from pipeline.jobs import JobStore, jobs_db_path, run_job
+
+
+def test_cancel_reaches_job_inside_except_exception_block(tmp_path, monkeypatch):
+    data_dir, meta_dir = str(tmp_path / "data"), str(tmp_path / "meta")
+    store = JobStore(jobs_db_path(meta_dir))
+    job, _ = store.create("esports", {})
+    calls = []
+
+    def slow_schedule(hl, league_id, timeout=None):
+        # Each league fails after a while; esports logs it and moves on.
+        calls.append(league_id)
+        time.sleep(0.2)
+        raise RuntimeError("schedule unavailable")
+
+    monkeypatch.setattr(esports, "fetch_leagues", lambda hl, timeout=None: {})
+    monkeypatch.setattr(esports, "fetch_schedule", slow_schedule)
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["esports"].update(leagues=[f"league-{i}" for i in range(20)], progress=False)
+
+    threading.Timer(0.3, store.request_cancel, args=(job["id"],)).start()
+    started = time.monotonic()
+    run_job(job["id"], config, data_dir, meta_dir)
+
+    assert time.monotonic() - started < 2
+    assert len(calls) < 5
+    # The process (this one) is still alive, so the job keeps its task busy.
+    assert store.get(job["id"])["status"] == "cancelling"
+    assert not store.create("esports", {})[1]
+    store.close()
+
+
+def test_one_active_job_per_task_across_stores(tmp_path):
+    db_path = jobs_db_path(str(tmp_path / "meta"))
+    first, second = JobStore(db_path), JobStore(db_path)
+    job, created = first.create("esports", {})
+    assert created
+
+    # A second API worker sees the same active job instead of starting another.
+    again, created = second.create("esports", {"other": 1})
+    assert not created
+    assert again["id"] == job["id"]
+    assert second.create("ddragon", {})[1]
+
+    first.finish(job["id"], "success")
+    assert second.create("esports", {})[1]
+    first.close()
+    second.close()
+
+
+def test_cancel_queued_job_without_process(tmp_path):
+    store = JobStore(jobs_db_path(str(tmp_path / "meta")))
+    job, _ = store.create("oracle", {})
+
+    assert store.request_cancel(job["id"])["status"] == "cancelled"
+    assert store.create("oracle", {})[1]
+    store.close()
+
+
+def test_cancel_running_job_waits_for_its_process(tmp_path):
+    store = JobStore(jobs_db_path(str(tmp_path / "meta")))
+    job, _ = store.create("lolapi", {})
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        assert store.mark_running(job["id"], proc.pid)
+        assert store.request_cancel(job["id"])["status"] == "cancelling"
+        # The task stays busy until the process is gone.
+        assert not store.create("lolapi", {})[1]
+        assert proc.wait(timeout=5) == -signal.SIGTERM
+    finally:
+        proc.kill()
+        proc.wait()
+
+    store.reap_lost()
+    assert store.get(job["id"])["status"] == "cancelled"
+    store.close()
+
+
+def test_job_whose_process_died_is_marked_error(tmp_path):
+    store = JobStore(jobs_db_path(str(tmp_path / "meta")))
+    job, _ = store.create("ddragon", {})
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    store.mark_running(job["id"], proc.pid)
+
+    store.reap_lost()
+    assert store.get(job["id"])["status"] == "error"
+    store.close()
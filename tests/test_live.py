@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from pipeline import live
+from pipeline.live import LivePoller, starting_time
+
+GAME_START = datetime(2024, 5, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def _frame(offset_s: int, state: str = "in_game") -> dict:
+    stamp = GAME_START + timedelta(seconds=offset_s)
+    return {
+        "rfc460Timestamp": stamp.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "gameState": state,
+        "blueTeam": {"totalGold": 2500 + offset_s, "totalKills": 0, "participants": []},
+        "redTeam": {"totalGold": 2500, "totalKills": 0, "participants": []},
+    }
+
+
+def _ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+def test_starting_time_trails_clock_and_continues_from_last_frame():
+    now_ms = _ms(GAME_START) + 600_000 + 4_321
+    assert starting_time(-1, now_ms, 60_000) == GAME_START + timedelta(seconds=540)
+    last_ms = _ms(GAME_START) + 123_456
+    assert starting_time(last_ms, now_ms, 60_000) == GAME_START + timedelta(seconds=120)
+
+
+def test_second_window_publishes_new_frames(monkeypatch):
+    windows = [
+        {"frames": [_frame(0), _frame(10)]},
+        {"frames": [_frame(10), _frame(20), _frame(30, "finished")]},
+    ]
+    starts = []
+
+    def fake_fetch_window(game_id, start=None):
+        starts.append(start)
+        return windows[min(len(starts), len(windows)) - 1]
+
+    monkeypatch.setattr(live, "fetch_window", fake_fetch_window)
+    monkeypatch.setattr(live.time, "time", lambda: GAME_START.timestamp() + 3600)
+    published = []
+    poller = LivePoller({"live": {"min_interval_s": 0.01}}, "unused", lambda game_id, delta: published.append(delta))
+
+    asyncio.run(asyncio.wait_for(poller.follow("g1", asyncio.Event()), timeout=5))
+
+    assert [delta["timestamps"] for delta in published] == [
+        [_ms(GAME_START), _ms(GAME_START) + 10_000],
+        [_ms(GAME_START) + 20_000, _ms(GAME_START) + 30_000],
+    ]
+    assert published[-1]["finished"]
+    assert all(start is not None for start in starts)
+    assert starts[1] == GAME_START + timedelta(seconds=10)
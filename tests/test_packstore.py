@@ -0,0 +1,47 @@
+from pipeline import storage
+from pipeline.packstore import PackStore, load_object, object_exists, pack_dir, pack_reader, save_object
+
+
+def test_records_survive_reopen(tmp_path, monkeypatch):
+    monkeypatch.setitem(storage._storage, "compression", "gzip")
+    root = pack_dir(str(tmp_path), "matches/na1")
+    writer = PackStore(root, segment_bytes=64)
+    writer.put("NA1_1", {"gameId": 1, "teams": ["blue", "red"]})
+    writer.put("NA1_2", {"gameId": 2})
+    monkeypatch.setitem(storage._storage, "compression", "none")
+    # Replaced records point at their newest copy; the segment rolls over past segment_bytes.
+    writer.put("NA1_1", {"gameId": 1, "patch": "14.1"})
+    writer.close()
+
+    reopened = PackStore(root)
+    assert reopened.get("NA1_1") == {"gameId": 1, "patch": "14.1"}
+    assert reopened.get("NA1_2") == {"gameId": 2}
+    assert reopened.get("NA1_3", "missing") == "missing"
+    assert reopened.keys() == ["NA1_1", "NA1_2"]
+    assert len(list(root.glob("seg-*.pack"))) > 1
+    reopened.close()
+
+
+def test_reader_is_shared_and_sees_later_writes(tmp_path):
+    reader = pack_reader(str(tmp_path), "esports_gw/events")
+    assert reader.get("event-1") is None
+    assert pack_reader(str(tmp_path), "esports_gw/events") is reader
+
+    writer = PackStore(pack_dir(str(tmp_path), "esports_gw/events"))
+    writer.put("event-1", {"id": "event-1"})
+    writer.close()
+    assert reader.get("event-1") == {"id": "event-1"}
+    assert reader.has("event-1")
+
+
+def test_save_object_moves_loose_file_into_pack(tmp_path, monkeypatch):
+    data_dir = str(tmp_path)
+    loose_path = f"{data_dir}/raw/esports_gw/events/event-1.json"
+    save_object(data_dir, "esports_gw/events", "event-1", loose_path, {"v": 1})
+    assert (tmp_path / "raw" / "esports_gw" / "events" / "event-1.json").exists()
+
+    monkeypatch.setitem(storage._storage, "packs", True)
+    save_object(data_dir, "esports_gw/events", "event-1", loose_path, {"v": 2})
+    assert not (tmp_path / "raw" / "esports_gw" / "events" / "event-1.json").exists()
+    assert object_exists(data_dir, "esports_gw/events", "event-1", loose_path)
+    assert load_object(data_dir, "esports_gw/events", "event-1", loose_path, None) == {"v": 2}
@@ -0,0 +1,62 @@
+import time
+
+from pipeline.ratelimit import RateLimiter, parse_limits
+
+
+def _elapsed(limiter, host, method=None):
+    start = time.monotonic()
+    limiter.acquire(host, method)
+    return time.monotonic() - start
+
+
+def test_parse_limits_skips_malformed_parts():
+    assert parse_limits("20:1, 100:120,bad,:5") == [(20, 1.0), (100, 120.0)]
+    assert parse_limits(None) == []
+
+
+def test_app_headers_replace_configured_limits():
+    limiter = RateLimiter(app_limits="100:1")
+    limiter.update("na1", None, {"x-app-rate-limit": "1:0.3", "x-app-rate-limit-count": "1:0.3"})
+
+    assert _elapsed(limiter, "na1") > 0.2
+    # Other routing hosts keep their own buckets.
+    assert _elapsed(limiter, "euw1") < 0.1
+
+
+def test_server_count_ahead_of_ours_is_trusted():
+    limiter = RateLimiter(app_limits="3:0.3")
+    limiter.acquire("na1")
+    # Another process has used the rest of the window.
+    limiter.update("na1", None, {"x-app-rate-limit": "3:0.3", "x-app-rate-limit-count": "3:0.3"})
+
+    assert _elapsed(limiter, "na1") > 0.15
+
+
+def test_method_limits_apply_per_endpoint():
+    limiter = RateLimiter(app_limits="100:1")
+    headers = {
+        "x-app-rate-limit": "100:1",
+        "x-app-rate-limit-count": "1:1",
+        "x-method-rate-limit": "1:0.3",
+        "x-method-rate-limit-count": "1:0.3",
+    }
+    limiter.update("americas", "match", headers)
+
+    assert _elapsed(limiter, "americas", "timeline") < 0.1
+    assert _elapsed(limiter, "americas", "match") > 0.2
+
+
+def test_margin_keeps_headroom_below_the_limit():
+    limiter = RateLimiter(app_limits="100:1", margin=2)
+    limiter.update("na1", None, {"x-app-rate-limit": "3:0.3"})
+    limiter.acquire("na1")
+
+    assert _elapsed(limiter, "na1") > 0.2
+
+
+def test_penalize_blocks_the_named_scope():
+    limiter = RateLimiter(app_limits="100:1")
+    limiter.penalize("na1", "match", 0.3, limit_type="method")
+
+    assert _elapsed(limiter, "na1", "summoner") < 0.1
+    assert _elapsed(limiter, "na1", "match") > 0.2
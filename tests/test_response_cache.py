@@ -0,0 +1,81 @@
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.response_cache import ResponseCache
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # server.app opens its job table on import, so keep it out of the real data dir.
+    monkeypatch.setenv("VISLOL_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv("VISLOL_META_DIR", str(tmp_path / "data" / "meta"))
+    monkeypatch.setenv("VISLOL_CONFIG", str(tmp_path / "config.json"))
+    app_module = importlib.import_module("server.app")
+    state = {"version": "v1", "calls": 0}
+
+    def overview(paths, years, leagues):
+        state["calls"] += 1
+        return {"version": state["version"], "years": years}
+
+    monkeypatch.setattr(app_module, "response_cache", ResponseCache(1024 * 1024))
+    monkeypatch.setattr(app_module, "oracle_data_version", lambda paths: state["version"])
+    monkeypatch.setattr(app_module, "list_oracle_years", lambda paths: ["2024"])
+    monkeypatch.setattr(app_module, "oracle_overview", overview)
+    return app_module, TestClient(app_module.app), state
+
+
+def test_matching_etag_gets_304_without_recomputing(api):
+    _, client, state = api
+    first = client.get("/api/esports/overview")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    again = client.get("/api/esports/overview", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert state["calls"] == 1
+
+    other = client.get("/api/esports/overview", params={"years": "2023"}, headers={"If-None-Match": etag})
+    assert other.status_code == 200
+    assert state["calls"] == 2
+
+
+def test_new_data_version_recomputes_and_changes_etag(api):
+    _, client, state = api
+    etag = client.get("/api/esports/overview").headers["etag"]
+    state["version"] = "v2"
+
+    fresh = client.get("/api/esports/overview", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.json()["version"] == "v2"
+    assert fresh.headers["etag"] != etag
+    assert state["calls"] == 2
+
+
+def test_invalidate_drops_cached_responses(api):
+    app_module, client, state = api
+    etag = client.get("/api/esports/overview").headers["etag"]
+    app_module.response_cache.invalidate()
+
+    # Same data, so the recomputed body keeps its ETag and the client's copy stays valid.
+    again = client.get("/api/esports/overview", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert state["calls"] == 2
+    assert app_module.response_cache.stats()["generation"] == 1
+
+
+def test_cache_evicts_least_recently_used_past_its_budget():
+    cache = ResponseCache(max_bytes=10)
+    cache.put("a", "v1", b"aaaa")
+    cache.put("b", "v1", b"bbbb")
+    assert cache.get("a", "v1") is not None
+    cache.put("c", "v1", b"cccc")
+
+    assert cache.get("b", "v1") is None
+    assert cache.get("a", "v1")[0] == b"aaaa"
+    assert cache.get("c", "v1")[0] == b"cccc"
+    assert cache.get("a", "v2") is None
+    assert cache.stats()["bytes"] == 8
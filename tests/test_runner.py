@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+from pipeline.runner import Step, run_steps
+
+
+def test_independent_steps_run_side_by_side():
+    both_started = threading.Barrier(2, timeout=2)
+    results = run_steps([Step("ddragon", both_started.wait), Step("esports", both_started.wait)], workers=2)
+
+    assert [r["status"] for r in results] == ["success", "success"]
+
+
+def test_dependents_wait_and_failures_skip_them():
+    order = []
+
+    def fail():
+        order.append("esports")
+        raise RuntimeError("schedule unavailable")
+
+    steps = [
+        Step("livestats", lambda: order.append("livestats"), after=["esports"]),
+        Step("esports", fail),
+        Step("oracle", lambda: order.append("oracle")),
+        Step("oracle-ingest", lambda: order.append("oracle-ingest"), after=["oracle", "lolapi"]),
+    ]
+    results = {r["name"]: r for r in run_steps(steps, workers=1)}
+
+    assert results["esports"]["status"] == "error"
+    assert "schedule unavailable" in results["esports"]["error"]
+    assert results["livestats"]["status"] == "skipped"
+    # lolapi is not part of this run, so oracle-ingest only waits for oracle.
+    assert results["oracle-ingest"]["status"] == "success"
+    assert "livestats" not in order
+    assert order.index("oracle") < order.index("oracle-ingest")
+
+
+def test_cycles_are_rejected_before_running():
+    ran = []
+    steps = [Step("a", lambda: ran.append("a"), after=["b"]), Step("b", lambda: ran.append("b"), after=["a"])]
+    with pytest.raises(ValueError):
+        run_steps(steps)
+    assert ran == []